@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, List, Sequence
+
+import pandas as pd
+
+import tf_state
+from inspector.tag_index import REQUIRED_TAGS
+
+# Tag columns are stored as "tag:<Key>" so they never clash with resource fields
+TAG_PREFIX = 'tag:'
+
+BASE_COLUMNS = ['Arn', 'Identifier', 'Service', 'Type', 'Region', 'Relevance', 'Justification']
+
+
+def tag_column(key: str) -> str:
+    return f"{TAG_PREFIX}{key}"
+
+
+def load_inventory(resources: Iterable[Dict]) -> pd.DataFrame:
+    """
+    Builds a columnar inventory from reader or inspector resource dicts.
+
+    Reader records use 'ARN'/'Identifier'/'Service'; inspector records use 'Arn' and
+    carry 'Relevance'/'Justification'. Missing fields become NaN, tags become tag:<Key> columns.
+    """
+    resources = list(resources)
+    base = pd.DataFrame.from_records([{k: v for k, v in r.items() if k != 'Tags'} for r in resources])
+    if 'ARN' in base.columns:
+        base['Arn'] = base['Arn'].fillna(base['ARN']) if 'Arn' in base.columns else base['ARN']
+        base = base.drop(columns=['ARN'])
+    for col in BASE_COLUMNS:
+        if col not in base.columns:
+            base[col] = pd.NA
+
+    arn_parts = base['Arn'].astype('string').str.split(':', n=5)
+    # arn:partition:service:region:account:resource
+    base['Service'] = base['Service'].fillna(arn_parts.str[2])
+    base['Region'] = base['Region'].fillna(arn_parts.str[3])
+    base['Identifier'] = base['Identifier'].fillna(arn_parts.str[5].str.split('/').str[-1])
+
+    # Low-cardinality columns are much cheaper as categoricals at 100k rows
+    for col in ['Service', 'Type', 'Region', 'Relevance', 'Justification']:
+        base[col] = base[col].astype('category')
+
+    tags = pd.DataFrame.from_records([r.get('Tags') or {} for r in resources], index=base.index)
+    tags.columns = [tag_column(c) for c in tags.columns]
+    for col in tags.columns:
+        tags[col] = tags[col].astype('category')
+    return pd.concat([base, tags], axis=1)
+
+
+def load_report(path: str) -> pd.DataFrame:
+    """Loads a main.py --output-file *.jsonl report or the reader's markdown report (see tf_state.load_inventory)."""
+    return load_inventory(tf_state.load_inventory(path))
+
+
+def count_by(df: pd.DataFrame, *columns: str) -> pd.Series:
+    """Resource counts per combination of columns (tag keys may be given as 'tag:Key')."""
+    return df.groupby(list(columns), observed=True, dropna=False).size().sort_values(ascending=False)
+
+
+def relevance_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """KEEP/DELETE counts per Type (inspector inventories only)."""
+    return pd.crosstab(df['Type'], df['Relevance'])
+
+
+def cost_attribution(df: pd.DataFrame, cost_column: str = None,
+                     keys: Sequence[str] = ('CostCenter', 'Project')) -> pd.DataFrame:
+    """
+    Resource counts (and summed cost_column, if present) per cost tag.
+    Resources without the tag are grouped under '(untagged)'.
+    """
+    cols = [tag_column(k) for k in keys]
+    frame = df.reindex(columns=cols + ([cost_column] if cost_column else []))
+    for col in cols:
+        frame[col] = frame[col].astype('object').fillna('(untagged)')
+    grouped = frame.groupby(cols, dropna=False)
+    result = grouped.size().to_frame('Resources')
+    if cost_column:
+        result[cost_column] = grouped[cost_column].sum()
+    return result.sort_values('Resources', ascending=False)
+
+
+def untagged(df: pd.DataFrame, keys: List[str] = None) -> pd.DataFrame:
+    """Resources missing any of the given tag keys, with a MissingTags column."""
+    keys = keys or REQUIRED_TAGS
+    cols = [tag_column(k) for k in keys]
+    present = df.reindex(columns=cols).notna()
+    missing_mask = ~present.all(axis=1)
+    labels = pd.Series([f"{k}," for k in keys], index=cols)
+    missing = (~present[missing_mask]).dot(labels).str.rstrip(',')
+    out = df.loc[missing_mask, ['Arn', 'Service', 'Type']].copy()
+    out['MissingTags'] = missing
+    return out
+
+
+def delete_count(df: pd.DataFrame) -> int:
+    return int((df['Relevance'] == 'DELETE').sum())
@@ -0,0 +1,168 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from call_trace import install_active
+from response_cache import install_default
+
+logger = logging.getLogger(__name__)
+
+# Point every client at a local endpoint (e.g. `moto_server` on http://localhost:5000) for testing
+ENDPOINT_ENV = 'AWS_INSPECTOR_ENDPOINT_URL'
+
+DEFAULT_MAX_WORKERS = 16
+
+# Calls per second allowed per service before the core starts queueing (bursts of the same size)
+DEFAULT_RATE_LIMITS = {
+    'ec2': 20.0,
+    'ecs': 20.0,
+    'elasticloadbalancing': 10.0,
+    'resourcegroupstaggingapi': 5.0,
+    'cloudwatch': 20.0,
+}
+
+
+def chunks(items: List, size: int) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class RateLimiter:
+    """Token bucket; acquire() blocks until a call is allowed."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AwsExecutor:
+    """
+    Shared execution core for the aws_inspector scripts: one session, pooled clients
+    (created under a lock, with adaptive retries), one worker pool, per-service rate limits,
+    the shared response cache (response_cache.py), and helpers for pagination and batched
+    calls that run concurrently.
+    """
+
+    def __init__(self, region: str = 'us-east-1', max_workers: int = DEFAULT_MAX_WORKERS,
+                 rate_limits: Dict[str, float] = None, endpoint_url: str = None, session=None,
+                 cache: bool = True, refresh_cache: bool = False):
+        import boto3
+        from botocore.config import Config
+
+        self.region = region
+        self.session = session or boto3.Session(region_name=region)
+        # Must be installed before the first client is created; refresh_cache skips cached reads
+        self.cache = install_default(self.session, read=not refresh_cache) if cache else None
+        install_active(self.session)
+        self.endpoint_url = endpoint_url or os.environ.get(ENDPOINT_ENV)
+        self.config = Config(retries={'mode': 'adaptive', 'max_attempts': 10}, max_pool_connections=max_workers)
+        self.max_workers = max_workers
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._clients: Dict[str, Any] = {}
+        self._client_lock = threading.Lock()
+        self._limiters = {name: RateLimiter(rate) for name, rate in dict(DEFAULT_RATE_LIMITS, **(rate_limits or {})).items()}
+        self._account_id: Optional[str] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        if self.cache and (self.cache.hits or self.cache.misses):
+            logger.info(f"Response cache: {self.cache.hits} hits, {self.cache.misses} misses")
+
+    # --- Clients ---
+
+    def client(self, service: str):
+        """Returns a pooled client. Session.client() is not thread-safe, so creation is locked."""
+        with self._client_lock:
+            if service not in self._clients:
+                self._clients[service] = self.session.client(service, **self._client_kwargs())
+            return self._clients[service]
+
+    def resource(self, service: str):
+        """A new (not shared) boto3 resource; resources are not thread-safe, so each caller gets its own."""
+        with self._client_lock:
+            return self.session.resource(service, **self._client_kwargs())
+
+    def _client_kwargs(self) -> Dict:
+        kwargs = {'config': self.config}
+        if self.endpoint_url:
+            kwargs['endpoint_url'] = self.endpoint_url
+        return kwargs
+
+    @property
+    def account_id(self) -> str:
+        """Account of the session's credentials (sts get_caller_identity, asked once, never from the cache)."""
+        if self._account_id is None:
+            self._account_id = self.client('sts').get_caller_identity()['Account']
+        return self._account_id
+
+    def _throttle(self, service: str):
+        limiter = self._limiters.get(service) or self._limiters.get(self.client(service).meta.service_model.endpoint_prefix)
+        if limiter:
+            limiter.acquire()
+
+    # --- Calls ---
+
+    def call(self, service: str, operation: str, **kwargs) -> Dict:
+        self._throttle(service)
+        return getattr(self.client(service), operation)(**kwargs)
+
+    def paginate(self, service: str, operation: str, key: str, **kwargs) -> List[Dict]:
+        """Every item of a paginated call, throttled page by page."""
+        items = []
+        pages = self.client(service).get_paginator(operation).paginate(**kwargs)
+        iterator = iter(pages)
+        while True:
+            self._throttle(service)
+            page = next(iterator, None)
+            if page is None:
+                return items
+            items.extend(page.get(key, []))
+
+    def gather(self, calls: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """Runs named zero-argument callables concurrently; returns name -> result (raises the first error)."""
+        futures = {name: self.pool.submit(fn) for name, fn in calls.items()}
+        return {name: f.result() for name, f in futures.items()}
+
+    def paginate_many(self, requests: Dict[str, tuple]) -> Dict[str, List[Dict]]:
+        """
+        Several paginated listings at once:
+        {'enis': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces', {...kwargs}), ...}
+        """
+        return self.gather({name: (lambda r=r: self.paginate(r[0], r[1], r[2], **(r[3] if len(r) > 3 else {})))
+                            for name, r in requests.items()})
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """fn(item) for every item on the shared pool, results in input order."""
+        return list(self.pool.map(fn, items))
+
+    def batch_call(self, service: str, operation: str, param: str, items: List, size: int, **kwargs) -> List[Dict]:
+        """
+        Splits items into batches of `size` passed as `param` and issues the calls concurrently,
+        e.g. batch_call('ecs', 'describe_services', 'services', arns, 10, cluster=c).
+        """
+        return self.map(lambda batch: self.call(service, operation, **{param: batch}, **kwargs),
+                        list(chunks(items, size)))
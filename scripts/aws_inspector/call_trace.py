@@ -0,0 +1,156 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Set to a trace file path to trace every session (same as --profile on the scripts that have it)
+TRACE_ENV = 'AWS_INSPECTOR_TRACE'
+TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'call_trace.json')
+
+# Frames from these files make up the caller stacks (boto3/botocore frames are left out)
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAX_STACK_DEPTH = 12
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def _caller_stack() -> str:
+    """'module.function;module.function' of the scripts' own frames, outermost first."""
+    names = []
+    frame = sys._getframe(2)
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        path = frame.f_code.co_filename
+        if path.startswith(SCRIPTS_DIR) and path != _THIS_FILE:
+            names.append(f"{os.path.splitext(os.path.basename(path))[0]}.{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class CallTracer:
+    """
+    Records every AWS call of the sessions it is installed on (operation, latency, retries,
+    response size, cache hits, calling code) through botocore's before-call/after-call events.
+    Writes a Chrome trace (chrome://tracing, Perfetto) and folded stacks for flame graphs.
+    """
+
+    def __init__(self):
+        self.calls: List[Dict] = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._threads: Dict[int, str] = {}
+
+    def install(self, session):
+        session.events.register_first('before-call', self._before_call, unique_id='call-trace-start')
+        session.events.register_last('after-call', self._after_call, unique_id='call-trace-end')
+        session.events.register_last('after-call-error', self._after_call_error, unique_id='call-trace-error')
+
+    # --- botocore hooks ---
+
+    def _before_call(self, model, context, **kwargs):
+        context['call_trace'] = (time.perf_counter(), _caller_stack(), model.service_model.service_name, model.name)
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        meta = parsed.get('ResponseMetadata', {}) if isinstance(parsed, dict) else {}
+        size = http_response.headers.get('content-length')
+        if size is None and not model.has_streaming_output:
+            size = len(http_response.content or b'')
+        self._record(context, status=http_response.status_code, retries=meta.get('RetryAttempts', 0),
+                     size=int(size or 0), cached=bool(context.get('response_cache', {}).get('hit')))
+
+    def _after_call_error(self, exception, context, **kwargs):
+        # Connection errors and retries given up on (no HTTP response)
+        self._record(context, status=0, retries=0, size=0, cached=False, error=type(exception).__name__)
+
+    def _record(self, context, **fields):
+        started = context.pop('call_trace', None)
+        if started is None:
+            return
+        end = time.perf_counter()
+        thread = threading.current_thread()
+        call = {'service': started[2], 'operation': started[3], 'start': started[0] - self.started,
+                'duration': end - started[0], 'thread': thread.ident, 'stack': started[1], **fields}
+        with self._lock:
+            self.calls.append(call)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    # --- Output ---
+
+    def chrome_trace(self) -> Dict:
+        pid = os.getpid()
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                  for tid, name in self._threads.items()]
+        for c in self.calls:
+            events.append({
+                'name': f"{c['service']}.{c['operation']}", 'cat': c['service'], 'ph': 'X', 'pid': pid, 'tid': c['thread'],
+                'ts': round(c['start'] * 1e6), 'dur': round(c['duration'] * 1e6),
+                'args': {k: c[k] for k in ('status', 'retries', 'size', 'cached', 'stack', 'error') if c.get(k) is not None},
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def folded_stacks(self) -> List[str]:
+        """'caller;caller;service.Operation <microseconds>' lines (flamegraph.pl, speedscope)."""
+        totals = defaultdict(float)
+        for c in self.calls:
+            leaf = f"{c['service']}.{c['operation']}"
+            totals[f"{c['stack']};{leaf}" if c['stack'] else leaf] += c['duration'] * 1e6
+        return [f"{stack} {round(us)}" for stack, us in sorted(totals.items(), key=lambda x: -x[1])]
+
+    def summary(self, top: int = 15) -> List[str]:
+        """Slowest operations by total time, then the calling functions that spent the most time in AWS."""
+        by_op = defaultdict(list)
+        by_caller = defaultdict(float)
+        for c in self.calls:
+            by_op[f"{c['service']}.{c['operation']}"].append(c)
+            by_caller[c['stack'].rsplit(';', 1)[-1] or '(top level)'] += c['duration']
+        lines = [f"{len(self.calls)} AWS calls, {sum(c['duration'] for c in self.calls):.2f} s in calls, "
+                 f"{time.perf_counter() - self.started:.2f} s elapsed",
+                 f"{'Operation':<50} {'Calls':>6} {'Total s':>8} {'Mean ms':>8} {'Max ms':>8} {'Retries':>7} {'KB':>8} {'Cached':>6}"]
+        ranked = sorted(by_op.items(), key=lambda x: -sum(c['duration'] for c in x[1]))
+        for op, calls in ranked[:top]:
+            total = sum(c['duration'] for c in calls)
+            lines.append(f"{op:<50} {len(calls):>6} {total:>8.2f} {total / len(calls) * 1000:>8.1f} "
+                         f"{max(c['duration'] for c in calls) * 1000:>8.1f} {sum(c['retries'] for c in calls):>7} "
+                         f"{sum(c['size'] for c in calls) / 1024:>8.0f} {sum(c['cached'] for c in calls):>6}")
+        lines.append("Time in AWS calls by calling function:")
+        for caller, seconds in sorted(by_caller.items(), key=lambda x: -x[1])[:top]:
+            lines.append(f"  {seconds:>8.2f} s  {caller}")
+        return lines
+
+    def write(self, path: str = TRACE_FILE) -> str:
+        """Writes the Chrome trace to path and the folded stacks next to it (.folded). Returns that path."""
+        with self._lock:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.chrome_trace(), f)
+            folded = os.path.splitext(path)[0] + '.folded'
+            with open(folded, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(self.folded_stacks()) + '\n')
+        return folded
+
+
+_active: Optional[CallTracer] = None
+
+
+def enable(path: str = TRACE_FILE) -> CallTracer:
+    """Starts tracing every session installed from now on; the trace and summary are written at exit."""
+    global _active
+    if _active is None:
+        _active = CallTracer()
+
+        def finish():
+            folded = _active.write(path)
+            # stderr, so reports piped from stdout stay clean
+            print('\n'.join(_active.summary()), file=sys.stderr)
+            print(f"Chrome trace: {path}, flame graph stacks: {folded}", file=sys.stderr)
+        atexit.register(finish)
+    return _active
+
+
+def install_active(session):
+    """Traces the session if --profile or $AWS_INSPECTOR_TRACE is on; otherwise does nothing."""
+    if _active is None and os.environ.get(TRACE_ENV):
+        enable(os.environ[TRACE_ENV])
+    if _active is not None:
+        _active.install(session)
@@ -0,0 +1,117 @@
+import argparse
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Offline on-demand price snapshot, refreshed by hand (see "snapshot" inside)
+PRICING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pricing.json')
+
+# Relative size of instance classes within a family, for classes missing from the snapshot
+SIZE_UNITS = {'nano': 0.25, 'micro': 0.5, 'small': 1, 'medium': 2, 'large': 4, 'xlarge': 8}
+_CLASS = re.compile(r'^(?P<family>.+)\.(?:(?P<n>\d+)(?=xlarge))?(?P<size>nano|micro|small|medium|xlarge|large)$')
+
+
+def _size_units(instance_class: str) -> Optional[float]:
+    m = _CLASS.match(instance_class)
+    if not m:
+        return None
+    return SIZE_UNITS[m.group('size')] * int(m.group('n') or 1)
+
+
+class CostModel:
+    """
+    Estimated monthly cost of a resource: hourly/monthly fees from the pricing snapshot
+    plus usage the caller knows (instance class, storage, multi-AZ, GB processed).
+    Accepts CloudFormation types (inspector) and "<service>:<type>" (reader).
+    """
+
+    def __init__(self, pricing: Dict, region: str = None):
+        self.snapshot = pricing.get('snapshot')
+        self.hours = pricing.get('hours_per_month', 730)
+        self.multiplier = pricing.get('region_multipliers', {}).get(region, 1.0)
+        self.types: Dict[str, Dict] = pricing['types']
+        self.aliases = {p['reader_type']: t for t, p in self.types.items() if 'reader_type' in p}
+
+    @classmethod
+    def load(cls, path: str = PRICING_FILE, region: str = None) -> 'CostModel':
+        with open(path, 'r') as f:
+            return cls(json.load(f), region)
+
+    def canonical_type(self, rtype: str) -> Optional[str]:
+        if rtype in self.types:
+            return rtype
+        return self.aliases.get(rtype.lower() if rtype else rtype)
+
+    def class_hourly(self, price: Dict, instance_class: Optional[str]) -> float:
+        """Hourly price of a class; unknown sizes are scaled from a known size of the same family."""
+        classes = price['classes']
+        if instance_class in classes:
+            return classes[instance_class]
+        units = _size_units(instance_class) if instance_class else None
+        if units:
+            family = instance_class.rsplit('.', 1)[0]
+            for known, hourly in classes.items():
+                if known.rsplit('.', 1)[0] == family and _size_units(known):
+                    return hourly * units / _size_units(known)
+        return classes.get(price.get('default_class'), 0.0)
+
+    def monthly_cost(self, rtype: str, usage: Dict = None) -> Optional[float]:
+        """USD per month, or None if the type is not in the snapshot."""
+        price = self.types.get(self.canonical_type(rtype))
+        if price is None:
+            return None
+        usage = usage or {}
+        hourly = self.class_hourly(price, usage.get('class')) if 'classes' in price else price.get('hourly', 0.0)
+        if usage.get('multi_az'):
+            hourly *= price.get('multi_az_factor', 1.0)
+        storage_gb = usage.get('storage_gb', price.get('default_storage_gb', 0.0))
+        cost = (hourly * self.hours + price.get('monthly', 0.0)
+                + storage_gb * price.get('per_gb_month', 0.0)
+                + usage.get('processed_gb', 0.0) * price.get('per_gb_processed', 0.0))
+        return round(cost * self.multiplier, 2)
+
+
+def rank_by_savings(resources: Iterable[Dict], key: str = 'MonthlyCost') -> List[Dict]:
+    """Highest monthly cost first; resources without an estimate go last."""
+    return sorted(resources, key=lambda r: r.get(key) or 0.0, reverse=True)
+
+
+def total_savings(resources: Iterable[Dict], key: str = 'MonthlyCost') -> float:
+    return round(sum(r.get(key) or 0.0 for r in resources), 2)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    from tf_state import load_inventory
+
+    parser = argparse.ArgumentParser(description='Rank DELETE candidates by estimated monthly savings.')
+    parser.add_argument('--inventory', nargs='+', required=True,
+                        help='main.py --output-file .jsonl reports or aws-services-reader.md reports')
+    parser.add_argument('--region', default='us-east-1', help='Region the inventory is in (for the price multiplier)')
+    parser.add_argument('--top', type=int, default=20, help='How many candidates to list')
+    parser.add_argument('--all', action='store_true', help='Rank every resource, not only DELETE candidates')
+    args = parser.parse_args()
+
+    model = CostModel.load(region=args.region)
+    candidates = []
+    for path in args.inventory:
+        for r in load_inventory(path):
+            # Reader reports carry no Relevance; everything listed there is up for deletion
+            if args.all or r.get('Relevance') in (None, 'DELETE'):
+                r['MonthlyCost'] = model.monthly_cost(r['Type'])
+                candidates.append(r)
+
+    ranked = rank_by_savings(candidates)
+    logger.info(f"Pricing snapshot {model.snapshot}, region {args.region}")
+    logger.info(f"{len(ranked)} candidates, estimated savings ${total_savings(ranked):,.2f}/month")
+    logger.info("-" * 100)
+    for r in ranked[:args.top]:
+        cost = '       n/a' if r['MonthlyCost'] is None else f"{r['MonthlyCost']:>10,.2f}"
+        logger.info(f"{cost}  {r['Type']:<45} {r.get('Arn') or r.get('Identifier')}")
+
+if __name__ == "__main__":
+    main()
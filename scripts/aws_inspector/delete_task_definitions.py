@@ -1,77 +1,53 @@
-import boto3
 import argparse
 import logging
-from typing import Set, Dict, List
+import time
 from botocore.exceptions import ClientError
+from aws_core import AwsExecutor
+from ecs_activity import EcsActivityIndex, DEFAULT_TTL
+from task_definition_retention import RetentionEngine, stale_revisions, load_plan, plan_candidates
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def delete_task_definitions(region: str = 'us-east-1', dry_run: bool = True):
-    session = boto3.Session(region_name=region)
-    ecs = session.client('ecs')
+def delete_task_definitions(region: str = 'us-east-1', dry_run: bool = True, activity_ttl: float = DEFAULT_TTL,
+                            refresh_activity: bool = False, keep_last: int = 2, keep_days: int = 0,
+                            plan_file: str = None):
+    # Deletions (and forced rescans) are decided from live reads, never from the shared response cache
+    # or a persisted activity index
+    rescan = refresh_activity or not dry_run
+    core = AwsExecutor(region, refresh_cache=rescan)
+    ecs = core.client('ecs')
 
     logger.info(f"Starting Task Definition Cleanup in {region} (Dry Run: {dry_run})")
     
     try:
-        # 1. Identify ALL Active Task Definitions
-        active_task_arns: Set[str] = set()
-        
-        clusters = ecs.list_clusters().get('clusterArns', [])
-        logger.info(f"Scanning {len(clusters)} clusters for active usage...")
-
-        for cluster in clusters:
-            # Services
-            paginator = ecs.get_paginator('list_services')
-            for page in paginator.paginate(cluster=cluster):
-                service_arns = page.get('serviceArns', [])
-                if not service_arns: continue
-                
-                for i in range(0, len(service_arns), 10):
-                    batch = service_arns[i:i+10]
-                    services = ecs.describe_services(cluster=cluster, services=batch).get('services', [])
-                    for svc in services:
-                        active_task_arns.add(svc['taskDefinition'])
-                        for dep in svc.get('deployments', []):
-                            active_task_arns.add(dep['taskDefinition'])
-
-            # Tasks
-            paginator = ecs.get_paginator('list_tasks')
-            for page in paginator.paginate(cluster=cluster):
-                task_arns = page.get('taskArns', [])
-                if not task_arns: continue
-                
-                for i in range(0, len(task_arns), 100):
-                    batch = task_arns[i:i+100]
-                    tasks = ecs.describe_tasks(cluster=cluster, tasks=batch).get('tasks', [])
-                    for t in tasks:
-                        active_task_arns.add(t['taskDefinitionArn'])
-
-        logger.info(f"Found {len(active_task_arns)} active revisions.")
-
-        # 2. Find Candidates for Deletion
-        paginator = ecs.get_paginator('list_task_definition_families')
-        stale_candidates = []
-
-        for page in paginator.paginate(status='ACTIVE'):
-            for family in page.get('families', []):
-                # Fetch ACTIVE
-                actives = ecs.list_task_definitions(familyPrefix=family, status='ACTIVE', sort='DESC').get('taskDefinitionArns', [])
-                # Fetch INACTIVE
-                inactives = ecs.list_task_definitions(familyPrefix=family, status='INACTIVE', sort='DESC').get('taskDefinitionArns', [])
-                
-                # Merge and Sort High to Low (Newest Revision First)
-                all_arns = sorted(set(actives + inactives), key=lambda x: int(x.split(':')[-1]), reverse=True)
-                
-                # Keep Policy: Active OR Top 2 Most Recent
-                for i, arn in enumerate(all_arns):
-                    is_active = arn in active_task_arns
-                    # Top 2 most recent revisions (regardless of status) are "Recent Backups"
-                    is_recent = i < 2 
-                    
-                    if not is_active and not is_recent:
-                        stale_candidates.append(arn)
+        # 1. Identify ALL Active Task Definitions (services, deployments, tasks, schedules)
+        activity = EcsActivityIndex.load_or_build(core, ttl=activity_ttl, refresh=rescan)
+        logger.info(f"Found {len(activity.active_arns)} active revisions.")
+
+        if plan_file:
+            # Stale set computed earlier by find_unused_task_definitions.py --write-plan, re-checked
+            # against current activity; a plan is trusted no longer than the activity index
+            plan = load_plan(plan_file)
+            try:
+                stale = plan_candidates(plan, core.account_id, region, activity.active_arns, max_age=activity_ttl)
+            except ValueError as e:
+                logger.error(f"Refusing plan {plan_file}: {e}")
+                return
+            logger.info(f"Using retention plan {plan_file} ({int(time.time() - plan['created_at'])}s old, policy {plan['policy']})")
+            if 'INACTIVE' not in plan.get('statuses', ['ACTIVE']):
+                logger.warning("The plan only covers ACTIVE revisions; INACTIVE ones are left until a run without --plan.")
+        else:
+            # 2. Find Candidates for Deletion
+            # Keep Policy: Active OR Top keep_last Most Recent (regardless of status) OR newer than keep_days
+            engine = RetentionEngine(core, keep_last=keep_last, keep_days=keep_days,
+                                     active_arns=activity.active_arns, family_refs=activity.family_refs)
+            stale = stale_revisions(engine.evaluate(('ACTIVE', 'INACTIVE')))
+
+        stale_candidates = [r['arn'] for r in stale]
+        # Only ACTIVE revisions need deregistering before deletion
+        to_deregister = [r['arn'] for r in stale if r['status'] == 'ACTIVE']
 
         logger.info(f"Found {len(stale_candidates)} stale revisions eligible for deregistration.")
 
@@ -80,30 +56,20 @@ def delete_task_definitions(region: str = 'us-east-1', dry_run: bool = True):
             logger.info("No stale definitions found.")
             return
 
-        # 3. Executing Deletion
-        if not stale_candidates:
-            logger.info("No stale definitions found.")
-            return
-
-        # Step A: Deregister all candidates first (Required before deletion)
-        # Even if already INACTIVE, deregistering again is generally safe/idempotent or we can catch exceptions
-        if not dry_run:
-            logger.info("Step 1: Deregistering candidates to ensure INACTIVE state...")
-        
-        for arn in stale_candidates:
-            if dry_run:
+        if dry_run:
+            for arn in stale_candidates:
                 logger.info(f"[DRY RUN] Would deregister and then PERMANENTLY DELETE: {arn}")
-            else:
-                try:
-                    # We must ensure it is inactive.
-                    ecs.deregister_task_definition(taskDefinition=arn)
-                except ClientError as e:
-                    # If it's already inactive, that's fine, but let's log other errors
-                    logger.warning(f"Deregister warning for {arn}: {e}")
+            logger.info("\n[DRY RUN COMPLETE] No changes were made. Run with --force to PERMANENTLY DELETE.")
+            return
 
-        if dry_run:
-             logger.info("\n[DRY RUN COMPLETE] No changes were made. Run with --force to PERMANENTLY DELETE.")
-             return
+        # Step A: Deregister ACTIVE candidates first (Required before deletion)
+        logger.info(f"Step 1: Deregistering {len(to_deregister)} ACTIVE candidates to ensure INACTIVE state...")
+        for arn in to_deregister:
+            try:
+                ecs.deregister_task_definition(taskDefinition=arn)
+            except ClientError as e:
+                # If it's already inactive, that's fine, but let's log other errors
+                logger.warning(f"Deregister warning for {arn}: {e}")
 
         # Step B: Permanent Deletion (Batch of 10)
         logger.info("Step 2: Permanently Deleting candidates...")
@@ -132,12 +98,25 @@ def delete_task_definitions(region: str = 'us-east-1', dry_run: bool = True):
         logger.error(f"AWS Error: {e}")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+    finally:
+        core.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Deregister stale ECS Task Definitions.')
     parser.add_argument('--region', default='us-east-1', help='AWS Region')
     parser.add_argument('--force', action='store_true', help='Execute deletion (disable dry-run)')
+    parser.add_argument('--activity-ttl', type=float, default=DEFAULT_TTL, help='Reuse a saved ECS activity index younger than this (seconds)')
+    parser.add_argument('--refresh-activity', action='store_true', help='Always rescan clusters for active usage')
+    parser.add_argument('--keep-last', type=int, help='Always keep this many newest revisions per family (default: 2)')
+    parser.add_argument('--keep-days', type=int, help='Also keep revisions registered within this many days (default: 0)')
+    parser.add_argument('--plan', help='Delete the stale set from find_unused_task_definitions.py --write-plan instead of '
+                                       'rescanning (no older than --activity-ttl; revisions active since then are kept)')
 
     args = parser.parse_args()
+    if args.plan and (args.keep_last is not None or args.keep_days is not None):
+        parser.error('--keep-last/--keep-days cannot be combined with --plan; the plan was made with its own policy')
 
-    delete_task_definitions(region=args.region, dry_run=not args.force)
+    delete_task_definitions(region=args.region, dry_run=not args.force, activity_ttl=args.activity_ttl,
+                            refresh_activity=args.refresh_activity,
+                            keep_last=2 if args.keep_last is None else args.keep_last,
+                            keep_days=args.keep_days or 0, plan_file=args.plan)
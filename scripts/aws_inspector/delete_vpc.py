@@ -1,143 +1,272 @@
-import boto3
 import argparse
 import sys
 import time
 import logging
-from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+from botocore.exceptions import ClientError, WaiterError
+from aws_core import AwsExecutor
+from sg_graph import SecurityGroupGraph
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def delete_vpc(vpc_id, region='us-east-1', dry_run=True):
-    session = boto3.Session(region_name=region)
-    ec2 = session.resource('ec2')
-    ec2_client = session.client('ec2')
-    vpc = ec2.Vpc(vpc_id)
-
-    try:
-        # Verify VPC exists
-        vpc.load()
-    except ClientError:
-        logger.error(f"VPC {vpc_id} not found in {region}.")
-        return
+# Endpoint/NAT ENIs are released asynchronously, so dependent deletes are retried a few times
+DEPENDENCY_RETRIES = 4
+DEPENDENCY_BACKOFF = 5
+
+def collect_vpcs(core: AwsExecutor, vpc_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Fetches everything that must be torn down for the given VPCs with one paginated
+    call per collection (filtered on all VPC IDs at once, run concurrently), grouped by vpc-id.
+    """
+    vpcs = {}
+    # A filter (rather than VpcIds) skips unknown IDs instead of failing the whole call
+    for vpc in core.paginate('ec2', 'describe_vpcs', 'Vpcs', Filters=[{'Name': 'vpc-id', 'Values': vpc_ids}]):
+        vpcs[vpc['VpcId']] = {
+            'enis': [], 'peerings': set(), 'nats': [], 'nats_deleting': [], 'igws': [], 'endpoints': [],
+            'subnets': [], 'route_tables': [], 'acls': [], 'security_groups': [],
+        }
+
+    if not vpcs:
+        return vpcs
+    vpc_filter = {'Filters': [{'Name': 'vpc-id', 'Values': list(vpcs)}]}
+    # NAT Gateways use 'Filter' rather than 'Filters'
+    data = core.paginate_many({
+        'enis': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces', vpc_filter),
+        'requester': ('ec2', 'describe_vpc_peering_connections', 'VpcPeeringConnections',
+                      {'Filters': [{'Name': 'requester-vpc-info.vpc-id', 'Values': list(vpcs)}]}),
+        'accepter': ('ec2', 'describe_vpc_peering_connections', 'VpcPeeringConnections',
+                     {'Filters': [{'Name': 'accepter-vpc-info.vpc-id', 'Values': list(vpcs)}]}),
+        'nats': ('ec2', 'describe_nat_gateways', 'NatGateways', {'Filter': vpc_filter['Filters']}),
+        'igws': ('ec2', 'describe_internet_gateways', 'InternetGateways',
+                 {'Filters': [{'Name': 'attachment.vpc-id', 'Values': list(vpcs)}]}),
+        'endpoints': ('ec2', 'describe_vpc_endpoints', 'VpcEndpoints', vpc_filter),
+        'subnets': ('ec2', 'describe_subnets', 'Subnets', vpc_filter),
+        'route_tables': ('ec2', 'describe_route_tables', 'RouteTables', vpc_filter),
+        'acls': ('ec2', 'describe_network_acls', 'NetworkAcls', vpc_filter),
+        'security_groups': ('ec2', 'describe_security_groups', 'SecurityGroups', vpc_filter),
+    })
+
+    for eni in data['enis']:
+        vpcs[eni['VpcId']]['enis'].append(eni)
+
+    for side in ['requester', 'accepter']:
+        for pcx in data[side]:
+            if pcx['Status']['Code'] in ['deleted', 'deleting', 'rejected', 'failed', 'expired']:
+                continue
+            for info in ['RequesterVpcInfo', 'AccepterVpcInfo']:
+                owner = pcx.get(info, {}).get('VpcId')
+                if owner in vpcs:
+                    vpcs[owner]['peerings'].add(pcx['VpcPeeringConnectionId'])
+
+    # NATs already deleting are not deleted again, but subnets still have to wait for them
+    for nat in data['nats']:
+        if nat['State'] == 'deleting':
+            vpcs[nat['VpcId']]['nats_deleting'].append(nat['NatGatewayId'])
+        elif nat['State'] != 'deleted':
+            vpcs[nat['VpcId']]['nats'].append(nat['NatGatewayId'])
+
+    for igw in data['igws']:
+        for att in igw.get('Attachments', []):
+            if att['VpcId'] in vpcs:
+                vpcs[att['VpcId']]['igws'].append(igw['InternetGatewayId'])
+
+    for ep in data['endpoints']:
+        if ep.get('State', '').lower() not in ['deleted', 'deleting']:
+            vpcs[ep['VpcId']]['endpoints'].append(ep['VpcEndpointId'])
+
+    for subnet in data['subnets']:
+        vpcs[subnet['VpcId']]['subnets'].append(subnet['SubnetId'])
+
+    for rt in data['route_tables']:
+        if not any(assoc.get('Main') for assoc in rt.get('Associations', [])):
+            vpcs[rt['VpcId']]['route_tables'].append(rt['RouteTableId'])
+
+    for acl in data['acls']:
+        if not acl['IsDefault']:
+            vpcs[acl['VpcId']]['acls'].append(acl['NetworkAclId'])
+
+    # The default group is kept (it cannot be deleted) but may still reference the others
+    for sg in data['security_groups']:
+        vpcs[sg['VpcId']]['security_groups'].append(sg)
+
+    return vpcs
+
+def call_with_retry(fn, description: str, **kwargs) -> bool:
+    for attempt in range(DEPENDENCY_RETRIES):
+        try:
+            response = fn(**kwargs)
+            # Batch deletes (delete_vpc_endpoints) report per-item failures instead of raising
+            unsuccessful = response.get('Unsuccessful') if isinstance(response, dict) else None
+            for item in unsuccessful or []:
+                logger.error(f"Failed: {description}: {item.get('ResourceId')}: {item.get('Error', {}).get('Message')}")
+            return not unsuccessful
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            if code == 'DependencyViolation' and attempt < DEPENDENCY_RETRIES - 1:
+                time.sleep(DEPENDENCY_BACKOFF * (attempt + 1))
+                continue
+            logger.error(f"Failed: {description}: {e}")
+            return False
 
-    logger.info(f"Starting deletion process for VPC: {vpc_id} (Dry Run: {dry_run})")
+def run_wave(pool: ThreadPoolExecutor, name: str, tasks: List) -> bool:
+    """Runs (fn, description, kwargs) tasks concurrently; returns True if all succeeded."""
+    if not tasks:
+        return True
+    logger.info(f"Wave '{name}': {len(tasks)} operations")
+    futures = []
+    for fn, description, kwargs in tasks:
+        logger.info(f"  {description}")
+        futures.append(pool.submit(call_with_retry, fn, description, **kwargs))
+    return all(f.result() for f in futures)
+
+def deletable_groups(groups: List[Dict]) -> Set[str]:
+    return {sg['GroupId'] for sg in groups if sg['GroupName'] != 'default'}
+
+def sg_revoke_tasks(ec2, graph: SecurityGroupGraph, deletable: Set[str]) -> List:
+    """Only the references that would block deletion are revoked, one call per group and direction."""
+    revoke = {'ingress': ec2.revoke_security_group_ingress, 'egress': ec2.revoke_security_group_egress}
+    return [(revoke[r['Direction']], f"Revoke {len(r['IpPermissions'])} {r['Direction']} references of {r['GroupId']}",
+             {'GroupId': r['GroupId'], 'IpPermissions': r['IpPermissions']})
+            for r in graph.blocking_revocations(deletable)]
+
+def delete_vpcs(vpc_ids: List[str], region='us-east-1', dry_run=True, max_workers=16):
+    """
+    Tears down several VPCs in dependency waves on the shared AwsExecutor pool:
+    peerings/NATs/endpoints, then (after one batched NAT waiter) IGWs/subnets/route tables/ACLs,
+    then security groups (ordered by their reference graph), then the VPCs themselves.
+    """
+    # What gets deleted is decided from live reads (the ENI safety check above all), never from the shared cache
+    with AwsExecutor(region, max_workers=max_workers, refresh_cache=not dry_run) as core:
+        try:
+            vpcs = collect_vpcs(core, vpc_ids)
+        except ClientError as e:
+            logger.error(f"Could not describe VPCs {vpc_ids} in {region}: {e}")
+            return
+        _delete_collected(core, vpcs, vpc_ids, region, dry_run)
+
+def _delete_collected(core: AwsExecutor, vpcs: Dict[str, Dict], vpc_ids: List[str], region: str, dry_run: bool):
+    ec2 = core.client('ec2')
+    for vpc_id in vpc_ids:
+        if vpc_id not in vpcs:
+            logger.error(f"VPC {vpc_id} not found in {region}.")
 
     # 1. Check for Active Network Interfaces (Safety Check)
     # If there are ENIs, it means *something* is running (EC2, Lambda, RDS, ELB, etc.)
-    enis = list(vpc.network_interfaces.all())
-    if enis:
-        logger.warning(f"CRITICAL: Found {len(enis)} active Network Interfaces in this VPC.")
-        for eni in enis:
-            logger.warning(f"  - ENI: {eni.id} ({eni.description}) attached to {eni.attachment.get('InstanceId', 'N/A') if eni.attachment else 'N/A'}")
-        
-        logger.error("ABORTING: Cannot delete VPC with active resources. Manually terminate instances/services first.")
+    for vpc_id, r in list(vpcs.items()):
+        if r['enis']:
+            logger.warning(f"CRITICAL: Found {len(r['enis'])} active Network Interfaces in {vpc_id}.")
+            for eni in r['enis']:
+                logger.warning(f"  - ENI: {eni['NetworkInterfaceId']} ({eni.get('Description', '')}) attached to {eni.get('Attachment', {}).get('InstanceId', 'N/A')}")
+            logger.error(f"ABORTING {vpc_id}: Cannot delete VPC with active resources. Manually terminate instances/services first.")
+            del vpcs[vpc_id]
+
+    if not vpcs:
         return
 
-    # If dry run, we stop here before modifying anything (or simulate steps)
+    logger.info(f"Starting deletion process for VPCs: {', '.join(vpcs)} (Dry Run: {dry_run})")
+
+    # If dry run, we stop here before modifying anything
     if dry_run:
-        logger.info("[DRY RUN] Safety check passed (0 active ENIs). The following actions would be performed:")
-        logger.info(f"  - Delete {len(list(vpc.internet_gateways.all()))} Internet Gateways")
-        logger.info(f"  - Delete {len(list(vpc.subnets.all()))} Subnets")
-        logger.info(f"  - Delete {len(list(vpc.route_tables.all()))} Route Tables")
-        logger.info(f"  - Delete {len(list(vpc.security_groups.all()))} Security Groups")
-        logger.info(f"  - Delete {len(list(vpc.network_acls.all()))} Network ACLs")
-        logger.info(f"  - Delete VPC {vpc_id}")
+        for vpc_id, r in vpcs.items():
+            logger.info(f"[DRY RUN] {vpc_id}: Safety check passed (0 active ENIs). The following actions would be performed:")
+            logger.info(f"  - Delete {len(r['peerings'])} Peering Connections")
+            logger.info(f"  - Delete {len(r['nats'])} NAT Gateways (and wait for {len(r['nats_deleting'])} already deleting)")
+            logger.info(f"  - Delete {len(r['igws'])} Internet Gateways")
+            logger.info(f"  - Delete {len(r['endpoints'])} VPC Endpoints")
+            logger.info(f"  - Delete {len(r['subnets'])} Subnets")
+            logger.info(f"  - Delete {len(r['route_tables'])} Route Tables")
+            graph = SecurityGroupGraph(r['security_groups'])
+            deletable = deletable_groups(r['security_groups'])
+            logger.info(f"  - Revoke rules on {len(graph.blocking_revocations(deletable))} Security Group directions (cyclic/default references only)")
+            logger.info(f"  - Delete {len(deletable)} Security Groups")
+            logger.info(f"  - Delete {len(r['acls'])} Network ACLs")
+            logger.info(f"  - Delete VPC {vpc_id}")
         return
 
     # ---------------- DELETION PHASE ----------------
 
-    # 2. Delete VPC Peering Connections
-    for peering in vpc.accepted_vpc_peering_connections.all():
-        if peering.status['Code'] != 'deleted':
-             logger.info(f"Deleting Peering Connection {peering.id}")
-             peering.delete()
-    
-    for peering in vpc.requested_vpc_peering_connections.all():
-        if peering.status['Code'] != 'deleted':
-            logger.info(f"Deleting Peering Connection {peering.id}")
-            peering.delete()
-
-    # 3. Delete NAT Gateways
-    # Need to use client for this usually
-    nat_gateways = ec2_client.describe_nat_gateways(Filter=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['NatGateways']
-    for nat in nat_gateways:
-        if nat['State'] != 'deleted':
-            logger.info(f"Deleting NAT Gateway {nat['NatGatewayId']}")
-            ec2_client.delete_nat_gateway(NatGatewayId=nat['NatGatewayId'])
-            
-            # Application must wait for NAT to be deleted before deleting subnets
-            while True:
-                time.sleep(5)
-                check = ec2_client.describe_nat_gateways(NatGatewayIds=[nat['NatGatewayId']])
-                state = check['NatGateways'][0]['State']
-                logger.info(f"  Waiting for NAT {nat['NatGatewayId']} to delete... ({state})")
-                if state == 'deleted':
-                    break
-
-    # 4. Detach and Delete Internet Gateways
-    for igw in vpc.internet_gateways.all():
-        logger.info(f"Detaching and Deleting Internet Gateway {igw.id}")
-        igw.detach_from_vpc(VpcId=vpc_id)
-        igw.delete()
-
-    # 5. Delete VPC Endpoints
-    params = {'Filters': [{'Name': 'vpc-id', 'Values': [vpc_id]}]}
-    endpoints = ec2_client.describe_vpc_endpoints(**params)['VpcEndpoints']
-    if endpoints:
-        ids = [ep['VpcEndpointId'] for ep in endpoints]
-        logger.info(f"Deleting VPC Endpoints: {ids}")
-        ec2_client.delete_vpc_endpoints(VpcEndpointIds=ids)
-
-    # 6. Delete Subnets
-    for subnet in vpc.subnets.all():
-        logger.info(f"Deleting Subnet {subnet.id}")
-        subnet.delete()
-
-    # 7. Delete Route Tables
-    for rt in vpc.route_tables.all():
-        is_main = False
-        for assoc in rt.associations:
-            if assoc.main:
-                is_main = True
-                break
-        if not is_main:
-            logger.info(f"Deleting Route Table {rt.id}")
-            rt.delete()
-
-    # 8. Delete Network ACLs
-    for acl in vpc.network_acls.all():
-        if not acl.is_default:
-            logger.info(f"Deleting Network ACL {acl.id}")
-            acl.delete()
-
-    # 9. Delete Security Groups
-    # First, revoke all ingress/egress rules to break dependencies between groups
-    for sg in vpc.security_groups.all():
-        if sg.group_name != 'default':
-            logger.info(f"Revoking rules for Security Group {sg.id}")
-            if sg.ip_permissions:
-                sg.revoke_ingress(IpPermissions=sg.ip_permissions)
-            if sg.ip_permissions_egress:
-                sg.revoke_egress(IpPermissions=sg.ip_permissions_egress)
-
-    for sg in vpc.security_groups.all():
-        if sg.group_name != 'default':
-            logger.info(f"Deleting Security Group {sg.id}")
-            sg.delete()
-
-    # 10. Delete VPC
-    logger.info(f"Deleting VPC {vpc_id}...")
-    vpc.delete()
-    logger.info("VPC Deleted Successfully.")
+    pool = core.pool
+
+    # 2. Peerings, NAT Gateways and Endpoints have no ordering between them
+    wave = []
+    nat_ids = []
+    ok = True
+    for vpc_id, r in vpcs.items():
+        nat_ids.extend(r['nats_deleting'])
+        for pcx_id in r['peerings']:
+            wave.append((ec2.delete_vpc_peering_connection, f"Delete Peering Connection {pcx_id}",
+                         {'VpcPeeringConnectionId': pcx_id}))
+        for nat_id in r['nats']:
+            nat_ids.append(nat_id)
+            wave.append((ec2.delete_nat_gateway, f"Delete NAT Gateway {nat_id}", {'NatGatewayId': nat_id}))
+        if r['endpoints']:
+            wave.append((ec2.delete_vpc_endpoints, f"Delete VPC Endpoints {r['endpoints']}",
+                         {'VpcEndpointIds': r['endpoints']}))
+    ok &= run_wave(pool, 'gateways', wave)
+
+    # 3. Subnets and IGWs (NAT public IPs) can only go once every NAT has finished deleting;
+    # one waiter covers all of them
+    if nat_ids:
+        logger.info(f"Waiting for {len(nat_ids)} NAT Gateways to delete...")
+        try:
+            ec2.get_waiter('nat_gateway_deleted').wait(NatGatewayIds=nat_ids, WaiterConfig={'Delay': 10, 'MaxAttempts': 60})
+        except WaiterError as e:
+            blocked = [vpc_id for vpc_id, r in vpcs.items() if r['nats'] or r['nats_deleting']]
+            logger.error(f"NAT Gateways did not finish deleting ({e}). Skipping the rest of the teardown for "
+                         f"{', '.join(blocked)}; re-run once they are gone.")
+            for vpc_id in blocked:
+                del vpcs[vpc_id]
+            ok = False
+
+    # 4. Internet Gateways, Subnets, Route Tables and Network ACLs
+    wave = []
+    for vpc_id, r in vpcs.items():
+        wave += [(detach_and_delete_igw(ec2, i, vpc_id), f"Detach and Delete Internet Gateway {i}", {}) for i in r['igws']]
+        wave += [(ec2.delete_subnet, f"Delete Subnet {i}", {'SubnetId': i}) for i in r['subnets']]
+        wave += [(ec2.delete_route_table, f"Delete Route Table {i}", {'RouteTableId': i}) for i in r['route_tables']]
+        wave += [(ec2.delete_network_acl, f"Delete Network ACL {i}", {'NetworkAclId': i}) for i in r['acls']]
+    ok &= run_wave(pool, 'subnets', wave)
+
+    # 5. Security Groups: break only cyclic references (and references from the kept default
+    # groups), then delete in reference order so no group is still named by another one
+    graph = SecurityGroupGraph(sg for r in vpcs.values() for sg in r['security_groups'])
+    deletable = deletable_groups(graph.groups.values())
+    ok &= run_wave(pool, 'security group rules', sg_revoke_tasks(ec2, graph, deletable))
+    for i, wave in enumerate(graph.deletion_waves(deletable), 1):
+        ok &= run_wave(pool, f'security groups {i}', [(ec2.delete_security_group, f"Delete Security Group {gid}",
+                                                  {'GroupId': gid}) for gid in wave])
+
+    # 6. VPCs
+    ok &= run_wave(pool, 'vpcs', [(ec2.delete_vpc, f"Delete VPC {vpc_id}", {'VpcId': vpc_id}) for vpc_id in vpcs])
+
+    if ok:
+        logger.info("VPCs Deleted Successfully.")
+    else:
+        logger.error("Some deletions failed; see errors above.")
+
+def detach_and_delete_igw(ec2, igw_id: str, vpc_id: str):
+    detached = []
+    def run():
+        # Retries must not detach twice
+        if not detached:
+            ec2.detach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
+            detached.append(True)
+        ec2.delete_internet_gateway(InternetGatewayId=igw_id)
+    return run
+
+def delete_vpc(vpc_id, region='us-east-1', dry_run=True):
+    delete_vpcs([vpc_id], region, dry_run)
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Delete an AWS VPC and its dependencies.')
-    parser.add_argument('--vpc-id', required=True, help='The ID of the VPC to delete')
+    parser = argparse.ArgumentParser(description='Delete AWS VPCs and their dependencies.')
+    parser.add_argument('--vpc-id', required=True, nargs='+', help='The ID(s) of the VPC(s) to delete')
     parser.add_argument('--region', default='us-east-1', help='AWS Region')
+    parser.add_argument('--max-workers', type=int, default=16, help='Concurrent delete calls shared by all VPCs')
     parser.add_argument('--force', action='store_true', help='Execute deletion (disable dry-run)')
 
     args = parser.parse_args()
 
-    delete_vpc(args.vpc_id, args.region, dry_run=not args.force)
+    delete_vpcs(args.vpc_id, args.region, dry_run=not args.force, max_workers=args.max_workers)
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+from botocore.exceptions import ClientError
+from aws_core import AwsExecutor, chunks
+
+logger = logging.getLogger(__name__)
+
+# Persisted next to the scripts so find_unused_task_definitions.py and delete_task_definitions.py share one crawl
+ACTIVITY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ecs_activity_index.json')
+
+# Reuse a persisted index for this long (seconds) before crawling again
+DEFAULT_TTL = 900
+
+# Kinds of usage recorded per task definition
+SERVICE = 'service'
+DEPLOYMENT = 'deployment'
+RUNNING_TASK = 'task'
+STOPPED_TASK = 'stopped-task'
+SCHEDULED = 'schedule'
+
+
+class EcsActivityIndex:
+    """
+    Which task definitions are in use, and by what: services, in-flight deployments, running
+    tasks, recently stopped tasks and EventBridge scheduled targets.
+    Clusters are crawled concurrently; the result is persisted per account and region and reused within a TTL.
+    """
+
+    def __init__(self, region: str, account: str, uses: Dict[str, List[str]] = None, built_at: float = None):
+        self.region = region
+        self.account = account
+        self.uses: Dict[str, List[str]] = uses or {}   # task definition ARN -> ["<kind>:<where>", ...]
+        self.built_at = built_at or time.time()
+
+    @property
+    def active_arns(self) -> Set[str]:
+        """Revision ARNs in use. Unversioned ARNs (EventBridge targets may use one) are in family_refs."""
+        return {arn for arn in self.uses if arn.count(':') == 6}
+
+    @property
+    def family_refs(self) -> Set[str]:
+        """Families referenced without a revision, i.e. 'latest ACTIVE revision'."""
+        return {arn.split('/')[-1] for arn in self.uses if arn.count(':') == 5}
+
+    def is_active(self, arn: str) -> bool:
+        return arn in self.uses
+
+    def reasons(self, arn: str) -> List[str]:
+        return self.uses.get(arn, [])
+
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    @staticmethod
+    def key(account: str, region: str) -> str:
+        return f"{account}/{region}"
+
+    # --- Building ---
+
+    @classmethod
+    def build(cls, core: AwsExecutor) -> 'EcsActivityIndex':
+        index = cls(core.region, core.account_id)
+
+        clusters = core.paginate('ecs', 'list_clusters', 'clusterArns')
+        logger.info(f"Scanning {len(clusters)} ECS Clusters for active usage...")
+
+        calls = {c: (lambda c=c: cls._crawl_cluster(core, c)) for c in clusters}
+        calls[SCHEDULED] = lambda: cls._crawl_schedules(core.client('events'))
+        for found in core.gather(calls).values():
+            for arn, reason in found:
+                index._add(arn, reason)
+
+        logger.info(f"Found {len(index.active_arns)} uniquely active Task Definition Revisions.")
+        return index
+
+    def _add(self, arn: str, reason: str):
+        reasons = self.uses.setdefault(arn, [])
+        if reason not in reasons:
+            reasons.append(reason)
+
+    @staticmethod
+    def _crawl_cluster(core: AwsExecutor, cluster: str) -> List[tuple]:
+        found = []
+        name = cluster.split('/')[-1]
+
+        # describe_services has a limit of 10
+        for batch in chunks(core.paginate('ecs', 'list_services', 'serviceArns', cluster=cluster), 10):
+            for svc in core.call('ecs', 'describe_services', cluster=cluster, services=batch).get('services', []):
+                where = f"{name}/{svc['serviceName']}"
+                found.append((svc['taskDefinition'], f"{SERVICE}:{where}"))
+                for dep in svc.get('deployments', []):
+                    found.append((dep['taskDefinition'], f"{DEPLOYMENT}:{where}"))
+
+        # Running tasks, plus the stopped ones ECS still remembers (about an hour)
+        for desired, kind in [('RUNNING', RUNNING_TASK), ('STOPPED', STOPPED_TASK)]:
+            task_arns = core.paginate('ecs', 'list_tasks', 'taskArns', cluster=cluster, desiredStatus=desired)
+            for batch in chunks(task_arns, 100):
+                for t in core.call('ecs', 'describe_tasks', cluster=cluster, tasks=batch).get('tasks', []):
+                    found.append((t['taskDefinitionArn'], f"{kind}:{name}/{t.get('group', '')}"))
+        return found
+
+    @staticmethod
+    def _crawl_schedules(events, max_workers: int = 4) -> List[tuple]:
+        rules = []
+        try:
+            for page in events.get_paginator('list_rules').paginate():
+                rules.extend(r['Name'] for r in page.get('Rules', []))
+        except ClientError as e:
+            logger.warning(f"Could not list EventBridge rules; scheduled task usage is unknown: {e}")
+            return []
+
+        def targets(rule):
+            found = []
+            for page in events.get_paginator('list_targets_by_rule').paginate(Rule=rule):
+                for target in page.get('Targets', []):
+                    arn = target.get('EcsParameters', {}).get('TaskDefinitionArn')
+                    if arn:
+                        found.append((arn, f"{SCHEDULED}:{rule}"))
+            return found
+
+        # A separate pool: waiting on the shared pool from one of its own workers could deadlock
+        found = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for result in pool.map(targets, rules):
+                found.extend(result)
+        return found
+
+    # --- Persistence ---
+
+    @classmethod
+    def load(cls, region: str, account: str, path: str = ACTIVITY_FILE,
+             ttl: float = DEFAULT_TTL) -> Optional['EcsActivityIndex']:
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f).get(cls.key(account, region))
+        except Exception as e:
+            logger.warning(f"Could not read ECS activity index from {path}: {e}")
+            return None
+        if not data or time.time() - data['built_at'] > ttl:
+            return None
+        return cls(region, account, data['uses'], data['built_at'])
+
+    def save(self, path: str = ACTIVITY_FILE):
+        if not path:
+            return
+        try:
+            data = {}
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            data[self.key(self.account, self.region)] = {'built_at': self.built_at, 'uses': self.uses}
+            with open(path, 'w') as f:
+                json.dump(data, f)
+        except Exception as e:
+            logger.warning(f"Could not save ECS activity index to {path}: {e}")
+
+    @classmethod
+    def load_or_build(cls, core: AwsExecutor, ttl: float = DEFAULT_TTL, refresh: bool = False,
+                      path: str = ACTIVITY_FILE) -> 'EcsActivityIndex':
+        """Returns the persisted index for the core's account and region if younger than ttl, else crawls and saves."""
+        if not refresh:
+            index = cls.load(core.region, core.account_id, path, ttl)
+            if index:
+                logger.info(f"Reusing ECS activity index from {int(index.age())}s ago "
+                            f"({len(index.active_arns)} active revisions). Use --refresh-activity to rescan.")
+                return index
+        index = cls.build(core)
+        index.save(path)
+        return index
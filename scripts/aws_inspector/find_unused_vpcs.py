@@ -1,107 +1,169 @@
-import boto3
 import logging
+from collections import Counter
 from botocore.exceptions import ClientError
 from typing import List, Dict
+from aws_core import AwsExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+# Peering connections in these states no longer link two VPCs
+INACTIVE_PEERING_STATES = ['deleted', 'rejected', 'failed', 'expired']
+
+def eni_owner(eni: Dict) -> str:
+    """Best-effort label for what an ENI belongs to (EC2, ELB, Lambda, NAT, ...)."""
+    interface_type = eni.get('InterfaceType', 'interface')
+    if interface_type != 'interface':
+        return interface_type
+    if eni.get('Attachment', {}).get('InstanceId'):
+        return 'ec2-instance'
+    requester = eni.get('RequesterId', '')
+    if requester.startswith('amazon-'):
+        return requester
+    description = eni.get('Description', '')
+    if description.startswith('ELB '):
+        return 'elb'
+    if description.startswith('AWS Lambda VPC ENI'):
+        return 'lambda'
+    if description.startswith('arn:aws:ecs'):
+        return 'ecs-task'
+    return 'interface'
+
+def analyze_vpc_usage(core: AwsExecutor) -> Dict[str, Dict]:
+    """
+    Computes usage for every VPC in the region with one paginated call per collection
+    (VPCs, ENIs, subnets, IGWs, NATs, route tables, endpoints, peerings), fetched concurrently
+    and grouped by vpc-id in memory.
+    """
+    data = core.paginate_many({
+        'vpcs': ('ec2', 'describe_vpcs', 'Vpcs'),
+        'enis': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces'),
+        'subnets': ('ec2', 'describe_subnets', 'Subnets'),
+        'igws': ('ec2', 'describe_internet_gateways', 'InternetGateways'),
+        'nats': ('ec2', 'describe_nat_gateways', 'NatGateways'),
+        'route_tables': ('ec2', 'describe_route_tables', 'RouteTables'),
+        'endpoints': ('ec2', 'describe_vpc_endpoints', 'VpcEndpoints'),
+        'peerings': ('ec2', 'describe_vpc_peering_connections', 'VpcPeeringConnections'),
+    })
+
+    usage = {}
+    for vpc in data['vpcs']:
+        name = next((t['Value'] for t in vpc.get('Tags', []) if t['Key'] == 'Name'), "N/A")
+        usage[vpc['VpcId']] = {
+            'id': vpc['VpcId'],
+            'name': name,
+            'cidr': vpc['CidrBlock'],
+            'is_default': vpc['IsDefault'],
+            'enis': 0,
+            'eni_owners': Counter(),
+            'subnets': 0,
+            'igws': 0,
+            'nats': 0,
+            'route_tables': 0,
+            'endpoints': 0,
+            'peerings': [],
+        }
+
+    # 1. Network Interfaces (ENIs)
+    # ENIs are attached to EC2, RDS, ELB, Lambda, NAT Gateways, etc.
+    # This is the single best indicator of "active usage".
+    for eni in data['enis']:
+        u = usage.get(eni.get('VpcId'))
+        if u:
+            u['enis'] += 1
+            u['eni_owners'][eni_owner(eni)] += 1
+
+    # 2. Subnets
+    for subnet in data['subnets']:
+        u = usage.get(subnet.get('VpcId'))
+        if u:
+            u['subnets'] += 1
+
+    # 3. Internet Gateways (an IGW can in theory carry several attachments)
+    for igw in data['igws']:
+        for att in igw.get('Attachments', []):
+            u = usage.get(att.get('VpcId'))
+            if u:
+                u['igws'] += 1
+
+    # 4. NAT Gateways
+    for nat in data['nats']:
+        u = usage.get(nat.get('VpcId'))
+        if u and nat['State'] != 'deleted':
+            u['nats'] += 1
+
+    # 5. Route Tables
+    for rt in data['route_tables']:
+        u = usage.get(rt.get('VpcId'))
+        if u:
+            u['route_tables'] += 1
+
+    # 6. VPC Endpoints (gateway endpoints have no ENIs, so they are counted separately)
+    for ep in data['endpoints']:
+        u = usage.get(ep.get('VpcId'))
+        if u and ep.get('State', '').lower() not in ['deleted', 'deleting']:
+            u['endpoints'] += 1
+
+    # 7. Peering Connections (recorded on both sides)
+    for pcx in data['peerings']:
+        if pcx.get('Status', {}).get('Code') in INACTIVE_PEERING_STATES:
+            continue
+        requester = pcx.get('RequesterVpcInfo', {}).get('VpcId')
+        accepter = pcx.get('AccepterVpcInfo', {}).get('VpcId')
+        for own, peer in [(requester, accepter), (accepter, requester)]:
+            u = usage.get(own)
+            if u:
+                u['peerings'].append({'id': pcx['VpcPeeringConnectionId'], 'peer_vpc': peer})
+
+    return usage
+
 def get_vpc_details(region: str = 'us-east-1'):
-    session = boto3.Session(region_name=region)
-    ec2 = session.client('ec2')
+    core = AwsExecutor(region)
 
     try:
-        # Get all VPCs
-        vpcs_response = ec2.describe_vpcs()
-        vpcs = vpcs_response.get('Vpcs', [])
-        
-        logger.info(f"Found {len(vpcs)} VPCs in {region}")
+        usage = analyze_vpc_usage(core)
+
+        logger.info(f"Found {len(usage)} VPCs in {region}")
         logger.info("-" * 80)
         logger.info(f"{'VPC ID':<20} | {'Name':<25} | {'CIDR':<15} | {'Is Default':<10} | {'Status'}")
         logger.info("-" * 80)
 
         unused_candidates = []
 
-        for vpc in vpcs:
-            vpc_id = vpc['VpcId']
-            is_default = vpc['IsDefault']
-            cidr = vpc['CidrBlock']
-            
-            # Get Name tag
-            name = "N/A"
-            if 'Tags' in vpc:
-                for tag in vpc['Tags']:
-                    if tag['Key'] == 'Name':
-                        name = tag['Value']
-
-            # Check for active resources
-            
-            # 1. Network Interfaces (ENIs)
-            # ENIs are attached to EC2, RDS, ELB, Lambda, NAT Gateways, etc.
-            # This is the single best indicator of "active usage".
-            enis = ec2.describe_network_interfaces(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['NetworkInterfaces']
-            eni_count = len(enis)
-
-            # 2. Subnets
-            subnets = ec2.describe_subnets(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['Subnets']
-            subnet_count = len(subnets)
-
-            # 3. Internet Gateways
-            igws = ec2.describe_internet_gateways(Filters=[{'Name': 'attachment.vpc-id', 'Values': [vpc_id]}])['InternetGateways']
-            igw_count = len(igws)
-            
-            # 4. NAT Gateways
-            nat_gateways = ec2.describe_nat_gateways(Filter=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['NatGateways']
-            active_nats = [n for n in nat_gateways if n['State'] != 'deleted']
-            nat_count = len(active_nats)
-
-            # 5. Route Tables
-            rts = ec2.describe_route_tables(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['RouteTables']
-            rt_count = len(rts)
-
+        for vpc_id, u in usage.items():
             # Determine if unused
             # Basic heuristic: No ENIs typically means nothing is running inside.
             # However, it might have structural components (subnets, gateways) but no compute.
             status = "ACTIVE"
-            details = []
-            
-            if eni_count == 0:
+            if u['enis'] == 0:
                 status = "LIKELY UNUSED"
-                details.append("No Active Interfaces")
-            else:
-                details.append(f"{eni_count} ENIs")
-                
-            if active_nats:
-                details.append(f"{nat_count} NATs")
-            
-            logger.info(f"{vpc_id:<20} | {name:<25} | {cidr:<15} | {str(is_default):<10} | {status}")
-            
+
+            logger.info(f"{vpc_id:<20} | {u['name']:<25} | {u['cidr']:<15} | {str(u['is_default']):<10} | {status}")
+
             if status == "LIKELY UNUSED":
-                unused_candidates.append({
-                    'id': vpc_id,
-                    'name': name,
-                    'is_default': is_default,
-                    'resources': {
-                        'subnets': subnet_count,
-                        'igws': igw_count,
-                        'route_tables': rt_count,
-                        'nats': nat_count
-                    }
-                })
+                unused_candidates.append(u)
+            else:
+                owners = ", ".join(f"{k}={v}" for k, v in u['eni_owners'].most_common())
+                logger.info(f"  {u['enis']} ENIs ({owners})")
 
         logger.info("-" * 80)
-        
+
         if unused_candidates:
             logger.info("\n[!] DETAILED ANALYSIS OF UNUSED VPCs:")
-            for candidate in unused_candidates:
-                c = candidate
+            for c in unused_candidates:
                 logger.info(f"VPC: {c['id']} ({c['name']})")
                 logger.info(f"  - Default VPC: {c['is_default']}")
-                logger.info(f"  - Subnets: {c['resources']['subnets']}")
-                logger.info(f"  - Route Tables: {c['resources']['route_tables']}")
-                logger.info(f"  - Internet Gateways: {c['resources']['igws']}")
-                logger.info(f"  - NAT Gateways: {c['resources']['nats']}")
+                logger.info(f"  - Subnets: {c['subnets']}")
+                logger.info(f"  - Route Tables: {c['route_tables']}")
+                logger.info(f"  - Internet Gateways: {c['igws']}")
+                logger.info(f"  - NAT Gateways: {c['nats']}")
+                logger.info(f"  - VPC Endpoints: {c['endpoints']}")
+                if c['peerings']:
+                    peers = ", ".join(f"{p['id']} -> {p['peer_vpc']}" for p in c['peerings'])
+                    logger.info(f"  - Peering Connections: {peers}")
+                else:
+                    logger.info("  - Peering Connections: 0")
                 logger.info("  - Recommendation: CHECK IF REQUIRED. If just empty scaffolding, safe to delete.")
                 logger.info("")
         else:
@@ -111,6 +173,8 @@ def get_vpc_details(region: str = 'us-east-1'):
         logger.error(f"AWS Error: {e}")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
+    finally:
+        core.close()
 
 if __name__ == "__main__":
     get_vpc_details()
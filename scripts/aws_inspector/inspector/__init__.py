@@ -0,0 +1,15 @@
+"""
+AWS Resource Inspector.
+
+The engine is split by stage, and AWSResourceInspector combines them:
+    scanning    - Resource Group discovery
+    enrichment  - tags via the Tagging API
+    metrics     - CloudWatch usage metrics
+    assessment  - KEEP/DELETE decisions
+    deletion    - cleanup of DELETE candidates (see cleanup_executor)
+
+tag_index holds the inverted tag index shared by enrichment and tag_compliance.py.
+"""
+from .core import AWSResourceInspector
+
+__all__ = ['AWSResourceInspector']
@@ -0,0 +1,176 @@
+import logging
+from typing import List, Dict
+
+from .lookups import ADDRESSES, TASK_DEFINITION_FAMILIES, LOAD_BALANCERS, NAT_GATEWAYS, DB_INSTANCES
+
+logger = logging.getLogger(__name__)
+
+# Account-wide lookup each resource type needs during assessment
+LOOKUPS_BY_TYPE = {
+    'AWS::EC2::EIP': ADDRESSES,
+    'AWS::ECS::TaskDefinition': TASK_DEFINITION_FAMILIES,
+    'AWS::ElasticLoadBalancingV2::LoadBalancer': LOAD_BALANCERS,
+    'AWS::EC2::NatGateway': NAT_GATEWAYS,
+    'AWS::RDS::DBInstance': DB_INSTANCES,
+}
+
+
+class AssessmentMixin:
+    """KEEP/DELETE decisions based on usage metrics and account-wide lookups."""
+
+    def assess_relevance(self, active_project_tag: str = None) -> List[Dict]:
+        """
+        Analyzes resources to decide if they should be kept or deleted using specific usage metrics.
+        """
+        return list(self.iter_assessments(active_project_tag))
+
+    def iter_assessments(self, active_project_tag: str = None):
+        """
+        Same as assess_relevance, but yields each resource as soon as it has been assessed.
+        """
+        logger.info("Assessing resource relevance using CloudWatch metrics (7-day window)...")
+
+        # Fetch the account-wide lookups needed by the types present (once, in parallel)
+        present_types = {r['Type'] for r in self.discovered_resources}
+        needed = [name for rtype, name in LOOKUPS_BY_TYPE.items() if rtype in present_types]
+        self.lookups.prefetch(needed)
+        family_index = self.lookups.get(TASK_DEFINITION_FAMILIES) if TASK_DEFINITION_FAMILIES in needed else None
+        address_index = self.lookups.get(ADDRESSES) if ADDRESSES in needed else None
+        lb_index = self.lookups.get(LOAD_BALANCERS) if LOAD_BALANCERS in needed else None
+        nat_index = self.lookups.get(NAT_GATEWAYS) if NAT_GATEWAYS in needed else None
+        db_index = self.lookups.get(DB_INSTANCES) if DB_INSTANCES in needed else None
+
+        # Pre-process Task Definitions to find the latest revisions per family
+        task_def_families = {}
+        for r in self.discovered_resources:
+            if r['Type'] == 'AWS::ECS::TaskDefinition':
+                arn = r['Arn']
+                try:
+                    # arn:aws:ecs:region:account:task-definition/family:revision
+                    family_revision = arn.split('/')[-1]
+                    family, revision = family_revision.split(':')
+                    if family not in task_def_families:
+                        task_def_families[family] = []
+                    task_def_families[family].append({'arn': arn, 'rev': int(revision), 'resource': r})
+                except Exception:
+                    pass
+
+        stale_task_arns = set()
+        for family, items in task_def_families.items():
+            # Prefer the account-wide revision list so "last 2" means the family's newest revisions
+            if family_index and family in family_index:
+                items = family_index[family]
+            else:
+                items.sort(key=lambda x: x['rev'], reverse=True)
+            for item in items[2:]:
+                stale_task_arns.add(item['arn'])
+
+        # Pre-process EIPs to check association
+        unattached_eips = set()
+        if address_index is not None:
+            for r in self.discovered_resources:
+                if r['Type'] == 'AWS::EC2::EIP':
+                    # arn:aws:ec2:region:account:elastic-ip/eipalloc-id
+                    addr = address_index.get(r['Arn'].split('/')[-1])
+                    if addr is not None and 'AssociationId' not in addr:
+                        unattached_eips.add(r['Arn'])
+
+        for resource in self.discovered_resources:
+            arn = resource['Arn']
+            res_type = resource['Type']
+            tags = resource.get('Tags', {})
+
+            # Default
+            relevance = "KEEP"
+            justification = "Core Infrastructure / Active"
+
+            # --- Usage Checks ---
+
+            # 1. NAT Gateway
+            if res_type == 'AWS::EC2::NatGateway':
+                # arn:aws:ec2:region:account:natgateway/nat-id
+                nat_id = arn.split('/')[-1]
+                nat = nat_index.get(nat_id) if nat_index else None
+                # No need to query metrics for a NAT that is already gone
+                if nat is not None and nat['State'] in ['deleting', 'deleted', 'failed']:
+                    connections = None
+                    relevance = "DELETE"
+                    justification = f"NAT Gateway is {nat['State']}"
+                else:
+                    connections = self.get_cw_metric_sum('AWS/NATGateway', 'ConnectionEstablishedCount', [{'Name': 'NatGatewayId', 'Value': nat_id}])
+
+                if connections is not None and connections == 0:
+                    relevance = "DELETE"
+                    justification = "Unused NAT Gateway (0 connections in 7 days)"
+                elif connections is not None:
+                    justification = f"Active NAT Gateway ({int(connections)} connections/7d)"
+
+            # 2. Application Load Balancer
+            elif res_type == 'AWS::ElasticLoadBalancingV2::LoadBalancer' and self._is_application_lb(arn, lb_index):
+                # Dimension value is the part after "loadbalancer/"
+                # arn:aws:elasticloadbalancing:region:account:loadbalancer/app/name/id
+                lb_dim_value = "/".join(arn.split(':')[-1].split('/')[1:])
+                requests = self.get_cw_metric_sum('AWS/ApplicationELB', 'RequestCount', [{'Name': 'LoadBalancer', 'Value': lb_dim_value}])
+
+                if requests is not None and requests == 0:
+                    relevance = "DELETE"
+                    justification = "Unused ALB (0 requests in 7 days)"
+                elif requests is not None:
+                    justification = f"Active ALB ({int(requests)} requests/7d)"
+
+            # 3. Task Definitions
+            elif res_type == 'AWS::ECS::TaskDefinition':
+                if arn in stale_task_arns:
+                    relevance = "DELETE"
+                    justification = "Old Task Definition revision (kept last 2)"
+                else:
+                    justification = "Recent Task Definition revision"
+
+            # 4. Elastic IPs
+            elif res_type == 'AWS::EC2::EIP':
+                if arn in unattached_eips:
+                    relevance = "DELETE"
+                    justification = "Unassociated Elastic IP"
+                else:
+                    justification = "EIP is attached to a resource"
+
+            # 5. RDS
+            # arn:aws:rds:region:account:db:db-id
+            elif res_type == 'AWS::RDS::DBInstance':
+                db_id = arn.split(':')[-1]
+                conns = self.get_cw_metric_sum('AWS/RDS', 'DatabaseConnections', [{'Name': 'DBInstanceIdentifier', 'Value': db_id}])
+
+                if conns is not None and conns == 0:
+                    relevance = "DELETE"
+                    justification = "Unused RDS (0 connections in 7 days)"
+
+            # --- Project Tag Override ---
+            if active_project_tag:
+                if active_project_tag in tags.values() or active_project_tag in tags.keys():
+                    relevance = "KEEP"
+                    justification = f"Matched active identifier '{active_project_tag}'"
+
+            resource['Relevance'] = relevance
+            resource['Justification'] = justification
+            resource['MonthlyCost'] = self.cost_model.monthly_cost(res_type, self._cost_usage(resource, lb_index, db_index))
+            yield resource
+
+    def _cost_usage(self, resource, lb_index, db_index) -> Dict:
+        """Usage inputs for the cost model from the account lookups already fetched."""
+        arn = resource['Arn']
+        if resource['Type'] == 'AWS::RDS::DBInstance':
+            db = db_index.get(arn.split(':')[-1]) if db_index else None
+            if db is not None:
+                return {'class': db.get('DBInstanceClass'), 'storage_gb': db.get('AllocatedStorage', 0),
+                        'multi_az': db.get('MultiAZ', False)}
+        elif resource['Type'] == 'AWS::ElasticLoadBalancingV2::LoadBalancer':
+            lb = lb_index.get(arn) if lb_index else None
+            if lb is not None:
+                return {'class': lb['Type']}
+        return {}
+
+    def _is_application_lb(self, arn, lb_index):
+        lb = lb_index.get(arn) if lb_index else None
+        if lb is not None:
+            return lb['Type'] == 'application'
+        return '/app/' in arn
@@ -0,0 +1,324 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+
+from cost_model import rank_by_savings, total_savings
+
+logger = logging.getLogger(__name__)
+
+# Handler keys for the resource types the inspector knows how to delete
+S3_BUCKET = 's3-bucket'
+EC2_INSTANCE = 'ec2-instance'
+TASK_DEFINITION = 'task-definition'
+ELASTIC_IP = 'elastic-ip'
+
+# Max concurrent deletions per type (S3 buckets are slow and page through objects)
+DEFAULT_TYPE_LIMITS = {
+    S3_BUCKET: 2,
+    EC2_INSTANCE: 2,
+    TASK_DEFINITION: 8,
+    ELASTIC_IP: 4,
+}
+
+# Seconds per API call, used by dry-run estimates until real latencies are recorded
+DEFAULT_LATENCIES = {
+    S3_BUCKET: 5.0,
+    EC2_INSTANCE: 1.0,
+    TASK_DEFINITION: 0.3,
+    ELASTIC_IP: 0.3,
+}
+
+# terminate_instances accepts up to 1000 instance IDs per call
+EC2_TERMINATE_BATCH_SIZE = 1000
+
+# Kept next to main.py so it survives package reinstalls
+LATENCY_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cleanup_latencies.json')
+
+
+class FairSemaphore:
+    """Semaphore that admits waiters in arrival order, so deletions start in the order they were submitted."""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+
+    def __enter__(self):
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._cond.wait_for(lambda: ticket == self._serving and self._value > 0)
+            self._serving += 1
+            self._value -= 1
+            self._cond.notify_all()
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self._value += 1
+            self._cond.notify_all()
+
+
+# Exact resource types (CloudFormation and "<service>:<type>" spellings, lowercased) each handler deletes;
+# anything else, e.g. AWS::S3::AccessPoint or AWS::EC2::InstanceConnectEndpoint, has no handler
+HANDLER_TYPES = {
+    'aws::s3::bucket': S3_BUCKET,
+    's3:bucket': S3_BUCKET,
+    'aws::ec2::instance': EC2_INSTANCE,
+    'ec2:instance': EC2_INSTANCE,
+    'aws::ecs::taskdefinition': TASK_DEFINITION,
+    'ecs:task-definition': TASK_DEFINITION,
+    'aws::ec2::eip': ELASTIC_IP,
+    'ec2:elastic-ip': ELASTIC_IP,
+}
+
+
+def handler_key(res_type: str) -> Optional[str]:
+    """
+    Maps a resource type (AWS::EC2::Instance style or ec2:instance style) to a handler key,
+    or None if no handler deletes exactly that type.
+    """
+    return HANDLER_TYPES.get((res_type or '').lower())
+
+
+class CleanupExecutor:
+    """
+    Runs the inspector's deletions concurrently with per-type caps, highest monthly savings first.
+    With a time budget (seconds), deletions that have not started when it runs out are DEFERRED.
+    Every resource produces one outcome dict: Arn, Type, Status, Error, Duration, MonthlyCost.
+    """
+
+    def __init__(self, inspector, max_workers: int = 8, type_limits: Dict[str, int] = None,
+                 latency_file: str = LATENCY_FILE, time_budget: float = None):
+        self.inspector = inspector
+        self.max_workers = max_workers
+        self.time_budget = time_budget
+        self._deadline: Optional[float] = None
+        self.type_limits = dict(DEFAULT_TYPE_LIMITS, **(type_limits or {}))
+        self.latency_file = latency_file
+        self.latencies = self.load_latencies()
+        self._semaphores = {k: FairSemaphore(v) for k, v in self.type_limits.items()}
+        self._lock = threading.Lock()
+        self._observed: Dict[str, List[float]] = {}
+
+    # --- Latency bookkeeping ---
+
+    def load_latencies(self) -> Dict[str, float]:
+        latencies = dict(DEFAULT_LATENCIES)
+        if self.latency_file and os.path.exists(self.latency_file):
+            try:
+                with open(self.latency_file, 'r') as f:
+                    latencies.update(json.load(f))
+            except Exception as e:
+                logger.warning(f"Could not read recorded latencies from {self.latency_file}: {e}")
+        return latencies
+
+    def save_latencies(self):
+        if not self.latency_file or not self._observed:
+            return
+        for key, samples in self._observed.items():
+            average = sum(samples) / len(samples)
+            # Smooth against the previous value so one slow run doesn't dominate
+            previous = self.latencies.get(key)
+            self.latencies[key] = average if previous is None else (previous + average) / 2
+        try:
+            with open(self.latency_file, 'w') as f:
+                json.dump(self.latencies, f, indent=2)
+        except Exception as e:
+            logger.warning(f"Could not save latencies to {self.latency_file}: {e}")
+
+    def _record(self, key, duration):
+        with self._lock:
+            self._observed.setdefault(key, []).append(duration)
+
+    # --- Scheduling ---
+
+    def plan(self, resources: List[Dict]) -> Dict[str, List[Dict]]:
+        """Groups DELETE candidates by handler key, highest savings first. Unsupported types go under None."""
+        groups: Dict[Optional[str], List[Dict]] = {}
+        for res in rank_by_savings(resources):
+            if res.get('Relevance') != 'DELETE':
+                continue
+            groups.setdefault(handler_key(res['Type']), []).append(res)
+        return groups
+
+    @staticmethod
+    def work_units(groups: Dict[str, List[Dict]]) -> List[Tuple[str, List[Dict]]]:
+        """One unit per API call (EC2 terminations are batched), ordered by the savings they unlock."""
+        units = []
+        for key, items in groups.items():
+            if key is None:
+                continue
+            size = EC2_TERMINATE_BATCH_SIZE if key == EC2_INSTANCE else 1
+            units.extend((key, items[i:i + size]) for i in range(0, len(items), size))
+        units.sort(key=lambda unit: total_savings(unit[1]), reverse=True)
+        return units
+
+    def simulate(self, units: List[Tuple[str, List[Dict]]]) -> List[float]:
+        """
+        Estimated finish time (seconds from start) of each unit when submitted in order:
+        a FIFO pool of max_workers, each type limited to its own number of lanes.
+        """
+        workers = [0.0] * self.max_workers
+        lanes: Dict[str, List[float]] = {}
+        finish = []
+        for key, _ in units:
+            lane = lanes.setdefault(key, [0.0] * min(self.type_limits.get(key, 1), self.max_workers))
+            w, l = workers.index(min(workers)), lane.index(min(lane))
+            end = max(workers[w], lane[l]) + self.latencies.get(key, 1.0)
+            workers[w] = lane[l] = end
+            finish.append(end)
+        return finish
+
+    def estimate_wall_time(self, groups: Dict[str, List[Dict]]) -> float:
+        """
+        Estimates seconds to run the schedule: each type is bounded by its own cap,
+        and all types together are bounded by the shared worker pool.
+        """
+        per_type = []
+        total_work = 0.0
+        for key, items in groups.items():
+            if key is None:
+                continue
+            calls = math.ceil(len(items) / EC2_TERMINATE_BATCH_SIZE) if key == EC2_INSTANCE else len(items)
+            latency = self.latencies.get(key, 1.0)
+            lanes = min(self.type_limits.get(key, 1), self.max_workers, calls)
+            per_type.append(math.ceil(calls / lanes) * latency)
+            total_work += calls * latency
+        if not per_type:
+            return 0.0
+        return max(max(per_type), total_work / self.max_workers)
+
+    def run(self, resources: List[Dict], dry_run: bool = True) -> List[Dict]:
+        groups = self.plan(resources)
+        results = []
+
+        for res in groups.pop(None, []):
+            logger.warning(f"No specific deletion handler for type {res['Type']}. Skipping {res['Arn']}")
+            results.append(self._outcome(res, 'SKIPPED', error='No deletion handler'))
+
+        units = self.work_units(groups)
+
+        if dry_run:
+            finish = self.simulate(units) if self.time_budget else [0.0] * len(units)
+            for (key, items), end in zip(units, finish):
+                for res in items:
+                    if self.time_budget and end > self.time_budget:
+                        logger.info(f"[DRY RUN] Would defer {res['Type']} - {res['Arn']} (outside the time budget)")
+                        results.append(self._outcome(res, 'DEFERRED', error='Time budget exhausted'))
+                    else:
+                        logger.info(f"[DRY RUN] Would delete {res['Type']} - {res['Arn']} "
+                                    f"(${res.get('MonthlyCost') or 0:,.2f}/month)")
+                        results.append(self._outcome(res, 'DRY_RUN'))
+            estimate = self.estimate_wall_time(groups)
+            logger.info(f"[DRY RUN] {sum(len(v) for v in groups.values())} deletions, "
+                        f"estimated wall time {estimate:.1f}s with {self.max_workers} workers")
+            return results
+
+        self._deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = []
+            for key, items in units:
+                if key == EC2_INSTANCE:
+                    futures.append(pool.submit(self._terminate_batch, items))
+                else:
+                    futures.append(pool.submit(self._delete_one, key, items[0]))
+            for fut in futures:
+                results.extend(fut.result())
+
+        self.save_latencies()
+        return results
+
+    def _expired(self) -> bool:
+        return self._deadline is not None and time.monotonic() > self._deadline
+
+    # --- Workers ---
+
+    def _delete_one(self, key, res) -> List[Dict]:
+        handlers = {
+            S3_BUCKET: self.inspector.delete_s3_bucket,
+            TASK_DEFINITION: self.inspector.delete_task_definition,
+            ELASTIC_IP: self.inspector.delete_eip,
+        }
+        with self._semaphores[key]:
+            if self._expired():
+                return [self._outcome(res, 'DEFERRED', 'Time budget exhausted')]
+            start = time.monotonic()
+            try:
+                handlers[key](res['Arn'])
+                status, error = 'DELETED', None
+            except Exception as e:
+                logger.error(f"Failed to delete {res['Arn']}: {e}")
+                status, error = 'FAILED', str(e)
+            duration = time.monotonic() - start
+        self._record(key, duration)
+        return [self._outcome(res, status, error, duration)]
+
+    def _terminate_batch(self, items) -> List[Dict]:
+        ids = {res['Arn'].split('/')[-1]: res for res in items}
+        with self._semaphores[EC2_INSTANCE]:
+            if self._expired():
+                return [self._outcome(res, 'DEFERRED', 'Time budget exhausted') for res in items]
+            start = time.monotonic()
+            terminated, errors = set(), {}
+            try:
+                self._terminate(self.inspector.client('ec2'), list(ids), terminated, errors)
+            except Exception as e:
+                logger.error(f"Failed to terminate batch of {len(ids)} instances: {e}")
+                errors.update({i: str(e) for i in ids if i not in terminated})
+            duration = time.monotonic() - start
+        self._record(EC2_INSTANCE, duration)
+
+        results = []
+        for instance_id, res in ids.items():
+            if instance_id in terminated:
+                logger.info(f"Terminated EC2 instance {instance_id}")
+                results.append(self._outcome(res, 'DELETED', duration=duration))
+            else:
+                results.append(self._outcome(res, 'FAILED', errors.get(instance_id, 'Not in TerminatingInstances'), duration))
+        return results
+
+    @classmethod
+    def _terminate(cls, ec2, instance_ids: List[str], terminated: set, errors: Dict[str, str]):
+        """
+        terminate_instances fails as a whole when one ID is invalid or protected, so a failed
+        batch is split in halves until the failing instances are isolated.
+        """
+        from botocore.exceptions import ClientError
+
+        try:
+            response = ec2.terminate_instances(InstanceIds=instance_ids)
+        except ClientError as e:
+            if len(instance_ids) == 1:
+                logger.error(f"Failed to terminate {instance_ids[0]}: {e}")
+                errors[instance_ids[0]] = str(e)
+                return
+            half = len(instance_ids) // 2
+            cls._terminate(ec2, instance_ids[:half], terminated, errors)
+            cls._terminate(ec2, instance_ids[half:], terminated, errors)
+            return
+        terminated.update(i['InstanceId'] for i in response.get('TerminatingInstances', []))
+
+    @staticmethod
+    def _outcome(res, status, error=None, duration=0.0) -> Dict:
+        return {
+            'Arn': res['Arn'],
+            'Type': res['Type'],
+            'Status': status,
+            'Error': error,
+            'Duration': duration,
+            'MonthlyCost': res.get('MonthlyCost'),
+        }
+
+
+def summarize(results: List[Dict]) -> Dict[str, int]:
+    """Counts outcomes by Status."""
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r['Status']] = counts.get(r['Status'], 0) + 1
+    return counts
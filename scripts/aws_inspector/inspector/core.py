@@ -0,0 +1,35 @@
+import logging
+
+from aws_core import AwsExecutor
+from cost_model import CostModel
+from resource_records import InspectorRecord, RecordList
+from .scanning import ScanningMixin
+from .enrichment import EnrichmentMixin
+from .metrics import MetricsMixin
+from .assessment import AssessmentMixin
+from .deletion import DeletionMixin
+from .lookups import AccountLookupCache
+from .tag_index import TagIndex
+
+logger = logging.getLogger(__name__)
+
+
+class AWSResourceInspector(ScanningMixin, EnrichmentMixin, MetricsMixin, AssessmentMixin, DeletionMixin):
+    def __init__(self, region: str, dry_run: bool = True):
+        # boto3 takes a noticeable share of CLI startup; AwsExecutor imports it on construction
+        self.region = region
+        self.dry_run = dry_run
+        # An executing run decides what to delete from live reads, never from the shared response cache
+        self.core = AwsExecutor(region, refresh_cache=not dry_run)
+        self.session = self.core.session
+        self.rg_client = self.core.client('resource-groups')
+        self.tagging_client = self.core.client('resourcegroupstaggingapi')
+        self.cw_client = self.core.client('cloudwatch')
+        self.lookups = AccountLookupCache(self.core)
+        self.tag_index = TagIndex(region)
+        self.cost_model = CostModel.load(region=region)
+        self.discovered_resources = RecordList(InspectorRecord)
+
+    def client(self, service: str):
+        """Returns the shared core's pooled client for a service."""
+        return self.core.client(service)
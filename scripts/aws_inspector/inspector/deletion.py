@@ -0,0 +1,79 @@
+import logging
+from typing import List, Dict
+
+from cost_model import total_savings
+from .cleanup_executor import CleanupExecutor, handler_key, summarize, S3_BUCKET, EC2_INSTANCE, TASK_DEFINITION, ELASTIC_IP
+
+logger = logging.getLogger(__name__)
+
+
+class DeletionMixin:
+    """Deletes resources marked for DELETE."""
+
+    def cleanup(self, resources: List[Dict], max_workers: int = 8, time_budget: float = None) -> List[Dict]:
+        """
+        Deletes resources marked for DELETE, concurrently with per-type caps and highest savings first.
+        Returns one outcome per DELETE candidate (see CleanupExecutor).
+        """
+        logger.info("Starting cleanup process...")
+        executor = CleanupExecutor(self, max_workers=max_workers, time_budget=time_budget)
+        results = executor.run(resources, dry_run=self.dry_run)
+        counts = summarize(results)
+        logger.info("Cleanup outcomes: " + (", ".join(f"{k}={v}" for k, v in sorted(counts.items())) or "none"))
+        saved = total_savings(r for r in results if r['Status'] in ('DELETED', 'DRY_RUN'))
+        deferred = total_savings(r for r in results if r['Status'] == 'DEFERRED')
+        logger.info(f"Estimated monthly savings: ${saved:,.2f}" + (f" (${deferred:,.2f} deferred)" if deferred else ""))
+        return results
+
+    def delete_resource(self, resource: Dict):
+        arn = resource['Arn']
+        res_type = resource['Type']
+
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would delete {res_type} - {arn}")
+            return
+
+        logger.info(f"Deleting {res_type} - {arn}")
+
+        try:
+            key = handler_key(res_type)
+            if key == S3_BUCKET:
+                self.delete_s3_bucket(arn)
+            elif key == EC2_INSTANCE:
+                self.delete_ec2_instance(arn)
+            elif key == TASK_DEFINITION:
+                self.delete_task_definition(arn)
+            elif key == ELASTIC_IP:
+                self.delete_eip(arn)
+            else:
+                logger.warning(f"No specific deletion handler for type {res_type}. Skipping {arn}")
+        except Exception as e:
+            logger.error(f"Failed to delete {arn}: {e}")
+
+    def delete_task_definition(self, arn):
+        ecs = self.client('ecs')
+        ecs.deregister_task_definition(taskDefinition=arn)
+        logger.info(f"Deregistered Task Definition {arn}")
+
+    def delete_eip(self, arn):
+        # arn:aws:ec2:region:account:elastic-ip/eipalloc-id
+        alloc_id = arn.split('/')[-1]
+        ec2 = self.client('ec2')
+        ec2.release_address(AllocationId=alloc_id)
+        logger.info(f"Released EIP {alloc_id}")
+
+    def delete_s3_bucket(self, arn):
+        bucket_name = arn.split(':::')[1]
+        # Resources are not thread-safe; build one per bucket
+        s3 = self.core.resource('s3')
+        bucket = s3.Bucket(bucket_name)
+        # Must empty bucket first
+        bucket.objects.all().delete()
+        bucket.delete()
+        logger.info(f"Deleted S3 bucket {bucket_name}")
+
+    def delete_ec2_instance(self, arn):
+        instance_id = arn.split('/')[-1]
+        ec2 = self.client('ec2')
+        ec2.terminate_instances(InstanceIds=[instance_id])
+        logger.info(f"Terminated EC2 instance {instance_id}")
@@ -0,0 +1,25 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EnrichmentMixin:
+    """Adds tags to discovered resources through the Tagging API."""
+
+    def enrich_resource_data(self):
+        """
+        Fetches tags and details for discovered resources to help with assessment.
+        """
+        if not self.discovered_resources:
+            return
+
+        # Tags come through the shared tag index (get_resources, 100 ARNs per call)
+        arns = [r['Arn'] for r in self.discovered_resources]
+        try:
+            found = self.tag_index.refresh_arns(self.tagging_client, arns)
+        except Exception as e:
+            logger.error(f"Error enriching resources: {e}")
+            return
+        for r in self.discovered_resources:
+            if r['Arn'] in found:
+                r['Tags'] = found[r['Arn']]
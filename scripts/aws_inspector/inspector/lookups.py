@@ -0,0 +1,87 @@
+import logging
+from typing import Dict, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Account-wide lookups the assessment relies on. Each one maps to a single
+# (paginated) describe call whose results are indexed by resource ID.
+ADDRESSES = 'addresses'
+TASK_DEFINITION_FAMILIES = 'task_definition_families'
+LOAD_BALANCERS = 'load_balancers'
+NAT_GATEWAYS = 'nat_gateways'
+DB_INSTANCES = 'db_instances'
+
+ALL_LOOKUPS = (ADDRESSES, TASK_DEFINITION_FAMILIES, LOAD_BALANCERS, NAT_GATEWAYS, DB_INSTANCES)
+
+
+class AccountLookupCache:
+    """
+    Per-run cache of account-wide describe calls, indexed by ID.
+    Every lookup is fetched at most once; prefetch() runs them in parallel on the shared AwsExecutor.
+    """
+
+    def __init__(self, core):
+        self.core = core
+        self._indexes: Dict[str, Optional[Dict]] = {}
+
+    def prefetch(self, names: Iterable[str] = ALL_LOOKUPS):
+        """Fetches the requested lookups concurrently (skipping ones already cached)."""
+        pending = [n for n in names if n not in self._indexes]
+        if not pending:
+            return
+
+        logger.info(f"Prefetching account lookups: {', '.join(pending)}")
+        self._indexes.update(zip(pending, self.core.map(self._fetch, pending)))
+
+    def get(self, name: str) -> Optional[Dict]:
+        """
+        Returns the index for a lookup, fetching it on first use.
+        None means the describe call failed and callers should fall back.
+        """
+        if name not in self._indexes:
+            self._indexes[name] = self._fetch(name)
+        return self._indexes[name]
+
+    def _fetch(self, name: str) -> Optional[Dict]:
+        fetchers = {
+            ADDRESSES: self._fetch_addresses,
+            TASK_DEFINITION_FAMILIES: self._fetch_task_definition_families,
+            LOAD_BALANCERS: self._fetch_load_balancers,
+            NAT_GATEWAYS: self._fetch_nat_gateways,
+            DB_INSTANCES: self._fetch_db_instances,
+        }
+        try:
+            return fetchers[name]()
+        except Exception as e:
+            logger.error(f"Failed to fetch {name}: {e}")
+            return None
+
+    # --- Fetchers (clients come from the shared core) ---
+
+    def _fetch_addresses(self) -> Dict[str, Dict]:
+        # describe_addresses is not paginated
+        return {a['AllocationId']: a for a in self.core.call('ec2', 'describe_addresses')['Addresses']
+                if 'AllocationId' in a}
+
+    def _fetch_task_definition_families(self) -> Dict[str, List[Dict]]:
+        # family -> [{'arn', 'rev'}], newest revision first
+        families: Dict[str, List[Dict]] = {}
+        for arn in self.core.paginate('ecs', 'list_task_definitions', 'taskDefinitionArns', status='ACTIVE'):
+            family, revision = arn.split('/')[-1].rsplit(':', 1)
+            families.setdefault(family, []).append({'arn': arn, 'rev': int(revision)})
+        for items in families.values():
+            items.sort(key=lambda x: x['rev'], reverse=True)
+        return families
+
+    def _fetch_load_balancers(self) -> Dict[str, Dict]:
+        return {lb['LoadBalancerArn']: lb
+                for lb in self.core.paginate('elbv2', 'describe_load_balancers', 'LoadBalancers')}
+
+    def _fetch_nat_gateways(self) -> Dict[str, Dict]:
+        return {nat['NatGatewayId']: nat
+                for nat in self.core.paginate('ec2', 'describe_nat_gateways', 'NatGateways')}
+
+    def _fetch_db_instances(self) -> Dict[str, Dict]:
+        # Instance class, storage and Multi-AZ feed the cost model
+        return {db['DBInstanceIdentifier']: db
+                for db in self.core.paginate('rds', 'describe_db_instances', 'DBInstances')}
@@ -0,0 +1,33 @@
+import logging
+from datetime import datetime, timezone, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsMixin:
+    """CloudWatch metric helpers used by the assessment."""
+
+    def get_cw_metric_sum(self, namespace, metric_name, dimensions, days=7):
+        """
+        Gets the Sum of a metric over the last N days.
+        """
+        start_time = datetime.now(timezone.utc) - timedelta(days=days)
+        end_time = datetime.now(timezone.utc)
+
+        try:
+            response = self.cw_client.get_metric_statistics(
+                Namespace=namespace,
+                MetricName=metric_name,
+                Dimensions=dimensions,
+                StartTime=start_time,
+                EndTime=end_time,
+                Period=days * 86400, # One datapoint for the whole period
+                Statistics=['Sum']
+            )
+            datapoints = response.get('Datapoints', [])
+            if datapoints:
+                return datapoints[0]['Sum']
+            return 0.0
+        except Exception as e:
+            logger.warning(f"Failed to get metric {metric_name}: {e}")
+            return None
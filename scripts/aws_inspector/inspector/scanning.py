@@ -0,0 +1,56 @@
+import logging
+
+from scan_checkpoint import list_pages, raise_if_interrupted
+
+logger = logging.getLogger(__name__)
+
+
+class ScanningMixin:
+    """Resource Group discovery. Fills self.discovered_resources."""
+
+    def get_group_query(self, group_name: str) -> str:
+        """Retrieves the Tag filters from a Resource Group definition if possible."""
+        try:
+            response = self.rg_client.get_group_query(GroupName=group_name)
+            return response.get('GroupQuery', {}).get('ResourceQuery', {}).get('Query')
+        except Exception as e:
+            logger.error(f"Error getting group query for {group_name}: {e}")
+            return None
+
+    def scan_resource_group(self, group_arn_or_name: str, checkpoint=None):
+        """
+        Scans for resources belonging to a specific Resource Group.
+        If it's an ARN, we extract the name.
+        With a ScanCheckpoint (over self.discovered_resources), every page is journaled and a
+        resumed scan continues from the last recorded token.
+        """
+        if checkpoint and checkpoint.is_done('scan_resource_group'):
+            logger.info(f"Resource Group already scanned before the interruption ({len(self.discovered_resources)} resources)")
+            return
+
+        logger.info(f"Scanning Resource Group: {group_arn_or_name}")
+
+        # Extract name from ARN if needed
+        if 'arn:aws:resource-groups' in group_arn_or_name:
+            group_name = group_arn_or_name.split('/')[-1]
+        else:
+            group_name = group_arn_or_name
+
+        # List resources in the group
+        # Note: list_group_resources returns identifiers and types
+        try:
+            for page in list_pages(self.rg_client.list_group_resources, 'NextToken', 'NextToken',
+                                   checkpoint, 'scan_resource_group', GroupName=group_name):
+                for res in page['Resources']:
+                    self.discovered_resources.append({
+                        'Arn': res['Identifier']['ResourceArn'],
+                        'Type': res['Identifier']['ResourceType'],
+                        'Status': res.get('Status', {}).get('Name', 'Unknown')
+                    })
+            logger.info(f"Found {len(self.discovered_resources)} resources in group {group_name}")
+            if checkpoint:
+                checkpoint.step_done('scan_resource_group')
+        except Exception as e:
+            raise_if_interrupted(e)
+            logger.error(f"Failed to list group resources: {e}")
+            return
@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from resource_records import shared_tags
+
+logger = logging.getLogger(__name__)
+
+# Tags our resources are expected to carry (see inspection_report.txt)
+REQUIRED_TAGS = ['Project', 'Owner', 'CostCenter', 'Environment', 'Name']
+
+# Kept next to main.py so compliance queries can run from the cached crawl
+INDEX_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tag_index.json')
+
+# get_resources accepts at most 100 ARNs per ResourceARNList call
+ARN_BATCH_SIZE = 100
+
+# "missing:Key", "has:Key", "Key=Value", "Key!=Value"
+_QUERY = re.compile(r'^(?:(missing|has):(.+)|([^!=]+)(!?=)(.*))$')
+
+
+def resource_type(arn: str) -> str:
+    """service:type from an ARN (e.g. ecs:cluster, s3:bucket), as used by ResourceTypeFilters."""
+    parts = arn.split(':', 5)
+    resource = parts[5]
+    if parts[2] == 's3':
+        return 's3:bucket' if '/' not in resource else 's3:object'
+    if '/' not in resource and ':' not in resource:
+        return parts[2]  # e.g. SNS topics, SQS queues
+    return f"{parts[2]}:{re.split(r'[/:]', resource, maxsplit=1)[0]}"
+
+
+def matches_type(arn: str, resource_types: List[str]) -> bool:
+    """ResourceTypeFilters semantics: 'ec2' matches every EC2 type, 'ec2:instance' only instances."""
+    rtype = resource_type(arn)
+    return any(rtype == t or rtype.startswith(t + ':') for t in resource_types)
+
+
+class TagIndex:
+    """
+    Inverted tag index built from one paginated get_resources crawl:
+    tag key -> ARNs and (key, value) -> ARNs, so compliance queries are set operations.
+    Can be refreshed incrementally by resource type or ARN, and cached on disk.
+    """
+
+    def __init__(self, region: str = None):
+        self.region = region
+        self.tags: Dict[str, Dict[str, str]] = {}           # arn -> tags
+        self.by_key: Dict[str, Set[str]] = {}               # key -> arns
+        self.by_value: Dict[tuple, Set[str]] = {}           # (key, value) -> arns
+        self.built_at: Optional[float] = None
+
+    # --- Maintenance ---
+
+    def put(self, arn: str, tags: Dict[str, str]):
+        self.remove(arn)
+        self.tags[arn] = tags = shared_tags(tags)
+        for k, v in tags.items():
+            self.by_key.setdefault(k, set()).add(arn)
+            self.by_value.setdefault((k, v), set()).add(arn)
+
+    def remove(self, arn: str):
+        # Empty sets are dropped so retagging churn doesn't grow the index
+        for k, v in self.tags.pop(arn, {}).items():
+            self.by_key[k].discard(arn)
+            if not self.by_key[k]:
+                del self.by_key[k]
+            self.by_value[(k, v)].discard(arn)
+            if not self.by_value[(k, v)]:
+                del self.by_value[(k, v)]
+
+    def crawl(self, tagging_client, resource_types: List[str] = None):
+        """
+        Full crawl (or, with resource_types, a crawl of just those types that replaces
+        their previous entries).
+        """
+        kwargs = {'ResourceTypeFilters': resource_types} if resource_types else {}
+        seen = set()
+        for page in tagging_client.get_paginator('get_resources').paginate(**kwargs):
+            for item in page['ResourceTagMappingList']:
+                arn = item['ResourceARN']
+                seen.add(arn)
+                self.put(arn, {t['Key']: t['Value'] for t in item.get('Tags', [])})
+
+        # Anything of the crawled types that was not returned is gone (or has no tags left)
+        stale = [arn for arn in self.tags if arn not in seen
+                 and (not resource_types or matches_type(arn, resource_types))]
+        for arn in stale:
+            self.remove(arn)
+        if not resource_types:
+            self.built_at = time.time()
+        logger.info(f"Tag index: {len(seen)} resources crawled, {len(stale)} removed, {len(self.tags)} total")
+
+    def refresh_arns(self, tagging_client, arns: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """Re-reads tags for specific ARNs (100 per call). Returns their tags."""
+        arns = list(arns)
+        found = {}
+        for i in range(0, len(arns), ARN_BATCH_SIZE):
+            response = tagging_client.get_resources(ResourceARNList=arns[i:i + ARN_BATCH_SIZE])
+            for item in response['ResourceTagMappingList']:
+                found[item['ResourceARN']] = {t['Key']: t['Value'] for t in item.get('Tags', [])}
+        for arn in arns:
+            if arn in found:
+                self.put(arn, found[arn])
+            else:
+                self.remove(arn)
+        return found
+
+    # --- Queries ---
+
+    @property
+    def arns(self) -> Set[str]:
+        return set(self.tags)
+
+    def missing(self, key: str) -> Set[str]:
+        return self.arns - self.by_key.get(key, set())
+
+    def has(self, key: str) -> Set[str]:
+        return set(self.by_key.get(key, set()))
+
+    def equals(self, key: str, value: str) -> Set[str]:
+        return set(self.by_value.get((key, value), set()))
+
+    def not_equals(self, key: str, value: str) -> Set[str]:
+        """Resources whose key is missing or has another value."""
+        return self.arns - self.by_value.get((key, value), set())
+
+    def query(self, clauses: Iterable[str]) -> Set[str]:
+        """ANDs clauses such as 'missing:CostCenter' or 'Project!=DigitalHall'."""
+        result = None
+        for clause in clauses:
+            m = _QUERY.match(clause.strip())
+            if not m:
+                raise ValueError(f"Invalid tag query '{clause}'. Use missing:Key, has:Key, Key=Value or Key!=Value")
+            if m.group(1) == 'missing':
+                matched = self.missing(m.group(2))
+            elif m.group(1) == 'has':
+                matched = self.has(m.group(2))
+            elif m.group(4) == '=':
+                matched = self.equals(m.group(3), m.group(5))
+            else:
+                matched = self.not_equals(m.group(3), m.group(5))
+            result = matched if result is None else result & matched
+        return result if result is not None else self.arns
+
+    def compliance(self, required: List[str] = None) -> Dict[str, int]:
+        """Count of resources missing each required tag."""
+        return {key: len(self.missing(key)) for key in (required or REQUIRED_TAGS)}
+
+    # --- Persistence ---
+
+    def save(self, path: str = INDEX_FILE):
+        try:
+            with open(path, 'w') as f:
+                json.dump({'region': self.region, 'built_at': self.built_at, 'tags': self.tags}, f)
+        except Exception as e:
+            logger.warning(f"Could not save tag index to {path}: {e}")
+
+    @classmethod
+    def load(cls, path: str = INDEX_FILE, region: str = None, ttl: float = None) -> Optional['TagIndex']:
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not read tag index from {path}: {e}")
+            return None
+        if region and data.get('region') != region:
+            return None
+        if ttl is not None and (not data.get('built_at') or time.time() - data['built_at'] > ttl):
+            return None
+        index = cls(data.get('region'))
+        for arn, tags in data['tags'].items():
+            index.put(arn, tags)
+        index.built_at = data.get('built_at')
+        return index
@@ -0,0 +1,106 @@
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from inspector.cleanup_executor import (EC2_INSTANCE, ELASTIC_IP, S3_BUCKET, TASK_DEFINITION, CleanupExecutor,
+                                        FairSemaphore, handler_key)
+
+
+class FakeEc2:
+    """terminate_instances that rejects the whole call when any ID is in bad, like EC2 does."""
+
+    def __init__(self, bad):
+        self.bad = set(bad)
+        self.calls = []
+
+    def terminate_instances(self, InstanceIds):
+        self.calls.append(list(InstanceIds))
+        if self.bad & set(InstanceIds):
+            raise ClientError({'Error': {'Code': 'OperationNotPermitted', 'Message': 'protected'}}, 'TerminateInstances')
+        return {'TerminatingInstances': [{'InstanceId': i} for i in InstanceIds]}
+
+
+class FakeInspector:
+    def __init__(self, ec2):
+        self.ec2 = ec2
+
+    def client(self, service):
+        return self.ec2
+
+
+def instance(i, cost=0.0):
+    return {'Arn': f"arn:aws:ec2:us-east-1:123456789012:instance/i-{i}", 'Type': 'AWS::EC2::Instance',
+            'Relevance': 'DELETE', 'MonthlyCost': cost}
+
+
+def test_terminate_batch_isolates_failing_instances():
+    ec2 = FakeEc2(bad={'i-3', 'i-6'})
+    executor = CleanupExecutor(FakeInspector(ec2), latency_file=None)
+    results = executor._terminate_batch([instance(n) for n in range(8)])
+
+    status = {r['Arn'].split('/')[-1]: r['Status'] for r in results}
+    assert status == {f"i-{n}": 'FAILED' if n in (3, 6) else 'DELETED' for n in range(8)}
+    assert all('protected' in r['Error'] for r in results if r['Status'] == 'FAILED')
+    # Every instance is terminated by exactly one successful call
+    assert sorted(i for call in ec2.calls if not ec2.bad & set(call) for i in call) == \
+        sorted(f"i-{n}" for n in range(8) if n not in (3, 6))
+
+
+def test_terminate_batch_single_call_when_all_valid():
+    ec2 = FakeEc2(bad=set())
+    results = CleanupExecutor(FakeInspector(ec2), latency_file=None)._terminate_batch([instance(n) for n in range(5)])
+    assert len(ec2.calls) == 1
+    assert {r['Status'] for r in results} == {'DELETED'}
+
+
+def test_fair_semaphore_admits_in_arrival_order():
+    sem = FairSemaphore(1)
+    order = []
+    sem.__enter__()
+    threads = []
+    for n in range(5):
+        t = threading.Thread(target=lambda n=n: (sem.__enter__(), order.append(n), sem.__exit__()))
+        t.start()
+        threads.append(t)
+        time.sleep(0.02)  # let each thread take its ticket before the next one
+    sem.__exit__()
+    for t in threads:
+        t.join(2)
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_simulate_respects_type_lanes_and_workers():
+    executor = CleanupExecutor(None, max_workers=2, type_limits={TASK_DEFINITION: 1}, latency_file=None)
+    executor.latencies = {TASK_DEFINITION: 1.0, EC2_INSTANCE: 2.0}
+    units = [(TASK_DEFINITION, [{}]), (TASK_DEFINITION, [{}]), (EC2_INSTANCE, [{}])]
+    # Task definitions share one lane, and the second holds a worker while it waits for it,
+    # so the EC2 batch starts when the first one finishes
+    assert executor.simulate(units) == [1.0, 2.0, 3.0]
+
+
+def test_dry_run_defers_outside_time_budget():
+    executor = CleanupExecutor(None, max_workers=4, type_limits={TASK_DEFINITION: 1}, latency_file=None, time_budget=2.5)
+    executor.latencies = {TASK_DEFINITION: 1.0}
+    resources = [{'Arn': f"arn:aws:ecs:us-east-1:123456789012:task-definition/app:{n}", 'Type': 'AWS::ECS::TaskDefinition',
+                  'Relevance': 'DELETE', 'MonthlyCost': float(n)} for n in range(1, 5)]
+    status = {r['MonthlyCost']: r['Status'] for r in executor.run(resources, dry_run=True)}
+    # One lane, one second each: the two most expensive finish within 2.5 s
+    assert status == {4.0: 'DRY_RUN', 3.0: 'DRY_RUN', 2.0: 'DEFERRED', 1.0: 'DEFERRED'}
+
+
+def test_handler_key_matches_exact_types_only():
+    assert handler_key('AWS::S3::Bucket') == S3_BUCKET
+    assert handler_key('s3:bucket') == S3_BUCKET
+    assert handler_key('AWS::EC2::Instance') == EC2_INSTANCE
+    assert handler_key('ec2:instance') == EC2_INSTANCE
+    assert handler_key('AWS::ECS::TaskDefinition') == TASK_DEFINITION
+    assert handler_key('ecs:task-definition') == TASK_DEFINITION
+    assert handler_key('aws::ec2::eip') == ELASTIC_IP
+    assert handler_key('ec2:elastic-ip') == ELASTIC_IP
+
+
+def test_handler_key_ignores_lookalike_types():
+    for res_type in ['AWS::EC2::InstanceConnectEndpoint', 'AWS::S3::AccessPoint', 'AWS::S3::MultiRegionAccessPoint',
+                     'AWS::S3Express::DirectoryBucket', 'AWS::EC2::EIPAssociation', 'ec2:instance-profile', '', None]:
+        assert handler_key(res_type) is None, res_type
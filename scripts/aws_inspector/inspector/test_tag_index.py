@@ -0,0 +1,24 @@
+from inspector.tag_index import TagIndex
+
+A = 'arn:aws:s3:::a'
+B = 'arn:aws:ecs:us-east-1:123456789012:cluster/b'
+
+
+def test_queries_are_set_operations():
+    index = TagIndex('us-east-1')
+    index.put(A, {'Project': 'app', 'Owner': 'ops'})
+    index.put(B, {'Project': 'other'})
+    assert index.missing('Owner') == {B}
+    assert index.query(['has:Project', 'Project!=app']) == {B}
+    assert index.equals('Project', 'app') == {A}
+
+
+def test_remove_and_retag_prune_empty_sets():
+    index = TagIndex('us-east-1')
+    index.put(A, {'Project': 'app', 'Owner': 'ops'})
+    index.put(A, {'Project': 'renamed'})
+    assert index.by_key == {'Project': {A}}
+    assert index.by_value == {('Project', 'renamed'): {A}}
+    index.remove(A)
+    assert index.by_key == {} and index.by_value == {}
+    assert index.missing('Project') == set()
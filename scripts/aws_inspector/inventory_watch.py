@@ -0,0 +1,623 @@
+import glob
+import gzip
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+from botocore.exceptions import ClientError
+
+from resource_graph import ResourceGraph, link_payload
+from resource_records import ReaderRecord, RecordList, jsonable, retain_tag_sets
+from scan_checkpoint import is_interruption
+
+logger = logging.getLogger(__name__)
+
+# The reader's full inventory (records with ARNs and tags, which the Markdown report leaves out),
+# plus the watch state: last full scan, event source position and recent deletions
+INVENTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reader_inventory.json')
+
+DEFAULT_RECONCILE_HOURS = 24
+DEFAULT_POLL_SECONDS = 20
+# SQS returns at most 10 messages per receive; log files are read in batches of this size
+MAX_FILES_PER_POLL = 50
+# CloudTrail can deliver a log file after later-named ones; files read within this many seconds
+# are remembered and the listing is re-read from before them, so a late file is still picked up
+TRAIL_LOOKBACK_SECONDS = 3600
+# Errors reading a message's trail file that retrying the message cannot fix: stop polling instead
+FATAL_READ_CODES = {'AccessDenied', 'AccessDeniedException', 'KMS.AccessDeniedException'}
+
+
+# --- CloudTrail records -> inventory changes ---
+
+def _pascal(value):
+    """CloudTrail's camelCase payloads in the describe APIs' PascalCase ({'items': [...]} sets become lists)."""
+    if isinstance(value, list):
+        return [_pascal(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if set(value) == {'items'}:
+        return _pascal(value['items'])
+    # Tag dicts (Lambda, Logs) hold user keys, which stay as they are
+    return {k[:1].upper() + k[1:]: v if k.lower() == 'tags' and isinstance(v, dict) else _pascal(v)
+            for k, v in value.items()}
+
+
+def _owner(value, key: str) -> Optional[Dict]:
+    """The first dict (depth first) that has key."""
+    if isinstance(value, dict):
+        if value.get(key) is not None:
+            return value
+        value = list(value.values())
+    if isinstance(value, list):
+        for v in value:
+            found = _owner(v, key)
+            if found is not None:
+                return found
+    return None
+
+
+def _find(value, key: str):
+    owner = _owner(value, key)
+    return owner[key] if owner is not None else None
+
+
+def _tags(*payloads) -> Dict[str, str]:
+    """Tags of a (PascalCase) payload: Tags/TagSet lists or dicts, or EC2 TagSpecificationSet."""
+    tags = {}
+    for payload in payloads:
+        if not isinstance(payload, dict):
+            continue
+        sources = [payload.get('Tags'), payload.get('TagSet')]
+        sources += [spec.get('Tags') for spec in payload.get('TagSpecificationSet') or [] if isinstance(spec, dict)]
+        for source in sources:
+            if isinstance(source, dict):
+                tags.update(source)
+            elif isinstance(source, list):
+                tags.update({t['Key']: t.get('Value', '') for t in source if isinstance(t, dict) and 'Key' in t})
+        if tags:
+            break
+    return tags
+
+
+class TrailEvent:
+    """One CloudTrail management event, with its request and response in PascalCase."""
+
+    def __init__(self, record: Dict):
+        self.service = record['eventSource'].split('.')[0]
+        # Lambda versions its event names (CreateFunction20150331)
+        self.name = re.sub(r'\d{8}(v\d+)?$', '', record['eventName'])
+        self.region = record.get('awsRegion')
+        self.account = record.get('recipientAccountId') or record.get('userIdentity', {}).get('accountId', '')
+        self.time = record.get('eventTime', '')
+        self.raw_response = record.get('responseElements') or {}
+        self.request = _pascal(record.get('requestParameters') or {})
+        self.response = _pascal(self.raw_response)
+
+    def get(self, key: str):
+        """key from anywhere in the response, else the request."""
+        value = _find(self.response, key)
+        return value if value is not None else _find(self.request, key)
+
+    def change(self, action: str, rtype: str, identifier: str, arn: str, tags: Dict = None, payload: Dict = None) -> Dict:
+        return {'Action': action, 'Identifier': identifier, 'ARN': arn, 'Service': self.service, 'Type': rtype,
+                'Tags': tags or {}, 'Payload': payload, 'Time': self.time}
+
+
+# EC2 types whose create response wraps the resource in one object: type -> (create, delete, wrapper, ID key)
+EC2_EVENTS = {
+    'vpc': ('CreateVpc', 'DeleteVpc', 'Vpc', 'VpcId'),
+    'subnet': ('CreateSubnet', 'DeleteSubnet', 'Subnet', 'SubnetId'),
+    'internet-gateway': ('CreateInternetGateway', 'DeleteInternetGateway', 'InternetGateway', 'InternetGatewayId'),
+    'natgateway': ('CreateNatGateway', 'DeleteNatGateway', 'NatGateway', 'NatGatewayId'),
+    'route-table': ('CreateRouteTable', 'DeleteRouteTable', 'RouteTable', 'RouteTableId'),
+    'network-acl': ('CreateNetworkAcl', 'DeleteNetworkAcl', 'NetworkAcl', 'NetworkAclId'),
+}
+
+
+def _ec2_arn(ev: TrailEvent, rtype: str, rid: str) -> str:
+    # Same ARNs as scan_ec2, which describes instances and NAT gateways without an OwnerId
+    account = '' if rtype in ('instance', 'natgateway') else ev.account
+    return f"arn:aws:ec2:{ev.region}:{account}:{rtype}/{rid}"
+
+
+def _ec2_changes(ev: TrailEvent) -> Iterator[Dict]:
+    if ev.name == 'RunInstances':
+        for inst in _find(ev.response, 'InstancesSet') or []:
+            iid = inst['InstanceId']
+            tags = _tags(inst, ev.request)
+            payload = dict(inst, SecurityGroups=inst.get('GroupSet') or [])
+            yield ev.change('add', 'instance', tags.get('Name', iid), _ec2_arn(ev, 'instance', iid), tags, payload)
+    elif ev.name == 'TerminateInstances':
+        for inst in _find(ev.response, 'InstancesSet') or _find(ev.request, 'InstancesSet') or []:
+            yield ev.change('remove', 'instance', inst['InstanceId'], _ec2_arn(ev, 'instance', inst['InstanceId']))
+    elif ev.name == 'CreateSecurityGroup':
+        gid = ev.response['GroupId']
+        yield ev.change('add', 'security-group', ev.request['GroupName'], _ec2_arn(ev, 'security-group', gid),
+                        _tags(ev.request), {'GroupId': gid, 'VpcId': ev.request.get('VpcId')})
+    elif ev.name == 'DeleteSecurityGroup' and ev.request.get('GroupId'):
+        gid = ev.request['GroupId']
+        yield ev.change('remove', 'security-group', gid, _ec2_arn(ev, 'security-group', gid))
+    elif ev.name in ('AllocateAddress', 'ReleaseAddress'):
+        alloc_id = ev.get('AllocationId')
+        if alloc_id:
+            action = 'add' if ev.name == 'AllocateAddress' else 'remove'
+            yield ev.change(action, 'elastic-ip', alloc_id, f"arn:aws:ec2:{ev.region}::elastic-ip/{alloc_id}",
+                            _tags(ev.request))
+    else:
+        for rtype, (create, delete, wrapper, id_key) in EC2_EVENTS.items():
+            if ev.name == create:
+                item = _find(ev.response, wrapper)
+                if item and item.get(id_key):
+                    rid = item[id_key]
+                    arn = item.get('SubnetArn') or _ec2_arn(ev, rtype, rid)
+                    yield ev.change('add', rtype, rid, arn, _tags(item, ev.request), item)
+            elif ev.name == delete:
+                rid = _find(ev.request, id_key)
+                if rid:
+                    yield ev.change('remove', rtype, rid, _ec2_arn(ev, rtype, rid))
+
+
+def _function_arn(ev: TrailEvent) -> str:
+    name = ev.get('FunctionName')
+    return name if name.startswith('arn:') else f"arn:aws:lambda:{ev.region}:{ev.account}:function:{name}"
+
+
+# The reader's other collections: (service, create event, delete event) ->
+# (type, identifier key or None for the ARN, ARN key, ARN when the event carries none)
+RESOURCE_EVENTS = {
+    ('ecs', 'CreateCluster', 'DeleteCluster'): ('cluster', None, 'ClusterArn', None),
+    ('ecs', 'CreateService', 'DeleteService'): ('service', None, 'ServiceArn', None),
+    ('ecs', 'RegisterTaskDefinition', 'DeregisterTaskDefinition'): ('task-definition', None, 'TaskDefinitionArn', None),
+    ('lambda', 'CreateFunction', 'DeleteFunction'): ('function', None, 'FunctionArn', _function_arn),
+    ('s3', 'CreateBucket', 'DeleteBucket'): ('bucket', 'BucketName', None,
+                                             lambda ev: f"arn:aws:s3:::{ev.get('BucketName')}"),
+    ('rds', 'CreateDBInstance', 'DeleteDBInstance'): ('db-instance', 'DBInstanceIdentifier', 'DBInstanceArn', None),
+    ('dynamodb', 'CreateTable', 'DeleteTable'): ('table', 'TableName', 'TableArn', None),
+    # Classic load balancers (same event source, no ARN) are not in the reader's inventory
+    ('elasticloadbalancing', 'CreateLoadBalancer', 'DeleteLoadBalancer'): ('loadbalancer', None, 'LoadBalancerArn', None),
+    ('elasticloadbalancing', 'CreateTargetGroup', 'DeleteTargetGroup'): ('targetgroup', None, 'TargetGroupArn', None),
+    ('ecr', 'CreateRepository', 'DeleteRepository'): ('repository', 'RepositoryName', 'RepositoryArn', None),
+    ('logs', 'CreateLogGroup', 'DeleteLogGroup'): (
+        'log-group', 'LogGroupName', None,
+        lambda ev: f"arn:aws:logs:{ev.region}:{ev.account}:log-group:{ev.get('LogGroupName')}:*"),
+    ('codebuild', 'CreateProject', 'DeleteProject'): (
+        'project', 'Name', 'Arn', lambda ev: f"arn:aws:codebuild:{ev.region}:{ev.account}:project/{ev.get('Name')}"),
+    ('codepipeline', 'CreatePipeline', 'DeletePipeline'): (
+        'pipeline', 'Name', None, lambda ev: f"arn:aws:codepipeline:{ev.region}:unknown:pipeline/{ev.get('Name')}"),
+    ('apprunner', 'CreateService', 'DeleteService'): ('service', None, 'ServiceArn', None),
+    ('resource-groups', 'CreateGroup', 'DeleteGroup'): ('group', 'Name', 'GroupArn', None),
+    ('codestar-connections', 'CreateConnection', 'DeleteConnection'): ('connection', None, 'ConnectionArn', None),
+}
+_EVENT_INDEX = {}
+for (_service, _create, _delete), _spec in RESOURCE_EVENTS.items():
+    _EVENT_INDEX[(_service, _create)] = ('add', _spec)
+    _EVENT_INDEX[(_service, _delete)] = ('remove', _spec)
+
+
+def _resource_changes(ev: TrailEvent) -> Iterator[Dict]:
+    action, (rtype, id_key, arn_key, arn_of) = _EVENT_INDEX[(ev.service, ev.name)]
+    arn = ev.get(arn_key) if arn_key else None
+    if not arn and arn_of:
+        arn = arn_of(ev)
+    if not arn:
+        return
+    if ev.service == 'codestar-connections' and action == 'add' and ev.request.get('ProviderType') != 'GitHub':
+        return  # the reader lists GitHub connections only
+    identifier = (ev.get(id_key) if id_key else None) or arn
+    # ECS payloads are camelCase in the API too; the others go to link_payload in PascalCase
+    if ev.service == 'ecs':
+        payload = _owner(ev.raw_response, arn_key[:1].lower() + arn_key[1:])
+    else:
+        payload = _owner(ev.response, arn_key) if arn_key else None
+    tags = _tags(ev.request) if ev.service == 'codestar-connections' else {}
+    yield ev.change(action, rtype, identifier, arn, tags, payload)
+
+
+def resource_changes(record: Dict, region: str) -> List[Dict]:
+    """
+    Inventory changes ('add'/'remove', with the reader's identifiers and ARNs) from one CloudTrail
+    record. Failed, read-only and other-region calls give none (S3 buckets are listed from every region).
+    """
+    if record.get('errorCode') or record.get('readOnly') or 'eventSource' not in record:
+        return []
+    ev = TrailEvent(record)
+    if ev.region != region and ev.service != 's3':
+        return []
+    try:
+        if ev.service == 'ec2':
+            return list(_ec2_changes(ev))
+        if (ev.service, ev.name) in _EVENT_INDEX:
+            return list(_resource_changes(ev))
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        logger.warning(f"Could not read {ev.service} {ev.name} event {record.get('eventID')}: {e}")
+    return []
+
+
+# --- Event sources ---
+
+def read_trail_file(data: bytes) -> List[Dict]:
+    """CloudTrail records of a delivered log file (gzipped JSON) or an uncompressed export."""
+    if data[:2] == b'\x1f\x8b':
+        data = gzip.decompress(data)
+    return json.loads(data).get('Records', [])
+
+
+def message_records(body, s3=None) -> List[Dict]:
+    """
+    CloudTrail records in a queue message: an EventBridge "AWS API Call via CloudTrail" event,
+    an SNS envelope, a CloudTrail log delivery notification or an S3 event notification
+    (the log files are then read with s3).
+    """
+    if isinstance(body, (str, bytes)):
+        body = json.loads(body)
+    if body.get('Type') == 'Notification' and 'Message' in body:
+        return message_records(body['Message'], s3)
+    if 'detail' in body and 'detail-type' in body:
+        return [body['detail']] if 'eventSource' in body['detail'] else []
+    objects = []
+    if 's3Bucket' in body:
+        objects = [(body['s3Bucket'], key) for key in body.get('s3ObjectKey', [])]
+    records = []
+    for record in body.get('Records', []):
+        if 's3' in record:
+            objects.append((record['s3']['bucket']['name'], record['s3']['object']['key']))
+        elif 'eventSource' in record and 'eventName' in record:
+            records.append(record)
+    for bucket, key in objects:
+        if s3 is None:
+            raise ValueError(f"Message points at s3://{bucket}/{key} but no S3 client is available")
+        records.extend(read_trail_file(s3.get_object(Bucket=bucket, Key=key)['Body'].read()))
+    return records
+
+
+def _fatal_read_error(e: ClientError) -> bool:
+    return is_interruption(e) or e.response.get('Error', {}).get('Code') in FATAL_READ_CODES
+
+
+class SqsEventSource:
+    """CloudTrail events from an SQS queue (EventBridge rule target, or CloudTrail/S3 notifications)."""
+
+    def __init__(self, session, queue_url: str):
+        self.name = queue_url
+        self.queue_url = queue_url
+        self.sqs = session.client('sqs')
+        self.s3 = session.client('s3')
+        self._receipts = []
+
+    def poll(self, wait: float) -> List[Dict]:
+        response = self.sqs.receive_message(QueueUrl=self.queue_url, MaxNumberOfMessages=10,
+                                            WaitTimeSeconds=int(min(wait, 20)))
+        records, receipts = [], []
+        for message in response.get('Messages', []):
+            try:
+                records.extend(message_records(message['Body'], self.s3))
+            except ValueError as e:
+                logger.warning(f"Skipping unreadable message {message['MessageId']}: {e}")
+            except ClientError as e:
+                # Expired credentials or no access to the trail bucket fail every message alike: raise,
+                # leaving the whole batch queued. Otherwise (e.g. NoSuchKey) only this message stays
+                # queued and comes back after its visibility timeout (or goes to the dead-letter queue)
+                if _fatal_read_error(e):
+                    raise
+                logger.warning(f"Could not read the trail file of message {message['MessageId']}: {e}")
+                continue
+            receipts.append(message['ReceiptHandle'])
+        self._receipts.extend(receipts)
+        return records
+
+    def position(self):
+        return None
+
+    def commit(self):
+        """Deletes the received messages, once their changes are saved."""
+        for i in range(0, len(self._receipts), 10):
+            entries = [{'Id': str(n), 'ReceiptHandle': h} for n, h in enumerate(self._receipts[i:i + 10])]
+            self.sqs.delete_message_batch(QueueUrl=self.queue_url, Entries=entries)
+        self._receipts = []
+
+
+class LocalQueueSource:
+    """
+    Stand-in for SQS: every file in the directory is one message (same bodies as SqsEventSource)
+    and is removed once applied. LocalQueueSource.send() enqueues one.
+    """
+
+    def __init__(self, directory: str, s3=None):
+        self.name = f"queue:{directory}"
+        self.directory = directory
+        self.s3 = s3
+        self._received = []
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def send(directory: str, body: Dict) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{time.time_ns()}.json")
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(body, f)
+        os.replace(path + '.tmp', path)
+        return path
+
+    def poll(self, wait: float) -> List[Dict]:
+        paths = sorted(glob.glob(os.path.join(self.directory, '*.json')))[:10]
+        if not paths:
+            time.sleep(wait)
+        records, received = [], []
+        for path in paths:
+            with open(path, 'rb') as f:
+                try:
+                    records.extend(message_records(f.read(), self.s3))
+                except ValueError as e:
+                    logger.warning(f"Skipping unreadable message {path}: {e}")
+                except ClientError as e:
+                    # As in SqsEventSource: the message stays in the directory for the next poll
+                    if _fatal_read_error(e):
+                        raise
+                    logger.warning(f"Could not read the trail file of message {path}: {e}")
+                    continue
+            received.append(path)
+        self._received.extend(received)
+        return records
+
+    def position(self):
+        return None
+
+    def commit(self):
+        for path in self._received:
+            if os.path.exists(path):
+                os.remove(path)
+        self._received = []
+
+
+class _TrailFileSource(ABC):
+    """
+    CloudTrail log files read in name order (delivery time order within one region prefix).
+    Files can arrive after later-named ones, so there is no strict cursor: the listing starts after
+    the newest file read more than `lookback` seconds ago, and files read since then are skipped by name.
+    """
+
+    def __init__(self, lookback: float = TRAIL_LOOKBACK_SECONDS):
+        self.lookback = lookback
+        self.after: Optional[str] = None        # files up to this name have all been read
+        self.seen: Dict[str, float] = {}        # files after it that have been read -> when
+        self._pending: List[str] = []
+
+    @property
+    def cursor(self) -> Dict:
+        return {'after': self.after, 'seen': self.seen}
+
+    @cursor.setter
+    def cursor(self, value):
+        # Inventories saved before the lookback window hold the last file name only
+        if isinstance(value, dict):
+            self.after, self.seen = value.get('after'), dict(value.get('seen') or {})
+        else:
+            self.after, self.seen = value, {}
+
+    @abstractmethod
+    def _names_after(self, after: Optional[str]) -> Iterator[str]:
+        """Names of the files after `after`, in order."""
+
+    @abstractmethod
+    def _read(self, name: str) -> bytes:
+        """Raw (possibly gzipped) contents of one file."""
+
+    def poll(self, wait: float) -> List[Dict]:
+        unread = (n for n in self._names_after(self.after) if n not in self.seen)
+        names = list(itertools.islice(unread, MAX_FILES_PER_POLL))
+        if not names:
+            time.sleep(wait)
+            return []
+        records = []
+        for name in names:
+            records.extend(read_trail_file(self._read(name)))
+        self._pending = names
+        return records
+
+    def position(self) -> Dict:
+        now = time.time()
+        return {'after': self.after, 'seen': dict(self.seen, **{n: now for n in self._pending})}
+
+    def commit(self):
+        now = time.time()
+        self.seen.update((n, now) for n in self._pending)
+        self._pending = []
+        expired = [n for n, at in self.seen.items() if now - at > self.lookback]
+        if expired:
+            self.after = max(expired + ([self.after] if self.after else []))
+            self.seen = {n: at for n, at in self.seen.items() if n > self.after}
+
+
+class S3EventSource(_TrailFileSource):
+    """CloudTrail log files in S3, e.g. s3://trail-bucket/AWSLogs/<account>/CloudTrail/<region>/"""
+
+    def __init__(self, session, bucket: str, prefix: str = ''):
+        super().__init__()
+        self.name = f"s3://{bucket}/{prefix}"
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3 = session.client('s3')
+
+    def _names_after(self, after):
+        kwargs = {'StartAfter': after} if after else {}
+        # Pages are fetched only as far as the caller reads
+        for page in self.s3.get_paginator('list_objects_v2').paginate(Bucket=self.bucket, Prefix=self.prefix, **kwargs):
+            for o in page.get('Contents', []):
+                if o['Key'].endswith(('.json', '.json.gz')):
+                    yield o['Key']
+
+    def _read(self, name):
+        return self.s3.get_object(Bucket=self.bucket, Key=name)['Body'].read()
+
+
+class LocalFileSource(_TrailFileSource):
+    """Stand-in for S3: exported CloudTrail files (.json or .json.gz) under a local directory."""
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.name = directory
+        self.directory = directory
+
+    def _names_after(self, after):
+        names = sorted(os.path.relpath(p, self.directory).replace(os.sep, '/')
+                       for pattern in ('*.json', '*.json.gz')
+                       for p in glob.glob(os.path.join(self.directory, '**', pattern), recursive=True))
+        return iter([n for n in names if after is None or n > after])
+
+    def _read(self, name):
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            return f.read()
+
+
+def event_source(spec: str, session):
+    """
+    https://sqs.../queue (SQS), s3://bucket/prefix (CloudTrail logs in S3), queue:DIR (local queue)
+    or a directory of exported CloudTrail files.
+    """
+    if spec.startswith('https://'):
+        return SqsEventSource(session, spec)
+    if spec.startswith('s3://'):
+        bucket, _, prefix = spec[len('s3://'):].partition('/')
+        return S3EventSource(session, bucket, prefix)
+    if spec.startswith('queue:'):
+        return LocalQueueSource(spec[len('queue:'):], session.client('s3'))
+    if os.path.isdir(spec):
+        return LocalFileSource(spec)
+    raise ValueError(f"Unknown event source '{spec}': use an SQS queue URL, s3://bucket/prefix, queue:DIR or a directory")
+
+
+# --- Watcher ---
+
+class InventoryWatcher:
+    """
+    Keeps the reader's inventory, report and graph current from CloudTrail events, with a full
+    scan only at start (no saved inventory) and every reconcile_every seconds after that.
+    Deletions are remembered until the next full scan, so a late or redelivered create event
+    does not bring a deleted resource back.
+    """
+
+    def __init__(self, reader, source, reconcile_every: float = DEFAULT_RECONCILE_HOURS * 3600,
+                 path: str = INVENTORY_FILE):
+        self.reader = reader
+        self.source = source
+        self.reconcile_every = reconcile_every
+        self.path = path
+        self.last_full_scan: Optional[float] = None
+        self.deleted: Dict[str, str] = {}        # ARN -> eventTime of its deletion
+        self.applied = 0
+
+    # --- Persistence ---
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('region') != self.reader.region:
+            logger.info(f"Saved inventory is for {data.get('region')}, starting with a full scan")
+            return False
+        self.reader.discovered_resources = RecordList(ReaderRecord, key='ARN', items=data['resources'])
+        self.reader.graph = ResourceGraph.load() or self.reader.graph
+        self.last_full_scan = data.get('last_full_scan')
+        self.deleted = data.get('deleted', {})
+        if data.get('source') == self.source.name and hasattr(self.source, 'cursor'):
+            self.source.cursor = data.get('cursor')
+        logger.info(f"Loaded inventory: {len(self.reader.discovered_resources)} resources")
+        return True
+
+    def save(self, outputs: bool = True):
+        """Writes the inventory (and with outputs, the report and graph) before events are acknowledged."""
+        data = {'region': self.reader.region, 'last_full_scan': self.last_full_scan, 'source': self.source.name,
+                'cursor': self.source.position(), 'deleted': self.deleted,
+                'resources': self.reader.discovered_resources}
+        with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), default=jsonable)
+        os.replace(self.path + '.tmp', self.path)
+        if outputs:
+            self.reader.generate_report()
+            self.reader.graph.save()
+
+    # --- Changes ---
+
+    def reconcile_due(self) -> bool:
+        return self.last_full_scan is None or time.time() - self.last_full_scan >= self.reconcile_every
+
+    def reconcile(self):
+        """Full scan; replaces the inventory and reports what the events had missed."""
+        started = time.time()
+        before = {r['ARN'] for r in self.reader.discovered_resources}
+        self.reader.discovered_resources = RecordList(ReaderRecord, key='ARN')
+        self.reader.graph = ResourceGraph()
+        self.reader.scan_all_resources()
+        after = {r['ARN'] for r in self.reader.discovered_resources}
+        if self.last_full_scan is not None:
+            logger.info(f"Reconciliation: {len(after - before)} resources added and {len(before - after)} removed "
+                        f"that events had not reported")
+        self.last_full_scan = started
+        self.deleted = {}
+        retain_tag_sets(self.reader.discovered_resources)
+        self.save()
+
+    def apply(self, records: List[Dict]) -> int:
+        """Applies the records' creates and deletes (latest event per ARN wins). Returns the changes made."""
+        latest = {}
+        changes = [c for record in records for c in resource_changes(record, self.reader.region)]
+        for c in sorted(changes, key=lambda c: c['Time']):
+            if c['Action'] == 'add' and self.deleted.get(c['ARN'], '') > c['Time']:
+                continue
+            latest[c['ARN']] = c
+
+        resources, graph = self.reader.discovered_resources, self.reader.graph
+        removed = [arn for arn, c in latest.items() if c['Action'] == 'remove' and resources.has(arn)]
+        # Re-created resources are replaced, so their record carries the new tags
+        resources.discard(latest)
+        graph.detach(removed)
+        for arn, c in latest.items():
+            if c['Action'] == 'remove':
+                self.deleted[arn] = c['Time']
+                continue
+            self.deleted.pop(arn, None)
+            self.reader.add_resource(c['Identifier'], arn, c['Service'], c['Type'], c['Tags'])
+            rtype = f"{c['Service']}:{c['Type']}"
+            graph.add_node(arn, rtype)
+            if c['Payload']:
+                link_payload(graph, rtype, c['Payload'])
+        added = sum(1 for c in latest.values() if c['Action'] == 'add')
+        if latest:
+            # Retagged and deleted resources leave tag sets nothing uses any more
+            retain_tag_sets(resources)
+            logger.info(f"Applied {len(records)} events: {added} created, {len(removed)} deleted "
+                        f"({len(resources)} resources)")
+        self.applied += added + len(removed)
+        return added + len(removed)
+
+    def run(self, poll_seconds: float = DEFAULT_POLL_SECONDS, once: bool = False):
+        """Polls until interrupted (with once=True, until no events are left)."""
+        if self.last_full_scan is None and not self.load():
+            self.reconcile()
+        try:
+            while True:
+                if self.reconcile_due():
+                    self.reconcile()
+                try:
+                    records = self.source.poll(0 if once else poll_seconds)
+                except Exception as e:
+                    if not is_interruption(e):
+                        raise
+                    logger.warning(f"Event source unavailable ({e}), retrying in {poll_seconds} s")
+                    time.sleep(poll_seconds)
+                    continue
+                if records:
+                    self.save(outputs=self.apply(records) > 0)
+                # Unreadable messages are acknowledged too, so they are not redelivered forever
+                self.source.commit()
+                if once and not records:
+                    break
+        except KeyboardInterrupt:
+            logger.info("Watch stopped")
+        logger.info(f"{self.applied} inventory changes applied from events")
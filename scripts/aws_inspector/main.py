@@ -1,9 +1,10 @@
 import argparse
 import sys
 import logging
-from datetime import datetime
-from tabulate import tabulate
+import call_trace
+from scan_checkpoint import ScanCheckpoint
 from inspector import AWSResourceInspector
+from report_writer import StreamingReport, format_for_path, FORMATS
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,9 +18,19 @@ def main():
     parser.add_argument("--dry-run", action="store_true", default=True, help="Enable dry-run mode (no deletion). Default is True.")
     parser.add_argument("--execute", action="store_true", help="Explicitly enable deletion (overrides default dry-run).")
     parser.add_argument("--report-only", action="store_true", help="Only generate report, do not attempt cleanup.")
-    parser.add_argument("--output-file", help="Path to save the report file.")
+    parser.add_argument("--output-file", help="Path to save the report file (.md, .csv or .jsonl).")
+    parser.add_argument("--format", choices=FORMATS, default="grid", help="Report format for stdout (default: the legacy grid, which buffers all rows before printing; 'github' streams).")
+    parser.add_argument("--analytics", action="store_true", help="Print pandas group-by summaries (relevance by type, cost tags, missing tags).")
+    parser.add_argument("--summary-only", action="store_true", help="Skip per-resource rows and only report totals (fast path for huge inventories).")
+    parser.add_argument("--time-budget", type=float, help="Seconds to spend deleting; the highest-savings deletions run first and the rest are deferred.")
+    parser.add_argument("--top-savings", type=int, default=10, help="How many DELETE candidates to list by estimated monthly savings.")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted Resource Group scan from its checkpoint instead of starting over.")
+    parser.add_argument("--profile", nargs="?", const=call_trace.TRACE_FILE, metavar="TRACE_FILE",
+                        help="Trace every AWS call: Chrome trace JSON (default call_trace.json), flame graph stacks and a summary at exit.")
 
     args = parser.parse_args()
+    if args.profile:
+        call_trace.enable(args.profile)
 
     # Safety check: Default to dry run unless --execute is passed
     is_dry_run = not args.execute
@@ -31,63 +42,75 @@ def main():
 
     inspector = AWSResourceInspector(region=args.region, dry_run=is_dry_run)
     
-    # 1. Discovery
-    inspector.scan_resource_group(args.group_arn)
+    # 1. Discovery (journaled, so an interrupted scan can continue with --resume)
+    checkpoint = ScanCheckpoint(f"group-{args.region}-{args.group_arn}", inspector.discovered_resources)
+    checkpoint.open(resume=args.resume)
+    try:
+        inspector.scan_resource_group(args.group_arn, checkpoint=checkpoint)
+    except Exception as e:
+        logger.error(f"Scan interrupted: {e}")
+        logger.error(f"Progress is saved in {checkpoint.path}; rerun with --resume to continue")
+        sys.exit(1)
     inspector.enrich_resource_data()
 
     if not inspector.discovered_resources:
         logger.info("No resources found.")
+        checkpoint.clear()
         return
 
-    # 2. Assessment
+    # 2. Assessment + 3. Reporting
+    # Rows are streamed to every sink as each resource is assessed.
     # If active-tag is not provided, we might default to just listing everything or assume nothing is safe.
     # For safety, if no tag is provided, we default to DELETE but justify as "No active tag provided to match".
-    analyzed_resources = inspector.assess_relevance(active_project_tag=args.active_tag)
-
-    # 3. Reporting
-    table_data = []
-    for r in analyzed_resources:
-        # Format tags for display
-        tags_str = "\n".join([f"{k}={v}" for k, v in r.get('Tags', {}).items()])
-        table_data.append([
-            r['Type'], 
-            r['Arn'], # Show full ARN
-            tags_str,
-            r.get('Relevance'), 
-            r.get('Justification')
-        ])
-    
-    print("\n" + "="*50)
-    print("INSPECTION REPORT")
-    print("="*50)
-    print(tabulate(table_data, headers=["Type", "Resource ID", "Tags", "Action", "Justification"], tablefmt="grid"))
-    print(f"Total Resources: {len(analyzed_resources)}")
-    
-    delete_count = sum(1 for r in analyzed_resources if r['Relevance'] == 'DELETE')
-    print(f"Resources marked for deletion: {delete_count}")
-    print("="*50 + "\n")
+    report = StreamingReport(summary_only=args.summary_only)
+    report.add_sink(sys.stdout, args.format)
 
+    output = None
     if args.output_file:
         try:
-            # Determine table format based on extension
-            fmt = "github" if args.output_file.endswith(".md") else "grid"
-            
-            with open(args.output_file, 'w') as f:
-                if fmt == "github":
-                    f.write(f"# INSPECTION REPORT\n")
-                    f.write(f"**Date**: {datetime.now().isoformat()}\n\n")
-                    f.write(tabulate(table_data, headers=["Type", "Resource ID", "Tags", "Action", "Justification"], tablefmt=fmt))
-                    f.write(f"\n\n**Total Resources**: {len(analyzed_resources)}\n")
-                    f.write(f"**Resources marked for deletion**: {delete_count}\n")
-                else:
-                    f.write("INSPECTION REPORT\n")
-                    f.write("="*50 + "\n")
-                    f.write(tabulate(table_data, headers=["Type", "Resource ID", "Tags", "Action", "Justification"], tablefmt=fmt))
-                    f.write(f"\nTotal Resources: {len(analyzed_resources)}\n")
-                    f.write(f"Resources marked for deletion: {delete_count}\n")
-            logger.info(f"Report saved to {args.output_file}")
+            output = open(args.output_file, 'w', newline='')
+            report.add_sink(output, format_for_path(args.output_file))
         except Exception as e:
-            logger.error(f"Failed to save report to file: {e}")
+            logger.error(f"Failed to open report file: {e}")
+
+    print("\n" + "="*50)
+    report.begin()
+    try:
+        for resource in inspector.iter_assessments(active_project_tag=args.active_tag):
+            report.write(resource)
+        report.end()
+    finally:
+        if output:
+            output.close()
+            logger.info(f"Report saved to {args.output_file}")
+
+    print("="*50 + "\n")
+    # The report is out; the next run scans afresh
+    checkpoint.clear()
+
+    if args.analytics:
+        # pandas is only needed here, so import it on demand
+        import analytics
+        df = analytics.load_inventory(inspector.discovered_resources)
+        print(analytics.relevance_summary(df).to_string() + "\n")
+        print(analytics.cost_attribution(df, cost_column='MonthlyCost').to_string() + "\n")
+        missing = analytics.untagged(df)
+        print(f"Resources missing required tags ({', '.join(analytics.REQUIRED_TAGS)}): {len(missing)}")
+        if not missing.empty:
+            print(analytics.count_by(missing, 'MissingTags').to_string() + "\n")
+
+    delete_count = report.delete_count
+    analyzed_resources = report.delete_candidates
+
+    if analyzed_resources and args.top_savings:
+        from cost_model import rank_by_savings, total_savings
+        ranked = rank_by_savings(analyzed_resources)
+        print(f"Estimated savings if all DELETE candidates go: ${total_savings(ranked):,.2f}/month "
+              f"(pricing snapshot {inspector.cost_model.snapshot})")
+        for r in ranked[:args.top_savings]:
+            cost = 'n/a' if r.get('MonthlyCost') is None else f"{r['MonthlyCost']:,.2f}"
+            print(f"  {cost:>10}  {r['Type']:<45} {r['Arn']}")
+        print()
 
     if args.report_only:
         logger.info("Report only mode. Exiting.")
@@ -97,11 +120,11 @@ def main():
         if is_dry_run:
             logger.info("Dry run complete. No resources deleted. Use --execute to perform deletion.")
             # Call cleanup in dry run mode to show what would happen
-            inspector.cleanup(analyzed_resources) 
+            inspector.cleanup(analyzed_resources, time_budget=args.time_budget)
         else:
             confirmation = input(f"WARNING: You are about to delete {delete_count} resources. Type 'CONFIRM' to proceed: ")
             if confirmation == "CONFIRM":
-                inspector.cleanup(analyzed_resources)
+                inspector.cleanup(analyzed_resources, time_budget=args.time_budget)
             else:
                 logger.info("Deletion cancelled by user.")
     else:
@@ -0,0 +1,169 @@
+import argparse
+import json
+import logging
+import re
+from typing import Dict, Iterable, Optional
+from naming_policy import load_naming_policy, DEFAULT_ENV_DIR
+from tagging_engine import LEGACY_NAMES, QUALIFIED_KEYS
+from tf_state import load_inventory
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# naming.tf keys each resource type may use. Inspector records carry CloudFormation types,
+# reader records "<service>:<type>".
+KEYS_BY_TYPE = {
+    'AWS::EC2::VPC': ['vpc'],
+    'AWS::EC2::Subnet': ['public_subnet', 'private_subnet'],
+    'AWS::EC2::InternetGateway': ['igw'],
+    'AWS::EC2::NatGateway': ['nat_gateway'],
+    'AWS::EC2::RouteTable': ['route_table'],
+    'AWS::EC2::SecurityGroup': ['alb_sg', 'app_sg', 'rds_sg'],
+    'AWS::ElasticLoadBalancingV2::LoadBalancer': ['alb'],
+    'AWS::ElasticLoadBalancingV2::TargetGroup': ['target_group'],
+    'AWS::ECS::Cluster': ['ecs_cluster'],
+    'AWS::ECS::Service': ['ecs_service'],
+    'AWS::ECS::TaskDefinition': ['task_definition'],
+    'AWS::S3::Bucket': ['s3_assets', 's3_artifacts'],
+    'AWS::ECR::Repository': ['ecr_repository'],
+    'AWS::RDS::DBInstance': ['rds_instance'],
+    'AWS::DynamoDB::Table': ['dynamodb_table'],
+    'AWS::IAM::Role': ['execution_role', 'task_role', 'pipeline_role', 'build_role'],
+    'AWS::CodePipeline::Pipeline': ['code_pipeline'],
+    'AWS::CodeBuild::Project': ['code_build'],
+    'AWS::CodeStarConnections::Connection': ['connection'],
+    'AWS::Logs::LogGroup': ['cloudwatch_log_group', 'build_log_group'],
+    'AWS::ResourceGroups::Group': ['resource_group'],
+}
+READER_TYPES = {
+    'ec2:vpc': 'AWS::EC2::VPC',
+    'ec2:subnet': 'AWS::EC2::Subnet',
+    'ec2:internet-gateway': 'AWS::EC2::InternetGateway',
+    'ec2:natgateway': 'AWS::EC2::NatGateway',
+    'ec2:route-table': 'AWS::EC2::RouteTable',
+    'ec2:security-group': 'AWS::EC2::SecurityGroup',
+    'elasticloadbalancing:loadbalancer': 'AWS::ElasticLoadBalancingV2::LoadBalancer',
+    'elasticloadbalancing:targetgroup': 'AWS::ElasticLoadBalancingV2::TargetGroup',
+    'ecs:cluster': 'AWS::ECS::Cluster',
+    'ecs:service': 'AWS::ECS::Service',
+    'ecs:task-definition': 'AWS::ECS::TaskDefinition',
+    's3:bucket': 'AWS::S3::Bucket',
+    'ecr:repository': 'AWS::ECR::Repository',
+    'rds:db-instance': 'AWS::RDS::DBInstance',
+    'dynamodb:table': 'AWS::DynamoDB::Table',
+    'codepipeline:pipeline': 'AWS::CodePipeline::Pipeline',
+    'codebuild:project': 'AWS::CodeBuild::Project',
+    'codestar-connections:connection': 'AWS::CodeStarConnections::Connection',
+    'logs:log-group': 'AWS::Logs::LogGroup',
+    'resource-groups:group': 'AWS::ResourceGroups::Group',
+}
+
+_QUALIFIER = r'(?:-[A-Za-z0-9][A-Za-z0-9.-]*)?'
+
+
+def resource_name(resource: Dict) -> Optional[str]:
+    """The Name tag, else the name AWS gives the resource (bucket, cluster, family, log group, ...)."""
+    name = (resource.get('Tags') or {}).get('Name')
+    if name:
+        return name
+    arn = resource.get('Arn') or resource.get('ARN')
+    if not arn:
+        return resource.get('Identifier')
+    resource_part = arn.split(':', 5)[-1]
+    if resource_part.startswith('log-group:'):
+        return resource_part[len('log-group:'):].rsplit(':*', 1)[0]
+    path = resource_part.split('/')
+    if path[0] == 'targetgroup':
+        return path[1]          # targetgroup/<name>/<id>
+    if path[0] == 'loadbalancer':
+        return path[2]          # loadbalancer/app/<name>/<id>
+    if path[0] == 'task-definition':
+        return path[-1].rsplit(':', 1)[0]
+    return path[-1]
+
+
+class NamingChecker:
+    """
+    Validates resource names against the naming.tf policy. All expected names are compiled
+    into one alternation (longest first, one named group per key), so each name costs a
+    single match plus a dict lookup.
+    """
+
+    def __init__(self, policy: Dict):
+        self.naming: Dict[str, str] = policy['naming']
+        self.prefix: str = policy['prefix']
+        alternatives = []
+        for key, expected in sorted(self.naming.items(), key=lambda kv: len(kv[1]), reverse=True):
+            pattern = re.escape(expected) + (_QUALIFIER if key in QUALIFIED_KEYS else '')
+            alternatives.append(f"(?P<{key}>{pattern})")
+        self.pattern = re.compile('|'.join(alternatives))
+
+    def check(self, resource: Dict) -> Optional[Dict]:
+        """None if the resource conforms (or its type has no naming rule), else a finding."""
+        rtype = READER_TYPES.get(resource.get('Type'), resource.get('Type'))
+        allowed = KEYS_BY_TYPE.get(rtype)
+        if not allowed:
+            return None
+        name = resource_name(resource)
+        m = self.pattern.fullmatch(name) if name else None
+        if m and m.lastgroup in allowed:
+            return None
+
+        if not name:
+            reason = "no name"
+        elif m:
+            reason = f"named as {m.lastgroup}"
+        elif any(name.startswith(p) for prefixes in LEGACY_NAMES.values() for p in prefixes):
+            reason = "legacy name"
+        elif not name.lstrip('/').split('/')[-1].startswith(self.prefix):
+            reason = f"missing prefix {self.prefix}"
+        else:
+            reason = "unknown suffix"
+        return {
+            'Type': rtype,
+            'Resource': resource.get('Arn') or resource.get('ARN') or resource.get('Identifier'),
+            'Name': name,
+            'Expected': ' | '.join(self.naming[k] for k in allowed if k in self.naming),
+            'Reason': reason,
+        }
+
+    def check_all(self, inventory: Iterable[Dict]) -> Dict:
+        checked, findings = 0, []
+        for resource in inventory:
+            rtype = READER_TYPES.get(resource.get('Type'), resource.get('Type'))
+            if rtype not in KEYS_BY_TYPE:
+                continue
+            checked += 1
+            finding = self.check(resource)
+            if finding:
+                findings.append(finding)
+        return {'checked': checked, 'conforming': checked - len(findings), 'findings': findings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check resource names against the Terraform naming policy.')
+    parser.add_argument('--inventory', nargs='+', required=True,
+                        help='main.py --output-file .jsonl reports or aws-services-reader.md reports')
+    parser.add_argument('--env-dir', default=DEFAULT_ENV_DIR, help='Terraform environment holding naming.tf')
+    parser.add_argument('--json', dest='json_file', help='Write the findings to this JSON file')
+    args = parser.parse_args()
+
+    checker = NamingChecker(load_naming_policy(args.env_dir))
+    result = checker.check_all(r for path in args.inventory for r in load_inventory(path))
+
+    logger.info(f"{result['conforming']} of {result['checked']} named resources conform to the naming policy")
+    if result['findings']:
+        logger.info("-" * 120)
+        logger.info(f"{'Type':<40} | {'Name':<40} | {'Expected':<40} | Reason")
+        logger.info("-" * 120)
+        for f in result['findings']:
+            logger.info(f"{f['Type']:<40} | {str(f['Name']):<40} | {f['Expected']:<40} | {f['Reason']}")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as f:
+            json.dump(result, f, indent=2)
+        logger.info(f"Findings written to {args.json_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import re
+from typing import Dict
+
+# environments/dev holds naming.tf (locals.naming, locals.common_tags) and provider.tf (default_tags)
+DEFAULT_ENV_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'environments', 'dev')
+
+_BLOCK_OPEN = re.compile(r'^(\w+)(?:\s+"[^"]*")*\s*(=\s*)?\{$')
+_STRING = re.compile(r'^(\w+)\s*=\s*"(.*)"$')
+_REFERENCE = re.compile(r'^(\w+)\s*=\s*local\.(\w+)$')
+_INTERPOLATION = re.compile(r'\$\{local\.(\w+)\}')
+
+
+def _strip_comment(line: str) -> str:
+    in_string = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_string = not in_string
+        elif not in_string and (ch == '#' or line.startswith('//', i)):
+            return line[:i]
+    return line
+
+
+def parse_tf(text: str) -> Dict:
+    """
+    Reads the small subset of HCL our environment files use: nested blocks/maps and
+    `key = "string"` / `key = local.name` assignments. Values are left unresolved.
+    """
+    root: Dict = {}
+    stack = [root]
+    for raw in text.splitlines():
+        line = _strip_comment(raw).strip()
+        if not line:
+            continue
+        if line == '}':
+            if len(stack) > 1:
+                stack.pop()
+            continue
+        m = _BLOCK_OPEN.match(line)
+        if m:
+            child = stack[-1].setdefault(m.group(1), {})
+            stack.append(child)
+            continue
+        m = _STRING.match(line)
+        if m:
+            stack[-1][m.group(1)] = m.group(2)
+            continue
+        m = _REFERENCE.match(line)
+        if m:
+            stack[-1][m.group(1)] = ('local', m.group(2))
+    return root
+
+
+def _resolve(value, local_values: Dict, depth: int = 0):
+    if depth > 20:
+        raise ValueError(f"Circular local reference near {value!r}")
+    if isinstance(value, tuple):
+        return _resolve(local_values[value[1]], local_values, depth + 1)
+    if isinstance(value, dict):
+        return {k: _resolve(v, local_values, depth + 1) for k, v in value.items()}
+    return _INTERPOLATION.sub(lambda m: str(_resolve(local_values[m.group(1)], local_values, depth + 1)), value)
+
+
+def load_naming_policy(env_dir: str = DEFAULT_ENV_DIR) -> Dict:
+    """
+    Builds the naming policy from an environment directory:
+      naming - logical resource -> expected Name (locals.naming in naming.tf)
+      tags   - tags every resource should carry (provider default_tags, then locals.common_tags)
+      prefix - locals.naming_prefix
+    """
+    parsed: Dict = {}
+    for filename in ['naming.tf', 'provider.tf']:
+        path = os.path.join(env_dir, filename)
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                for key, block in parse_tf(f.read()).items():
+                    parsed.setdefault(key, {}).update(block)
+
+    local_values = parsed.get('locals', {})
+    default_tags = parsed.get('provider', {}).get('default_tags', {}).get('tags', {})
+    tags = _resolve(default_tags, local_values)
+    tags.update(_resolve(local_values.get('common_tags', {}), local_values))
+    return {
+        'naming': _resolve(local_values.get('naming', {}), local_values),
+        'tags': tags,
+        'prefix': _resolve(local_values.get('naming_prefix', ''), local_values),
+    }
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, List, TextIO
+
+# Report columns and the fixed widths used for GitHub markdown rows.
+# Widths are minimums: longer values (e.g. long ARNs) are never truncated.
+COLUMNS = ["Type", "Resource ID", "Tags", "Action", "Justification"]
+MARKDOWN_WIDTHS = [42, 100, 50, 6, 45]
+
+FORMATS = ('github', 'csv', 'jsonl', 'grid')
+
+
+def format_for_path(path: str) -> str:
+    """Picks a report format from a file extension (anything unrecognised keeps the legacy grid)."""
+    if path.endswith('.md'):
+        return 'github'
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith('.jsonl'):
+        return 'jsonl'
+    return 'grid'
+
+
+def report_row(resource: Dict) -> List:
+    return [
+        resource['Type'],
+        resource['Arn'],
+        resource.get('Tags', {}),
+        resource.get('Relevance'),
+        resource.get('Justification'),
+    ]
+
+
+class StreamingReport:
+    """
+    Writes assessment rows to one or more sinks as they are produced.
+    Each row is rendered once per format, then written to every sink using that format.
+    'grid' is the legacy tabulate layout; it needs every row up front, so it is buffered.
+    """
+
+    def __init__(self, summary_only: bool = False):
+        self.summary_only = summary_only
+        self.sinks: Dict[str, List[TextIO]] = {}
+        self._grid_rows: List[List] = []
+        self._csv_buffer = io.StringIO()
+        self._csv_writer = csv.writer(self._csv_buffer)
+        self.total = 0
+        self.by_action: Dict[str, int] = {}
+        self.delete_candidates: List[Dict] = []
+
+    def add_sink(self, stream: TextIO, fmt: str = 'github'):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format '{fmt}'. Expected one of {FORMATS}")
+        self.sinks.setdefault(fmt, []).append(stream)
+
+    @property
+    def delete_count(self) -> int:
+        return self.by_action.get('DELETE', 0)
+
+    # --- Lifecycle ---
+
+    def begin(self):
+        if self.summary_only:
+            return
+        self._emit('github', "# INSPECTION REPORT\n")
+        self._emit('github', f"**Date**: {datetime.now().isoformat()}\n\n")
+        self._emit('github', self._markdown_line(COLUMNS))
+        self._emit('github', self._markdown_line(['-' * w for w in MARKDOWN_WIDTHS]))
+        self._emit('csv', self._render_csv(COLUMNS))
+
+    def write(self, resource: Dict):
+        self.total += 1
+        action = resource.get('Relevance')
+        self.by_action[action] = self.by_action.get(action, 0) + 1
+        if action == 'DELETE':
+            self.delete_candidates.append(resource)
+
+        if self.summary_only:
+            return
+
+        row = report_row(resource)
+        if 'github' in self.sinks:
+            tags = "<br>".join(f"{k}={v}" for k, v in row[2].items())
+            self._emit('github', self._markdown_line([row[0], row[1], tags, row[3], row[4]]))
+        if 'csv' in self.sinks:
+            tags = ";".join(f"{k}={v}" for k, v in row[2].items())
+            self._emit('csv', self._render_csv([row[0], row[1], tags, row[3], row[4]]))
+        if 'jsonl' in self.sinks:
+            self._emit('jsonl', json.dumps(dict(zip(COLUMNS, row))) + "\n")
+        if 'grid' in self.sinks:
+            tags = "\n".join(f"{k}={v}" for k, v in row[2].items())
+            self._grid_rows.append([row[0], row[1], tags, row[3], row[4]])
+
+    def end(self):
+        if self.summary_only:
+            summary = "\n".join(self.summary_lines()) + "\n"
+            self._emit('github', summary)
+            self._emit('grid', summary)
+            if 'csv' in self.sinks:
+                self._emit('csv', self._render_csv(['Action', 'Count']))
+                for action, count in sorted(self.by_action.items(), key=lambda x: str(x[0])):
+                    self._emit('csv', self._render_csv([action, count]))
+                self._emit('csv', self._render_csv(['Total', self.total]))
+            self._emit('jsonl', json.dumps({'Total': self.total, 'ByAction': self.by_action}) + "\n")
+            self._flush()
+            return
+
+        if 'grid' in self.sinks:
+            from tabulate import tabulate
+            self._emit('grid', "INSPECTION REPORT\n" + "=" * 50 + "\n")
+            self._emit('grid', tabulate(self._grid_rows, headers=COLUMNS, tablefmt="grid") + "\n")
+        self._emit('github', f"\n**Total Resources**: {self.total}\n")
+        self._emit('github', f"**Resources marked for deletion**: {self.delete_count}\n")
+        self._emit('grid', f"Total Resources: {self.total}\n")
+        self._emit('grid', f"Resources marked for deletion: {self.delete_count}\n")
+        self._flush()
+
+    def summary_lines(self) -> List[str]:
+        lines = [f"Total Resources: {self.total}"]
+        for action, count in sorted(self.by_action.items(), key=lambda x: str(x[0])):
+            lines.append(f"  {action}: {count}")
+        lines.append(f"Resources marked for deletion: {self.delete_count}")
+        return lines
+
+    # --- Rendering helpers ---
+
+    def _flush(self):
+        for streams in self.sinks.values():
+            for s in streams:
+                s.flush()
+
+    def _emit(self, fmt: str, text: str):
+        for s in self.sinks.get(fmt, []):
+            s.write(text)
+
+    @staticmethod
+    def _markdown_line(cells: List) -> str:
+        padded = [str(c if c is not None else '').replace('|', '\\|').ljust(w) for c, w in zip(cells, MARKDOWN_WIDTHS)]
+        return "| " + " | ".join(padded) + " |\n"
+
+    def _render_csv(self, cells: List) -> str:
+        self._csv_buffer.seek(0)
+        self._csv_buffer.truncate()
+        self._csv_writer.writerow(cells)
+        return self._csv_buffer.getvalue()
@@ -0,0 +1,385 @@
+import argparse
+import json
+import logging
+import os
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from aws_core import chunks
+
+logger = logging.getLogger(__name__)
+
+# Written by aws-services-reader.py (or --build) and read by the cleaner and this CLI
+GRAPH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resource_graph.json')
+
+# Edge kinds: an edge A -> B always means "A depends on B"
+IN = 'in'                   # subnet in VPC, NAT in subnet
+USES = 'uses'               # instance uses SG/subnet/ENI, service uses task definition/target group
+ATTACHED = 'attached'       # IGW attached to VPC, target group attached to load balancer
+ROUTES = 'routes'           # route table routes through an IGW/NAT
+RUNS_ON = 'runs-on'         # ECS service runs on a cluster
+REFERENCES = 'references'   # security group rule names another group
+EDGE_KINDS = [IN, USES, ATTACHED, ROUTES, RUNS_ON, REFERENCES]
+
+
+def node_key(value: str) -> str:
+    """EC2 resources are keyed by their ID (vpc-..., sg-...), everything else by ARN."""
+    if value.startswith('arn:') and value.split(':', 3)[2] == 'ec2':
+        return value.split('/')[-1]
+    return value
+
+
+class ResourceGraph:
+    """
+    Dependency graph over inventory resources, stored as compact adjacency arrays (CSR):
+    node i's dependencies are out_to[out_start[i]:out_start[i + 1]], and the reverse arrays
+    give its dependents. Edges added after a query are merged on the next query.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.types: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.aliases: Dict[str, str] = {}       # e.g. ELB ENI description "app/name/id" -> load balancer ARN
+        self._pending: List[tuple] = []          # (src key, dst key, kind) not yet in the arrays
+        self.out_start, self.out_to, self.out_kind = array('I', [0]), array('I'), array('B')
+        self.in_start, self.in_from = array('I', [0]), array('I')
+
+    # --- Building ---
+
+    def add_node(self, key: str, rtype: str = None) -> int:
+        key = node_key(key)
+        i = self.index.get(key)
+        if i is None:
+            i = self.index[key] = len(self.ids)
+            self.ids.append(key)
+            self.types.append(rtype or '')
+        elif rtype and not self.types[i]:
+            self.types[i] = rtype
+        return i
+
+    def link(self, src: str, dst: Optional[str], kind: str):
+        if src and dst:
+            self._pending.append((node_key(src), node_key(dst), kind))
+
+    def detach(self, keys: Iterable[str]):
+        """Drops every edge to or from keys (deleted resources); their nodes stay, unconnected."""
+        drop = {self.index[k] for k in map(node_key, keys) if k in self.index}
+        if not drop:
+            return
+        self._freeze()
+        self._build([e for e in self._edges() if e[0] not in drop and e[1] not in drop])
+
+    def _freeze(self):
+        if not self._pending and len(self.out_start) == len(self.ids) + 1:
+            return
+        edges = set(self._edges())
+        for src, dst, kind in self._pending:
+            src, dst = self.aliases.get(src, src), self.aliases.get(dst, dst)
+            if src != dst:
+                edges.add((self.add_node(src), self.add_node(dst), EDGE_KINDS.index(kind)))
+        self._pending = []
+        self._build(sorted(edges))
+
+    def _edges(self):
+        for i in range(len(self.out_start) - 1):
+            for j in range(self.out_start[i], self.out_start[i + 1]):
+                yield i, self.out_to[j], self.out_kind[j]
+
+    def _build(self, edges: List[tuple]):
+        n = len(self.ids)
+        out_count, in_count = [0] * n, [0] * n
+        for src, dst, _ in edges:
+            out_count[src] += 1
+            in_count[dst] += 1
+        self.out_start, self.in_start = array('I', [0]), array('I', [0])
+        for i in range(n):
+            self.out_start.append(self.out_start[-1] + out_count[i])
+            self.in_start.append(self.in_start[-1] + in_count[i])
+        # edges are sorted by source, so out-arrays fill in order; in-arrays need a cursor per node
+        self.out_to = array('I', (dst for _, dst, _ in edges))
+        self.out_kind = array('B', (kind for _, _, kind in edges))
+        self.in_from = array('I', [0]) * len(edges)
+        cursor = list(self.in_start[:-1])
+        for src, dst, _ in edges:
+            self.in_from[cursor[dst]] = src
+            cursor[dst] += 1
+
+    # --- Queries ---
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def edge_count(self) -> int:
+        self._freeze()
+        return len(self.out_to)
+
+    def _walk(self, key: str, reverse: bool, max_depth: int = None) -> Dict[str, int]:
+        self._freeze()
+        start, targets = (self.in_start, self.in_from) if reverse else (self.out_start, self.out_to)
+        origin = self.index.get(node_key(key))
+        if origin is None:
+            return {}
+        depth = {origin: 0}
+        queue = deque([origin])
+        while queue:
+            node = queue.popleft()
+            if max_depth is not None and depth[node] >= max_depth:
+                continue
+            for j in range(start[node], start[node + 1]):
+                nxt = targets[j]
+                if nxt not in depth:
+                    depth[nxt] = depth[node] + 1
+                    queue.append(nxt)
+        del depth[origin]
+        return {self.ids[i]: d for i, d in depth.items()}
+
+    def dependencies(self, key: str, max_depth: int = None) -> Dict[str, int]:
+        """Everything key depends on (transitively), with the hop count."""
+        return self._walk(key, False, max_depth)
+
+    def dependents(self, key: str, max_depth: int = None) -> Dict[str, int]:
+        """Everything that depends on key, i.e. what deleting it would break (blast radius)."""
+        return self._walk(key, True, max_depth)
+
+    def depends_on(self, src: str, dst: str) -> bool:
+        return node_key(dst) in self.dependencies(src)
+
+    def blast_radius(self, key: str, max_depth: int = None) -> Dict[str, List[str]]:
+        """Dependents grouped by resource type."""
+        by_type: Dict[str, List[str]] = {}
+        for dependent in self.dependents(key, max_depth):
+            by_type.setdefault(self.types[self.index[dependent]] or 'unknown', []).append(dependent)
+        return by_type
+
+    def external_dependents(self, key: str, scope: Set[str]) -> List[str]:
+        """Dependents of key that are not in scope (e.g. not scheduled for deletion)."""
+        scope = {node_key(k) for k in scope}
+        return [d for d in self.dependents(key) if d not in scope]
+
+    # --- Persistence ---
+
+    def save(self, path: str = GRAPH_FILE):
+        self._freeze()
+        data = {
+            'ids': self.ids, 'types': self.types, 'kinds': EDGE_KINDS, 'aliases': self.aliases,
+            'out_start': self.out_start.tolist(), 'out_to': self.out_to.tolist(), 'out_kind': self.out_kind.tolist(),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        logger.info(f"Resource graph ({len(self.ids)} nodes, {len(self.out_to)} edges) saved to {path}")
+
+    @classmethod
+    def load(cls, path: str = GRAPH_FILE) -> Optional['ResourceGraph']:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        graph = cls()
+        graph.ids, graph.types = data['ids'], data['types']
+        # Edges added later (e.g. by inventory_watch.py) still resolve ENI descriptions to load balancers
+        graph.aliases = data.get('aliases', {})
+        graph.index = {key: i for i, key in enumerate(graph.ids)}
+        kinds = [EDGE_KINDS.index(k) for k in data['kinds']]
+        edges = []
+        for i in range(len(graph.ids)):
+            for j in range(data['out_start'][i], data['out_start'][i + 1]):
+                edges.append((i, data['out_to'][j], kinds[data['out_kind'][j]]))
+        graph._build(edges)
+        return graph
+
+
+def link_payload(graph: ResourceGraph, rtype: str, item: Dict):
+    """
+    Adds one describe payload (rtype uses the reader's "<service>:<type>" names) and the
+    relationships it carries.
+    """
+    if rtype == 'ec2:vpc':
+        graph.add_node(item['VpcId'], rtype)
+    elif rtype == 'ec2:subnet':
+        graph.add_node(item['SubnetId'], rtype)
+        graph.link(item['SubnetId'], item.get('VpcId'), IN)
+    elif rtype == 'ec2:security-group':
+        gid = item['GroupId']
+        graph.add_node(gid, rtype)
+        graph.link(gid, item.get('VpcId'), IN)
+        for key in ['IpPermissions', 'IpPermissionsEgress']:
+            for perm in item.get(key, []):
+                for pair in perm.get('UserIdGroupPairs', []):
+                    graph.link(gid, pair.get('GroupId'), REFERENCES)
+    elif rtype == 'ec2:instance':
+        iid = item['InstanceId']
+        graph.add_node(iid, rtype)
+        graph.link(iid, item.get('VpcId'), IN)
+        graph.link(iid, item.get('SubnetId'), USES)
+        for sg in item.get('SecurityGroups', []):
+            graph.link(iid, sg['GroupId'], USES)
+    elif rtype == 'ec2:internet-gateway':
+        graph.add_node(item['InternetGatewayId'], rtype)
+        for att in item.get('Attachments', []):
+            graph.link(item['InternetGatewayId'], att.get('VpcId'), ATTACHED)
+    elif rtype == 'ec2:natgateway':
+        nid = item['NatGatewayId']
+        graph.add_node(nid, rtype)
+        graph.link(nid, item.get('SubnetId'), IN)
+        for address in item.get('NatGatewayAddresses', []):
+            graph.link(nid, address.get('NetworkInterfaceId'), USES)
+    elif rtype == 'ec2:route-table':
+        rid = item['RouteTableId']
+        graph.add_node(rid, rtype)
+        graph.link(rid, item.get('VpcId'), IN)
+        for assoc in item.get('Associations', []):
+            graph.link(assoc.get('SubnetId'), rid, USES)
+        for route in item.get('Routes', []):
+            graph.link(rid, route.get('GatewayId') if route.get('GatewayId', '').startswith('igw-') else None, ROUTES)
+            graph.link(rid, route.get('NatGatewayId'), ROUTES)
+    elif rtype == 'ec2:network-acl':
+        aid = item['NetworkAclId']
+        graph.add_node(aid, rtype)
+        graph.link(aid, item.get('VpcId'), IN)
+        for assoc in item.get('Associations', []):
+            graph.link(assoc.get('SubnetId'), aid, USES)
+    elif rtype == 'ec2:network-interface':
+        eni = item['NetworkInterfaceId']
+        graph.add_node(eni, rtype)
+        graph.link(eni, item.get('SubnetId'), IN)
+        for sg in item.get('Groups', []):
+            graph.link(eni, sg['GroupId'], USES)
+        # The owner depends on its ENI
+        graph.link(item.get('Attachment', {}).get('InstanceId'), eni, USES)
+        description = item.get('Description', '')
+        if description.startswith('ELB '):
+            graph.link(description[len('ELB '):], eni, USES)
+    elif rtype == 'ec2:vpc-endpoint':
+        vid = item['VpcEndpointId']
+        graph.add_node(vid, rtype)
+        graph.link(vid, item.get('VpcId'), IN)
+        for subnet in item.get('SubnetIds', []):
+            graph.link(vid, subnet, USES)
+        for eni in item.get('NetworkInterfaceIds', []):
+            graph.link(vid, eni, USES)
+        for sg in item.get('Groups', []):
+            graph.link(vid, sg['GroupId'], USES)
+    elif rtype == 'elasticloadbalancing:loadbalancer':
+        arn = item['LoadBalancerArn']
+        graph.add_node(arn, rtype)
+        graph.aliases[arn.split(':loadbalancer/')[-1]] = arn
+        graph.link(arn, item.get('VpcId'), IN)
+        for az in item.get('AvailabilityZones', []):
+            graph.link(arn, az.get('SubnetId'), USES)
+        for sg in item.get('SecurityGroups', []):
+            graph.link(arn, sg, USES)
+    elif rtype == 'elasticloadbalancing:targetgroup':
+        arn = item['TargetGroupArn']
+        graph.add_node(arn, rtype)
+        graph.link(arn, item.get('VpcId'), IN)
+        for lb in item.get('LoadBalancerArns', []):
+            graph.link(arn, lb, ATTACHED)
+    elif rtype == 'ecs:cluster':
+        graph.add_node(item['clusterArn'], rtype)
+    elif rtype == 'ecs:service':
+        arn = item['serviceArn']
+        graph.add_node(arn, rtype)
+        graph.link(arn, item.get('clusterArn'), RUNS_ON)
+        graph.link(arn, item.get('taskDefinition'), USES)
+        for lb in item.get('loadBalancers', []):
+            graph.link(arn, lb.get('targetGroupArn'), USES)
+        vpc_config = item.get('networkConfiguration', {}).get('awsvpcConfiguration', {})
+        for ref in vpc_config.get('subnets', []) + vpc_config.get('securityGroups', []):
+            graph.link(arn, ref, USES)
+    elif rtype == 'ecs:task-definition':
+        graph.add_node(item['taskDefinitionArn'], rtype)
+    elif rtype == 'rds:db-instance':
+        arn = item['DBInstanceArn']
+        graph.add_node(arn, rtype)
+        subnet_group = item.get('DBSubnetGroup', {})
+        graph.link(arn, subnet_group.get('VpcId'), IN)
+        for subnet in subnet_group.get('Subnets', []):
+            graph.link(arn, subnet.get('SubnetIdentifier'), USES)
+        for sg in item.get('VpcSecurityGroups', []):
+            graph.link(arn, sg.get('VpcSecurityGroupId'), USES)
+    elif rtype == 'lambda:function':
+        arn = item['FunctionArn']
+        graph.add_node(arn, rtype)
+        vpc_config = item.get('VpcConfig') or {}
+        for ref in vpc_config.get('SubnetIds', []) + vpc_config.get('SecurityGroupIds', []):
+            graph.link(arn, ref, USES)
+
+
+# Paginated listings --build crawls: rtype -> (service, operation, result key)
+CRAWL = {
+    'ec2:vpc': ('ec2', 'describe_vpcs', 'Vpcs'),
+    'ec2:subnet': ('ec2', 'describe_subnets', 'Subnets'),
+    'ec2:security-group': ('ec2', 'describe_security_groups', 'SecurityGroups'),
+    'ec2:internet-gateway': ('ec2', 'describe_internet_gateways', 'InternetGateways'),
+    'ec2:natgateway': ('ec2', 'describe_nat_gateways', 'NatGateways'),
+    'ec2:route-table': ('ec2', 'describe_route_tables', 'RouteTables'),
+    'ec2:network-acl': ('ec2', 'describe_network_acls', 'NetworkAcls'),
+    'ec2:network-interface': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces'),
+    'ec2:vpc-endpoint': ('ec2', 'describe_vpc_endpoints', 'VpcEndpoints'),
+    'elasticloadbalancing:loadbalancer': ('elbv2', 'describe_load_balancers', 'LoadBalancers'),
+    'elasticloadbalancing:targetgroup': ('elbv2', 'describe_target_groups', 'TargetGroups'),
+    'rds:db-instance': ('rds', 'describe_db_instances', 'DBInstances'),
+    'lambda:function': ('lambda', 'list_functions', 'Functions'),
+}
+
+
+def build_graph(core) -> ResourceGraph:
+    """Crawls the region with one paginated call per collection (concurrently), plus ECS services per cluster."""
+    graph = ResourceGraph()
+    listings = core.paginate_many(CRAWL)
+    for rtype, items in listings.items():
+        for item in items:
+            link_payload(graph, rtype, item)
+
+    # Instances are nested in reservations
+    for reservation in core.paginate('ec2', 'describe_instances', 'Reservations'):
+        for inst in reservation.get('Instances', []):
+            link_payload(graph, 'ec2:instance', inst)
+
+    for cluster in core.paginate('ecs', 'list_clusters', 'clusterArns'):
+        link_payload(graph, 'ecs:cluster', {'clusterArn': cluster})
+        arns = core.paginate('ecs', 'list_services', 'serviceArns', cluster=cluster)
+        for batch in chunks(arns, 10):
+            for svc in core.call('ecs', 'describe_services', cluster=cluster, services=batch).get('services', []):
+                link_payload(graph, 'ecs:service', svc)
+    return graph
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description='Query (or build) the resource dependency graph.')
+    parser.add_argument('--build', action='store_true', help='Crawl the region and save a fresh graph')
+    parser.add_argument('--region', default='us-east-1', help='AWS Region (with --build)')
+    parser.add_argument('--graph', default=GRAPH_FILE, help='Graph file (written by aws-services-reader.py or --build)')
+    parser.add_argument('--blast-radius', metavar='ID_OR_ARN', help='What depends on this resource')
+    parser.add_argument('--dependencies', metavar='ID_OR_ARN', help='What this resource depends on')
+    parser.add_argument('--max-depth', type=int, help='Limit the number of hops')
+    args = parser.parse_args()
+
+    if args.build:
+        from aws_core import AwsExecutor
+        with AwsExecutor(args.region) as core:
+            graph = build_graph(core)
+        graph.save(args.graph)
+    else:
+        graph = ResourceGraph.load(args.graph)
+        if graph is None:
+            logger.error(f"No graph at {args.graph}. Run aws-services-reader.py or use --build.")
+            return
+    logger.info(f"Graph: {len(graph)} resources, {graph.edge_count} relationships")
+
+    if args.blast_radius:
+        radius = graph.blast_radius(args.blast_radius, args.max_depth)
+        logger.info(f"{sum(len(v) for v in radius.values())} resources depend on {args.blast_radius}:")
+        for rtype, keys in sorted(radius.items()):
+            logger.info(f"  {rtype} ({len(keys)}): {', '.join(sorted(keys)[:10])}{' ...' if len(keys) > 10 else ''}")
+    if args.dependencies:
+        deps = graph.dependencies(args.dependencies, args.max_depth)
+        logger.info(f"{args.dependencies} depends on {len(deps)} resources:")
+        for key, depth in sorted(deps.items(), key=lambda kv: kv[1]):
+            logger.info(f"  [{depth}] {graph.types[graph.index[key]] or 'unknown'} {key}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TagSet(dict):
+    """
+    Immutable tags dict shared by every resource with the same tags (see shared_tags).
+    Still a dict, so json, pandas and tabulate treat it as one.
+    """
+    __slots__ = ('_hash',)
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(frozenset(self.items()))
+            return self._hash
+
+    def __reduce__(self):
+        return shared_tags, (dict(self),)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("TagSet is shared between resources; build a new dict instead")
+
+    __setitem__ = __delitem__ = update = pop = popitem = clear = setdefault = _immutable
+
+
+EMPTY_TAGS = TagSet()
+_tag_sets: Dict[TagSet, TagSet] = {EMPTY_TAGS: EMPTY_TAGS}
+
+
+def shared_tags(tags: Optional[Mapping]) -> TagSet:
+    """The canonical TagSet for these tags, with interned keys and values."""
+    if isinstance(tags, TagSet):
+        return tags
+    if not tags:
+        return EMPTY_TAGS
+    candidate = TagSet((sys.intern(str(k)), sys.intern(str(v))) for k, v in tags.items())
+    return _tag_sets.setdefault(candidate, candidate)
+
+
+def tag_set_count() -> int:
+    return len(_tag_sets)
+
+
+def retain_tag_sets(records: Iterable[Mapping]) -> int:
+    """
+    Forgets the shared tag sets none of records use (e.g. after retags in the long-running
+    inventory_watch), so the table does not grow for good. A set still held elsewhere only stops
+    being shared with new records. Returns how many were dropped.
+    """
+    used = {id(r.get('Tags')) for r in records}
+    before = len(_tag_sets)
+    kept = [t for t in _tag_sets if id(t) in used]
+    _tag_sets.clear()
+    _tag_sets[EMPTY_TAGS] = EMPTY_TAGS
+    _tag_sets.update((t, t) for t in kept)
+    return before - len(_tag_sets)
+
+
+class CompactRecord(MutableMapping):
+    """
+    Dict-compatible resource record: FIELDS live in __slots__ (strings in INTERNED are interned,
+    'Tags' is a shared TagSet), any other key goes to a small overflow dict created on first use.
+    Subclasses list their fields in __slots__.
+    """
+    __slots__ = ('_extra',)
+    FIELDS: Tuple[str, ...] = ()
+    INTERNED: FrozenSet[str] = frozenset()
+
+    def __init__(self, data: Mapping = (), **kwargs):
+        self._extra = None
+        for source in (data, kwargs):
+            for key, value in (source.items() if isinstance(source, Mapping) else source):
+                self[key] = value
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+        else:
+            value = self._extra.get(key, _MISSING) if self._extra else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            if key == 'Tags':
+                value = shared_tags(value)
+            elif key in self.INTERNED and type(value) is str:
+                value = sys.intern(value)
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS and hasattr(self, key):
+            object.__delattr__(self, key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return hasattr(self, key)
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for key in self.FIELDS if hasattr(self, key)) + len(self._extra or ())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def to_dict(self) -> Dict:
+        return dict(self)
+
+
+class ReaderRecord(CompactRecord):
+    """A resource of aws-services-reader.py."""
+    __slots__ = ('Identifier', 'ARN', 'Service', 'Type', 'Region', 'Tags')
+    FIELDS = __slots__
+    INTERNED = frozenset({'Service', 'Type', 'Region'})
+
+
+class InspectorRecord(CompactRecord):
+    """A resource of the inspector, from discovery through assessment."""
+    __slots__ = ('Arn', 'Type', 'Status', 'Tags', 'Relevance', 'Justification', 'MonthlyCost')
+    FIELDS = __slots__
+    INTERNED = frozenset({'Type', 'Status', 'Relevance'})
+
+
+class RecordList(list):
+    """
+    List of compact records: appended or extended dicts become record_type instances, and the
+    key field (e.g. ARN) is indexed so membership checks do not scan the list.
+    """
+
+    def __init__(self, record_type: type, key: str = None, items: Iterable[Mapping] = ()):
+        super().__init__()
+        self.record_type = record_type
+        self.key = key
+        self._keys = set()
+        self.extend(items)
+
+    def append(self, item: Mapping):
+        record = item if type(item) is self.record_type else self.record_type(item)
+        if self.key:
+            self._keys.add(record.get(self.key))
+        super().append(record)
+
+    def extend(self, items: Iterable[Mapping]):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def has(self, key_value) -> bool:
+        return key_value in self._keys
+
+    def discard(self, key_values: Iterable) -> int:
+        """Removes the records whose key is in key_values (one pass over the list). Returns how many."""
+        key_values = self._keys.intersection(key_values)
+        if not key_values:
+            return 0
+        kept = [r for r in self if r.get(self.key) not in key_values]
+        removed = len(self) - len(kept)
+        self[:] = kept
+        self._keys -= key_values
+        return removed
+
+
+def jsonable(value):
+    """json.dump default= for records and other mappings."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
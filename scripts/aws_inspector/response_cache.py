@@ -0,0 +1,277 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Shared by every script (reader, cleaner, find_unused_*, main.py); set to "off" to disable
+# or to a path to use another file
+CACHE_ENV = 'AWS_INSPECTOR_CACHE'
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'response_cache.sqlite')
+
+DEFAULT_TTL = 300
+# Seconds a response stays fresh, per service (0 = never cached)
+SERVICE_TTLS = {
+    'ec2': 300,
+    'elbv2': 300,
+    'ecs': 300,
+    'rds': 600,
+    'lambda': 600,
+    'ecr': 600,
+    's3': 900,
+    'logs': 900,
+    'dynamodb': 600,
+    'resourcegroupstaggingapi': 300,
+    'resource-groups': 300,
+    'cloudwatch': 0,        # metric windows end "now", so requests never repeat
+    'sts': 0,
+}
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Check the size limit every N writes
+EVICT_EVERY = 50
+
+# Operations that only read; anything else counts as a mutation of its service
+READ_PREFIXES = ('Describe', 'List', 'Get', 'BatchGet', 'Search', 'Lookup', 'Query', 'Scan', 'Head', 'Select')
+
+# botocore rewrites these responses in after-call handlers, which would run again on a cached copy
+# (object listings are also too large and too volatile to be worth caching)
+UNCACHEABLE = {'GetConsoleOutput', 'GetTemplate', 'GetBucketLocation', 'ListObjects', 'ListObjectsV2',
+               'ListObjectVersions'}
+UNCACHEABLE_SERVICES = {'iam'}
+
+# Mutations that change what other services report (tags show up everywhere)
+INVALIDATES_ALL = {'resourcegroupstaggingapi'}
+ALSO_INVALIDATE = ['resourcegroupstaggingapi', 'resource-groups']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    service TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_service ON responses (scope, service);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def is_mutation(operation: str) -> bool:
+    return not operation.startswith(READ_PREFIXES)
+
+
+def _encode(value):
+    # Parsed responses hold datetimes (timestamps) and bytes (blobs) besides JSON types
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, (bytes, bytearray)):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f"{type(value).__name__} is not cacheable")
+
+
+def _decode(obj: Dict):
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__bytes__' in obj:
+            return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def credential_identity(session) -> str:
+    """
+    Short hash of the session's access key ID, so two runs with different credentials (env vars,
+    assumed roles) under the same profile name never share entries.
+    """
+    try:
+        credentials = session.get_credentials()
+        access_key = credentials.access_key if credentials else None
+    except Exception:
+        access_key = None
+    if not access_key:
+        return 'anonymous'
+    return hashlib.sha256(access_key.encode('utf-8')).hexdigest()[:16]
+
+
+class _CachedHTTPResponse:
+    """Stands in for the HTTP response botocore expects from a before-call handler."""
+    status_code = 200
+    headers: Dict = {}
+    raw = None
+    content = b''
+
+
+class ResponseCache:
+    """
+    Process-safe (SQLite, WAL) cache of read-only AWS responses, keyed by scope (profile, credentials,
+    region), service, operation and parameters. Bodies are stored as JSON in a file only the owner can read. Installed on a boto3 session through botocore events, so
+    paginators and waiters go through it too.
+
+    A mutating call invalidates that service's entries for every process, and this process then
+    reads the service live for the rest of the run (waiters poll until the mutation shows).
+    """
+
+    def __init__(self, path: str = CACHE_FILE, ttls: Dict[str, int] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttls = dict(SERVICE_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self._dirty = set()                 # (scope, service) mutated by this process
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        self._restrict_permissions()
+
+    def _restrict_permissions(self):
+        # Cached listings describe the account; the WAL and shared-memory files hold the same data
+        for path in (self.path, self.path + '-wal', self.path + '-shm'):
+            try:
+                if os.path.exists(path):
+                    os.chmod(path, 0o600)
+            except OSError as e:
+                logger.debug(f"Could not restrict permissions of {path}: {e}")
+
+    # --- Storage ---
+
+    @staticmethod
+    def make_key(scope: str, service: str, operation: str, params: Dict) -> str:
+        raw = json.dumps([scope, service, operation, params], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, service: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT body, created FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None or now - row[1] > self.ttls.get(service, DEFAULT_TTL):
+                return None
+            self._db.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+        try:
+            return json.loads(row[0], object_hook=_decode)
+        except ValueError:
+            return None                     # written by an older (pickling) version
+
+    def put(self, key: str, scope: str, service: str, operation: str, response: Dict):
+        try:
+            body = json.dumps(response, default=_encode).encode('utf-8')
+        except (TypeError, ValueError):
+            return                          # e.g. streaming bodies
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                             (key, scope, service, operation, now, now, len(body), body))
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        """Drops least recently used entries until the cache fits max_bytes (caller holds the lock)."""
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in self._db.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany('DELETE FROM responses WHERE key = ?', victims)
+        logger.debug(f"Response cache: evicted {len(victims)} entries")
+
+    def invalidate(self, scope: str, service: str = None):
+        with self._lock:
+            if service is None or service in INVALIDATES_ALL:
+                self._db.execute('DELETE FROM responses WHERE scope = ?', (scope,))
+                return
+            for name in [service] + ALSO_INVALIDATE:
+                self._db.execute('DELETE FROM responses WHERE scope = ? AND service = ?', (scope, name))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+
+    # --- botocore hooks ---
+
+    def install(self, session, read: bool = True):
+        """
+        Hooks the cache into a boto3 session; clients created afterwards use it. With read=False
+        the session always calls AWS but still refreshes the cache and invalidates on mutation.
+        """
+        identity = f"{getattr(session, 'profile_name', None) or 'default'}/{credential_identity(session)}"
+        events = session.events
+        events.register('before-parameter-build', lambda **kw: self._before_parameter_build(identity, read, **kw),
+                        unique_id='response-cache-key')
+        events.register('before-call', self._before_call, unique_id='response-cache-read')
+        events.register('after-call', self._after_call, unique_id='response-cache-write')
+
+    def _before_parameter_build(self, identity, read, params, model, context, **kwargs):
+        service = model.service_model.service_name
+        scope = f"{identity}/{context.get('client_region')}"
+        context['response_cache'] = {'scope': scope, 'service': service, 'key': None, 'read': read}
+        if (is_mutation(model.name) or model.has_streaming_output or model.name in UNCACHEABLE
+                or service in UNCACHEABLE_SERVICES or not self.ttls.get(service, DEFAULT_TTL)):
+            return
+        context['response_cache']['key'] = self.make_key(scope, service, model.name, params)
+
+    def _before_call(self, model, context, **kwargs):
+        entry = context.get('response_cache')
+        if not entry or not entry['key'] or not entry['read'] or (entry['scope'], entry['service']) in self._dirty:
+            return None
+        response = self.get(entry['key'], entry['service'])
+        if response is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry['hit'] = True
+        return _CachedHTTPResponse(), response
+
+    def _after_call(self, http_response, parsed, model, context, **kwargs):
+        entry = context.get('response_cache')
+        if not entry or entry.get('hit') or http_response.status_code >= 300:
+            return
+        if is_mutation(model.name):
+            self._dirty.add((entry['scope'], entry['service']))
+            self.invalidate(entry['scope'], entry['service'])
+        elif entry['key'] and (entry['scope'], entry['service']) not in self._dirty:
+            self.put(entry['key'], entry['scope'], entry['service'], model.name, parsed)
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def default_cache() -> Optional[ResponseCache]:
+    """The process-wide cache ($AWS_INSPECTOR_CACHE or response_cache.sqlite), or None when disabled."""
+    setting = os.environ.get(CACHE_ENV, '')
+    if setting.lower() in ('off', '0', 'false', 'no'):
+        return None
+    path = setting or CACHE_FILE
+    with _caches_lock:
+        if path not in _caches:
+            try:
+                _caches[path] = ResponseCache(path)
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache disabled, could not open {path}: {e}")
+                return None
+        return _caches[path]
+
+
+def install_default(session, read: bool = True):
+    """Installs the process-wide cache on a session (no-op when disabled). Returns the cache."""
+    cache = default_cache()
+    if cache is not None:
+        cache.install(session, read)
+    return cache
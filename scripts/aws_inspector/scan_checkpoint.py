@@ -0,0 +1,181 @@
+import json
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from resource_records import jsonable
+
+logger = logging.getLogger(__name__)
+
+# One journal per scan (reader per account and region, inspector per resource group), next to main.py
+CHECKPOINT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Pages of a listing that builds the graph are journaled only with a graph snapshot, taken at most
+# this often (a snapshot rewrites the whole graph); pages in between are listed again on resume
+SNAPSHOT_EVERY_PAGES = 50
+SNAPSHOT_EVERY_SECONDS = 60.0
+
+# Errors that mean "this run cannot go on", as opposed to one service refusing a call:
+# the scan stops so the checkpoint can be resumed instead of reporting a partial inventory
+INTERRUPTION_CODES = {'ExpiredToken', 'ExpiredTokenException', 'RequestExpired', 'InvalidClientTokenId',
+                      'UnrecognizedClientException', 'AuthFailure'}
+
+
+def is_interruption(e: Exception) -> bool:
+    from botocore import exceptions
+
+    if isinstance(e, (exceptions.NoCredentialsError, exceptions.PartialCredentialsError,
+                      exceptions.CredentialRetrievalError, exceptions.TokenRetrievalError,
+                      exceptions.ConnectionError, exceptions.HTTPClientError)):
+        return True
+    return isinstance(e, exceptions.ClientError) and e.response.get('Error', {}).get('Code') in INTERRUPTION_CODES
+
+
+def raise_if_interrupted(e: Exception):
+    """For the scanners' catch-all handlers: re-raises credential and network failures."""
+    if is_interruption(e):
+        raise e
+
+
+def checkpoint_path(scan_id: str) -> str:
+    return os.path.join(CHECKPOINT_DIR, f"scan_checkpoint_{re.sub(r'[^A-Za-z0-9_.-]+', '_', scan_id)}.jsonl")
+
+
+class ScanCheckpoint:
+    """
+    Append-only journal of a scan: finished steps, the next pagination token of the step in
+    progress, and the resources found since the previous entry. Resuming replays it into the
+    caller's resource list (and reloads the graph snapshot, if the scan builds one).
+    A torn last line (crash mid-write) is ignored.
+    """
+
+    def __init__(self, scan_id: str, resources: List[Dict], graph=None, path: str = None,
+                 snapshot_pages: int = SNAPSHOT_EVERY_PAGES, snapshot_seconds: float = SNAPSHOT_EVERY_SECONDS):
+        self.scan_id = scan_id
+        self.resources = resources
+        self.graph = graph
+        self.path = path or checkpoint_path(scan_id)
+        self.graph_path = os.path.splitext(self.path)[0] + '.graph.json'
+        self.done = set()
+        self.tokens: Dict[str, str] = {}
+        self.snapshot_pages = snapshot_pages
+        self.snapshot_seconds = snapshot_seconds
+        self._written = 0
+        self._file = None
+        self._pages_since_snapshot = 0
+        self._last_snapshot = time.monotonic()
+
+    def open(self, resume: bool = False) -> bool:
+        """Starts a new journal, or with resume=True continues the existing one. Returns True if resumed."""
+        resumed = resume and self._replay()
+        if resume and not resumed:
+            logger.info(f"No checkpoint to resume for {self.scan_id}, starting a full scan")
+        self._file = open(self.path, 'a' if resumed else 'w', encoding='utf-8')
+        if not resumed:
+            self._write({'scan': self.scan_id, 'started': time.time()})
+        return resumed
+
+    def _replay(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        entries, intact = [], 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    break
+                intact += len(line)
+        if not entries or entries[0].get('scan') != self.scan_id:
+            logger.warning(f"Checkpoint {self.path} belongs to another scan, ignoring it")
+            return False
+        # Drop a torn last line so new entries are not appended after it
+        with open(self.path, 'r+b') as f:
+            f.truncate(intact)
+        for entry in entries[1:]:
+            self.resources.extend(entry.get('resources', []))
+            if entry.get('done'):
+                self.done.add(entry['step'])
+                self.tokens.pop(entry['step'], None)
+            elif entry.get('token'):
+                self.tokens[entry['step']] = entry['token']
+        self._written = len(self.resources)
+        if self.graph is not None and os.path.exists(self.graph_path):
+            from resource_graph import ResourceGraph
+            # Loaded into the caller's graph object, which the scanner already holds
+            snapshot = ResourceGraph.load(self.graph_path)
+            self.graph.__dict__.update(snapshot.__dict__)
+        logger.info(f"Resuming {self.scan_id}: {len(self.resources)} resources, "
+                    f"{len(self.done)} steps done, {len(self.tokens)} listings in progress")
+        return True
+
+    def _write(self, entry: Dict):
+        self._file.write(json.dumps(entry, separators=(',', ':'), default=jsonable) + '\n')
+        self._file.flush()
+
+    def _flush(self, entry: Dict, snapshot_graph: bool):
+        # Graph first: a journal entry must never point past the snapshot it relies on
+        if snapshot_graph and self.graph is not None:
+            self.graph.save(self.graph_path)
+            self._pages_since_snapshot = 0
+            self._last_snapshot = time.monotonic()
+        entry['resources'] = self.resources[self._written:]
+        self._write(entry)
+        self._written = len(self.resources)
+
+    # --- Progress ---
+
+    def is_done(self, step: str) -> bool:
+        return step in self.done
+
+    def token(self, step: str) -> Optional[str]:
+        return self.tokens.get(step)
+
+    def page_done(self, step: str, next_token: str, snapshot_graph: bool = False):
+        """
+        Journals the next token. With snapshot_graph (the page changed the graph) the entry waits for
+        the next snapshot: a resume must never start past the graph it reloads.
+        """
+        self.tokens[step] = next_token
+        if snapshot_graph and self.graph is not None:
+            self._pages_since_snapshot += 1
+            if (self._pages_since_snapshot < self.snapshot_pages
+                    and time.monotonic() - self._last_snapshot < self.snapshot_seconds):
+                return
+        self._flush({'step': step, 'token': next_token}, snapshot_graph)
+
+    def step_done(self, step: str):
+        self.done.add(step)
+        self.tokens.pop(step, None)
+        self._flush({'step': step, 'done': True}, True)
+
+    def clear(self):
+        """Removes the journal once the scan's output has been written."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        for path in (self.path, self.graph_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_pages(call: Callable, token_in: str, token_out: str, checkpoint: ScanCheckpoint = None,
+               step: str = None, snapshot_graph: bool = False, **kwargs) -> Iterator[Dict]:
+    """
+    Pages of a listing call, e.g. list_pages(logs.describe_log_groups, 'nextToken', 'nextToken').
+    With a checkpoint, starts from the step's saved token and records the next token once the
+    caller is done with each page.
+    """
+    token = checkpoint.token(step) if checkpoint else None
+    while True:
+        page = call(**kwargs, **({token_in: token} if token else {}))
+        yield page
+        token = page.get(token_out)
+        if not token:
+            return
+        if checkpoint:
+            checkpoint.page_done(step, token, snapshot_graph)
@@ -0,0 +1,207 @@
+import argparse
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+from botocore.exceptions import ClientError
+from aws_core import AwsExecutor
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = {'ingress': 'IpPermissions', 'egress': 'IpPermissionsEgress'}
+
+
+class SecurityGroupGraph:
+    """
+    Reference graph between security groups: an edge A -> B means a rule of A names B
+    (UserIdGroupPairs). Built from one describe_security_groups listing plus the ENIs that
+    use each group, so it can drive VPC teardown and be exported for audits.
+    """
+
+    def __init__(self, groups: Iterable[Dict], enis: Iterable[Dict] = ()):
+        self.groups: Dict[str, Dict] = {g['GroupId']: g for g in groups}
+        self.references: Dict[str, Set[str]] = defaultdict(set)     # A -> groups A's rules name
+        self.referenced_by: Dict[str, Set[str]] = defaultdict(set)  # B -> groups whose rules name B
+        self.enis_by_group: Dict[str, List[str]] = defaultdict(list)
+
+        for gid, g in self.groups.items():
+            for key in DIRECTIONS.values():
+                for perm in g.get(key, []):
+                    for pair in perm.get('UserIdGroupPairs', []):
+                        target = pair.get('GroupId')
+                        if target:
+                            self.references[gid].add(target)
+                            self.referenced_by[target].add(gid)
+
+        for eni in enis:
+            for g in eni.get('Groups', []):
+                self.enis_by_group[g['GroupId']].append(eni['NetworkInterfaceId'])
+
+    @classmethod
+    def from_vpc(cls, core: AwsExecutor, vpc_ids: List[str]) -> 'SecurityGroupGraph':
+        vpc_filter = {'Filters': [{'Name': 'vpc-id', 'Values': vpc_ids}]}
+        data = core.paginate_many({
+            'groups': ('ec2', 'describe_security_groups', 'SecurityGroups', vpc_filter),
+            'enis': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces', vpc_filter),
+        })
+        return cls(data['groups'], data['enis'])
+
+    def cycles(self) -> List[List[str]]:
+        """Strongly connected components of more than one group (iterative Tarjan)."""
+        index, low, on_stack, stack, result = {}, {}, set(), [], []
+        counter = 0
+        for root in self.groups:
+            if root in index:
+                continue
+            work = [(root, iter(self.references.get(root, ())))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                advanced = False
+                for child in children:
+                    if child not in self.groups:
+                        continue
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.references.get(child, ()))))
+                        advanced = True
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        result.append(sorted(component))
+        return result
+
+    def blocking_revocations(self, deletable: Set[str]) -> List[Dict]:
+        """
+        The minimal rule revocations needed before deleting `deletable`: references inside a
+        cycle of deletable groups, and references from groups that are kept (e.g. 'default').
+        Returns one {'GroupId', 'Direction', 'IpPermissions'} per group and direction.
+        """
+        cyclic = {}
+        for component in self.cycles():
+            members = set(component) & deletable
+            for gid in members:
+                cyclic[gid] = members
+
+        revocations = []
+        for gid, g in self.groups.items():
+            if gid in deletable:
+                blocked = cyclic.get(gid, set()) - {gid}
+            else:
+                blocked = deletable
+            if not blocked or not (self.references.get(gid, set()) & blocked):
+                continue
+            for direction, key in DIRECTIONS.items():
+                perms = []
+                for perm in g.get(key, []):
+                    pairs = [p for p in perm.get('UserIdGroupPairs', []) if p.get('GroupId') in blocked]
+                    if pairs:
+                        rule = {k: v for k, v in perm.items() if k in ('IpProtocol', 'FromPort', 'ToPort')}
+                        rule['UserIdGroupPairs'] = pairs
+                        perms.append(rule)
+                if perms:
+                    revocations.append({'GroupId': gid, 'Direction': direction, 'IpPermissions': perms})
+        return revocations
+
+    def deletion_waves(self, deletable: Set[str]) -> List[List[str]]:
+        """
+        Orders deletable groups so that nothing still references a group when it is deleted,
+        assuming blocking_revocations() ran first. Each wave can be deleted concurrently.
+        """
+        cyclic_pairs = set()
+        for component in self.cycles():
+            members = set(component)
+            cyclic_pairs |= {(a, b) for a in members for b in members}
+
+        remaining_refs = {}
+        for gid in deletable:
+            remaining_refs[gid] = {src for src in self.referenced_by.get(gid, set())
+                                   if src in deletable and src != gid and (src, gid) not in cyclic_pairs}
+
+        waves = []
+        while remaining_refs:
+            wave = sorted(gid for gid, refs in remaining_refs.items() if not refs)
+            if not wave:
+                # Should not happen once cycles are broken; fall back to deleting what is left
+                waves.append(sorted(remaining_refs))
+                break
+            waves.append(wave)
+            for gid in wave:
+                del remaining_refs[gid]
+            for refs in remaining_refs.values():
+                refs.difference_update(wave)
+        return waves
+
+    def to_dict(self) -> Dict:
+        """Audit view of the graph (JSON-serialisable)."""
+        return {
+            'groups': {
+                gid: {
+                    'name': g.get('GroupName'),
+                    'vpc': g.get('VpcId'),
+                    'references': sorted(self.references.get(gid, ())),
+                    'referenced_by': sorted(self.referenced_by.get(gid, ())),
+                    'enis': self.enis_by_group.get(gid, []),
+                }
+                for gid, g in self.groups.items()
+            },
+            'cycles': self.cycles(),
+            'unused': sorted(gid for gid in self.groups
+                             if not self.enis_by_group.get(gid) and not (self.referenced_by.get(gid, set()) - {gid})),
+        }
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description='Audit security-group references within VPCs.')
+    parser.add_argument('--vpc-id', required=True, nargs='+', help='The ID(s) of the VPC(s) to audit')
+    parser.add_argument('--region', default='us-east-1', help='AWS Region')
+    parser.add_argument('--json', dest='json_file', help='Write the full graph to this JSON file')
+    args = parser.parse_args()
+
+    with AwsExecutor(args.region) as core:
+        try:
+            graph = SecurityGroupGraph.from_vpc(core, args.vpc_id)
+        except ClientError as e:
+            logger.error(f"AWS Error: {e}")
+            return
+
+    audit = graph.to_dict()
+    logger.info(f"{'Group ID':<22} | {'Name':<30} | {'ENIs':>4} | {'Refs':>4} | {'Referenced by':>13}")
+    logger.info("-" * 85)
+    for gid, info in audit['groups'].items():
+        logger.info(f"{gid:<22} | {str(info['name'])[:30]:<30} | {len(info['enis']):>4} | "
+                    f"{len(info['references']):>4} | {len(info['referenced_by']):>13}")
+    logger.info("-" * 85)
+    for cycle in audit['cycles']:
+        logger.info(f"Cycle: {' -> '.join(cycle)}")
+    logger.info(f"Unused groups (no ENIs, not referenced): {', '.join(audit['unused']) or 'none'}")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as f:
+            json.dump(audit, f, indent=2)
+        logger.info(f"Graph written to {args.json_file}")
+
+if __name__ == "__main__":
+    main()
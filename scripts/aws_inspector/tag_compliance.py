@@ -0,0 +1,62 @@
+import argparse
+import logging
+import sys
+
+from inspector.tag_index import TagIndex, REQUIRED_TAGS, INDEX_FILE
+
+logger = logging.getLogger(__name__)
+
+# Cached crawls older than this (seconds) are rebuilt
+DEFAULT_TTL = 3600
+
+
+def load_index(region: str, refresh: bool, refresh_types, ttl: float, index_file: str) -> TagIndex:
+    """Loads the cached index, crawling (fully, or just the given resource types) when asked or expired."""
+    import boto3
+    tagging = boto3.Session(region_name=region).client('resourcegroupstaggingapi')
+
+    index = None if refresh else TagIndex.load(index_file, region=region, ttl=None if refresh_types else ttl)
+    if index is None:
+        index = TagIndex(region)
+        index.crawl(tagging)
+    elif refresh_types:
+        index.crawl(tagging, resource_types=refresh_types)
+    else:
+        logger.info(f"Using cached tag index from {index_file} ({len(index.tags)} resources)")
+        return index
+    index.save(index_file)
+    return index
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description='Tag-compliance queries over a cached tag index.')
+    parser.add_argument('--region', default='us-east-1', help='AWS Region')
+    parser.add_argument('--query', action='append', default=[],
+                        help="Clause such as missing:CostCenter, has:Owner, Project=DigitalHall or Project!=DigitalHall (repeat to AND)")
+    parser.add_argument('--refresh', action='store_true', help='Rebuild the index with a full crawl')
+    parser.add_argument('--refresh-types', nargs='+', help='Re-crawl only these resource types (e.g. ecs:cluster s3)')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help='Max age of the cached index in seconds')
+    parser.add_argument('--index-file', default=INDEX_FILE, help='Where the index is cached')
+    args = parser.parse_args()
+
+    index = load_index(args.region, args.refresh, args.refresh_types, args.ttl, args.index_file)
+
+    if not args.query:
+        print(f"Tag compliance ({len(index.tags)} resources):")
+        for key, missing in index.compliance(REQUIRED_TAGS).items():
+            print(f"  missing {key:<12} {missing}")
+        return
+
+    try:
+        matched = index.query(args.query)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    print(f"{len(matched)} resources match {' AND '.join(args.query)}")
+    for arn in sorted(matched):
+        print(f"  {arn}")
+
+
+if __name__ == "__main__":
+    main()
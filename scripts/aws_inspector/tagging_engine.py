@@ -0,0 +1,225 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from aws_core import AwsExecutor, chunks
+
+logger = logging.getLogger(__name__)
+
+# create_tags accepts many resource IDs per call; TagResources at most 20 ARNs
+EC2_BATCH_SIZE = 1000
+TAG_RESOURCES_BATCH_SIZE = 20
+
+EC2 = 'ec2'
+ARN = 'arn'
+
+# Resources still named by the old convention, mapped to their naming.tf key (name prefixes)
+LEGACY_NAMES = {
+    's3_artifacts': ['liblib-pl-art-'],
+    'connection': ['liblib-github-conn'],
+}
+
+# Kinds created once per AZ/tier may carry a qualifier, e.g. <public_subnet>-us-east-1a
+QUALIFIED_KEYS = {'public_subnet', 'private_subnet', 'nat_gateway', 'route_table'}
+
+
+def tag_dict(tags: Optional[List[Dict]]) -> Dict[str, str]:
+    return {t['Key']: t['Value'] for t in tags or []}
+
+
+def diff_tags(current: Dict[str, str], desired: Dict[str, str]) -> Dict[str, str]:
+    """Only the tags whose value would change."""
+    return {k: v for k, v in desired.items() if current.get(k) != v}
+
+
+def qualified_name(expected: str, current: Optional[str], qualifier: Optional[str]) -> str:
+    """Keeps a current name that already is the expected one or a qualified form of it, else expected-<qualifier>."""
+    if current and (current == expected or current.startswith(expected + '-')):
+        return current
+    return f"{expected}-{qualifier}" if qualifier else expected
+
+
+def change(kind: str, resource_id: str, current: Dict[str, str], desired: Dict[str, str]) -> Dict:
+    return {'kind': kind, 'id': resource_id, 'current': current, 'set': diff_tags(current, desired)}
+
+
+def vpc_changes(core: AwsExecutor, vpc_id: str, policy: Dict) -> List[Dict]:
+    """
+    Desired Name + policy tags for the VPC and its subnets, IGWs, NATs and route tables.
+    Per-AZ kinds keep their qualified names or get an -<az> suffix; the main route table keeps its Name.
+    """
+    naming, base = policy['naming'], policy['tags']
+    vpc_filter = [{'Name': 'vpc-id', 'Values': [vpc_id]}]
+    data = core.paginate_many({
+        'vpcs': ('ec2', 'describe_vpcs', 'Vpcs', {'Filters': vpc_filter}),
+        'route_tables': ('ec2', 'describe_route_tables', 'RouteTables', {'Filters': vpc_filter}),
+        'subnets': ('ec2', 'describe_subnets', 'Subnets', {'Filters': vpc_filter}),
+        'igws': ('ec2', 'describe_internet_gateways', 'InternetGateways',
+                 {'Filters': [{'Name': 'attachment.vpc-id', 'Values': [vpc_id]}]}),
+        'nats': ('ec2', 'describe_nat_gateways', 'NatGateways', {'Filter': vpc_filter}),
+    })
+    changes = []
+
+    def add(resource_id, tags, name_key, az=None):
+        current = tag_dict(tags)
+        if name_key is None:
+            desired = dict(base)
+        elif name_key in QUALIFIED_KEYS:
+            desired = dict(base, Name=qualified_name(naming[name_key], current.get('Name'), az))
+        else:
+            desired = dict(base, Name=naming[name_key])
+        changes.append(change(EC2, resource_id, current, desired))
+
+    for vpc in data['vpcs']:
+        add(vpc['VpcId'], vpc.get('Tags'), 'vpc')
+
+    subnet_az = {s['SubnetId']: s['AvailabilityZone'] for s in data['subnets']}
+
+    # A subnet is public when its route table (explicit association, else the main one) routes to an IGW
+    public_tables, main_public, subnet_tables = set(), False, {}
+    for rt in data['route_tables']:
+        is_public = any(r.get('DestinationCidrBlock') == '0.0.0.0/0' and r.get('GatewayId', '').startswith('igw-')
+                        for r in rt.get('Routes', []))
+        if is_public:
+            public_tables.add(rt['RouteTableId'])
+        is_main, zones = False, set()
+        for assoc in rt.get('Associations', []):
+            if assoc.get('Main'):
+                main_public, is_main = is_public, True
+            elif assoc.get('SubnetId'):
+                subnet_tables[assoc['SubnetId']] = rt['RouteTableId']
+                zones.add(subnet_az.get(assoc['SubnetId']))
+        add(rt['RouteTableId'], rt.get('Tags'), None if is_main else 'route_table',
+            zones.pop() if len(zones) == 1 else None)
+
+    for subnet in data['subnets']:
+        table = subnet_tables.get(subnet['SubnetId'])
+        is_public = table in public_tables if table else main_public
+        add(subnet['SubnetId'], subnet.get('Tags'), 'public_subnet' if is_public else 'private_subnet',
+            subnet['AvailabilityZone'])
+
+    for igw in data['igws']:
+        add(igw['InternetGatewayId'], igw.get('Tags'), 'igw')
+
+    for nat in data['nats']:
+        if nat['State'] not in ['deleted', 'deleting']:
+            add(nat['NatGatewayId'], nat.get('Tags'), 'nat_gateway', subnet_az.get(nat.get('SubnetId')))
+
+    return changes
+
+
+def resource_name(arn: str) -> str:
+    # arn:aws:s3:::bucket, arn:aws:ecs:...:cluster/name, arn:aws:codestar-connections:...:connection/id,
+    # arn:aws:logs:...:log-group:/aws/ecs/name:* (log group ARNs may end in ":*")
+    if arn.endswith(':*'):
+        arn = arn[:-2]
+    return arn.split(':', 5)[-1].split('/')[-1]
+
+
+def naming_key(name: str, policy: Dict) -> Optional[str]:
+    for key, expected in policy['naming'].items():
+        if name == expected.split('/')[-1]:
+            return key
+    for key, prefixes in LEGACY_NAMES.items():
+        if any(name.startswith(p) for p in prefixes):
+            return key
+    return None
+
+
+def account_changes(core: AwsExecutor, policy: Dict) -> List[Dict]:
+    """
+    Policy tags (and Name, when the resource maps to a naming.tf key) for account resources that
+    belong to the project: matched by name against the naming policy, a legacy name or the naming prefix.
+    """
+    # Untagged buckets and connections never show up in get_resources
+    data = core.gather({
+        'tagged': lambda: core.paginate('resourcegroupstaggingapi', 'get_resources', 'ResourceTagMappingList'),
+        'buckets': lambda: core.call('s3', 'list_buckets')['Buckets'],
+        'connections': lambda: _list_connections(core),
+    })
+    current: Dict[str, Dict[str, str]] = {r['ResourceARN']: tag_dict(r.get('Tags')) for r in data['tagged']}
+
+    names: Dict[str, str] = {arn: resource_name(arn) for arn in current}
+    for b in data['buckets']:
+        names.setdefault(f"arn:aws:s3:::{b['Name']}", b['Name'])
+    for c in data['connections']:
+        names[c['ConnectionArn']] = c['ConnectionName']
+
+    changes = []
+    for arn, name in names.items():
+        if arn.startswith('arn:aws:ec2:'):
+            continue  # EC2 resources are handled per VPC with create_tags
+        key = naming_key(name, policy)
+        if key:
+            desired = dict(policy['tags'], Name=policy['naming'][key].split('/')[-1])
+        elif name.startswith(policy['prefix']):
+            desired = dict(policy['tags'])
+        else:
+            continue
+        changes.append(change(ARN, arn, current.get(arn, {}), desired))
+    return changes
+
+
+def _list_connections(core: AwsExecutor) -> List[Dict]:
+    # list_connections has no paginator
+    connections, kwargs = [], {}
+    while True:
+        resp = core.call('codestar-connections', 'list_connections', **kwargs)
+        connections.extend(resp['Connections'])
+        if not resp.get('NextToken'):
+            return connections
+        kwargs['NextToken'] = resp['NextToken']
+
+
+class BulkTagger:
+    """
+    Applies tag changes with as few calls as possible: resources needing the same tag changes
+    share one create_tags (EC2 IDs) or TagResources (ARNs, 20 per call) call, and all batches
+    run in parallel.
+    """
+
+    def __init__(self, core: AwsExecutor):
+        self.core = core
+
+    @staticmethod
+    def batches(changes: List[Dict]) -> List[Tuple[str, List[str], Dict[str, str]]]:
+        groups: Dict[Tuple, List[str]] = {}
+        for c in changes:
+            if c['set']:
+                groups.setdefault((c['kind'], tuple(sorted(c['set'].items()))), []).append(c['id'])
+        batches = []
+        for (kind, tags), ids in groups.items():
+            size = EC2_BATCH_SIZE if kind == EC2 else TAG_RESOURCES_BATCH_SIZE
+            for batch in chunks(ids, size):
+                batches.append((kind, batch, dict(tags)))
+        return batches
+
+    def apply(self, changes: List[Dict], dry_run: bool = True) -> Dict[str, int]:
+        pending = [c for c in changes if c['set']]
+        logger.info(f"{len(pending)} of {len(changes)} resources need tag changes")
+        for c in pending:
+            diff = ", ".join(f"{k}: {c['current'].get(k, '-')} -> {v}" for k, v in c['set'].items())
+            logger.info(f"{'[DRY RUN] ' if dry_run else ''}{c['id']}: {diff}")
+
+        batches = self.batches(changes)
+        logger.info(f"{len(batches)} tagging calls needed")
+        if dry_run or not batches:
+            return {'changed': 0, 'failed': 0, 'calls': 0}
+
+        failed = sum(self.core.map(self._apply_batch, batches))
+        return {'changed': len(pending) - failed, 'failed': failed, 'calls': len(batches)}
+
+    def _apply_batch(self, batch: Tuple[str, List[str], Dict[str, str]]) -> int:
+        kind, ids, tags = batch
+        try:
+            if kind == EC2:
+                self.core.call('ec2', 'create_tags', Resources=ids,
+                               Tags=[{'Key': k, 'Value': v} for k, v in tags.items()])
+                return 0
+            failed = self.core.call('resourcegroupstaggingapi', 'tag_resources',
+                                    ResourceARNList=ids, Tags=tags).get('FailedResourcesMap', {})
+            for arn, info in failed.items():
+                logger.error(f"Failed to tag {arn}: {info.get('ErrorMessage')}")
+            return len(failed)
+        except ClientError as e:
+            logger.error(f"Failed to tag {len(ids)} resources ({', '.join(ids[:3])}...): {e}")
+            return len(ids)
@@ -0,0 +1,154 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from aws_core import AwsExecutor
+
+logger = logging.getLogger(__name__)
+
+# Decisions per revision
+ACTIVE = 'ACTIVE'
+KEEP = 'KEEP'
+STALE = 'STALE'
+
+
+def revision_of(arn: str) -> int:
+    return int(arn.rsplit(':', 1)[-1])
+
+
+class RetentionEngine:
+    """
+    Decides which task-definition revisions to keep. A revision is kept if it is in use
+    (activity set, or the latest revision of a family referenced without a revision), among
+    the newest keep_last of its family, or registered less than keep_days ago.
+    Revisions come from one paginated listing per status; families are evaluated concurrently.
+    """
+
+    def __init__(self, core: AwsExecutor, keep_last: int = 2, keep_days: int = 0,
+                 active_arns: Iterable[str] = (), family_refs: Iterable[str] = ()):
+        self.core = core
+        self.region = core.region
+        self.keep_last = keep_last
+        self.keep_days = keep_days
+        self.active_arns: Set[str] = set(active_arns)
+        self.family_refs: Set[str] = set(family_refs)
+        self.cutoff = datetime.now(timezone.utc) - timedelta(days=keep_days) if keep_days else None
+
+    @property
+    def policy(self) -> Dict:
+        return {'keep_last': self.keep_last, 'keep_days': self.keep_days, 'keep_active': True}
+
+    def list_all_revisions(self, statuses: Iterable[str]) -> Dict[str, List[Dict]]:
+        """
+        Every revision in the region, grouped by exact family, newest first: family -> [{'arn', 'rev', 'status'}].
+        One paginated listing per status replaces per-family familyPrefix calls (a prefix match,
+        so 'web' also returned 'web-worker' revisions).
+        """
+        listings = self.core.paginate_many({
+            status: ('ecs', 'list_task_definitions', 'taskDefinitionArns', {'status': status}) for status in statuses
+        })
+
+        families: Dict[str, List[Dict]] = {}
+        for status, arns in listings.items():
+            for arn in arns:
+                family, revision = arn.split('/')[-1].rsplit(':', 1)
+                families.setdefault(family, []).append({'arn': arn, 'rev': int(revision), 'status': status})
+        for revisions in families.values():
+            revisions.sort(key=lambda r: r['rev'], reverse=True)
+        return families
+
+    def evaluate(self, statuses: Iterable[str] = ('ACTIVE',),
+                 families: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """
+        family -> revisions, newest first, each with 'decision' and 'reason'.
+        Only families with an ACTIVE revision are evaluated unless `families` is given.
+        """
+        started = time.monotonic()
+        by_family = self.list_all_revisions(list(statuses))
+        if families is None:
+            families = [f for f, revisions in by_family.items() if any(r['status'] == 'ACTIVE' for r in revisions)]
+        results = self.core.map(lambda f: self._evaluate_family(f, by_family.get(f, [])), families)
+        logger.info(f"Evaluated {len(families)} families in {time.monotonic() - started:.1f}s")
+        return dict(zip(families, results))
+
+    def _evaluate_family(self, family: str, revisions: List[Dict]) -> List[Dict]:
+        latest_active = next((r['arn'] for r in revisions if r['status'] == 'ACTIVE'), None)
+        candidates = []
+        for i, r in enumerate(revisions):
+            if r['arn'] in self.active_arns:
+                r['decision'], r['reason'] = ACTIVE, "Currently running"
+            elif family in self.family_refs and r['arn'] == latest_active:
+                r['decision'], r['reason'] = ACTIVE, "Latest revision of a referenced family"
+            elif i < self.keep_last:
+                r['decision'], r['reason'] = KEEP, "Recent backup (Safety)"
+            else:
+                r['decision'], r['reason'] = STALE, "Safe to delete"
+                candidates.append(r)
+
+        if self.cutoff and candidates:
+            for r in candidates[:self._first_older_than_cutoff(candidates)]:
+                r['decision'], r['reason'] = KEEP, f"Registered within {self.keep_days} days"
+        return revisions
+
+    def _first_older_than_cutoff(self, candidates: List[Dict]) -> int:
+        """
+        Revisions are registered in order, so registration time falls along the (newest first)
+        list; a binary search needs only log2(n) describe calls per family.
+        """
+        lo, hi = 0, len(candidates)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._registered_at(candidates[mid]['arn']) < self.cutoff:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _registered_at(self, arn: str) -> datetime:
+        td = self.core.call('ecs', 'describe_task_definition', taskDefinition=arn)['taskDefinition']
+        # Very old revisions predate registeredAt; treat them as older than any cutoff
+        return td.get('registeredAt') or datetime.min.replace(tzinfo=timezone.utc)
+
+
+def stale_revisions(decisions: Dict[str, List[Dict]]) -> List[Dict]:
+    return [r for revisions in decisions.values() for r in revisions if r['decision'] == STALE]
+
+
+def save_plan(path: str, engine: RetentionEngine, decisions: Dict[str, List[Dict]], statuses: Iterable[str]):
+    """Writes the stale set so delete_task_definitions.py --plan can act on it without rescanning."""
+    plan = {
+        'account': engine.core.account_id,
+        'region': engine.region,
+        'created_at': time.time(),
+        'policy': engine.policy,
+        'statuses': list(statuses),
+        'stale': [{'arn': r['arn'], 'status': r['status']} for r in stale_revisions(decisions)],
+    }
+    with open(path, 'w') as f:
+        json.dump(plan, f, indent=2)
+    logger.info(f"Retention plan with {len(plan['stale'])} stale revisions written to {path}")
+
+
+def load_plan(path: str) -> Dict:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def plan_candidates(plan: Dict, account: str, region: str, active_arns: Iterable[str], max_age: float) -> List[Dict]:
+    """
+    The plan's stale revisions that are still safe to delete. Raises ValueError for a plan made for
+    another account or region or older than max_age; revisions that became active since it was written are dropped.
+    """
+    if plan.get('account') != account:
+        raise ValueError(f"plan was made for account {plan.get('account') or 'unknown'}, not {account}")
+    if plan['region'] != region:
+        raise ValueError(f"plan was made for {plan['region']}, not {region}")
+    age = time.time() - plan['created_at']
+    if age > max_age:
+        raise ValueError(f"plan is {int(age)}s old (max {int(max_age)}s); write a new one")
+    active = set(active_arns)
+    now_active = [r['arn'] for r in plan['stale'] if r['arn'] in active]
+    for arn in now_active:
+        logger.warning(f"Keeping {arn}: in use since the plan was written")
+    return [r for r in plan['stale'] if r['arn'] not in active]
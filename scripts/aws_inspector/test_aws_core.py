@@ -0,0 +1,114 @@
+import threading
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+
+import aws_core
+from aws_core import AwsExecutor, RateLimiter, chunks
+
+
+@pytest.fixture
+def core():
+    session = boto3.Session(aws_access_key_id='testing', aws_secret_access_key='testing', region_name='us-east-1')
+    with AwsExecutor('us-east-1', max_workers=4, session=session, cache=False) as core:
+        yield core
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_chunks():
+    assert list(chunks(list(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunks([], 10)) == []
+
+
+def test_rate_limiter_allows_a_burst_then_paces_calls(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(aws_core, 'time', clock)
+    limiter = RateLimiter(rate=10, burst=2)
+    for _ in range(4):
+        limiter.acquire()
+    # Two calls from the burst, then one every 1/rate seconds
+    assert clock.slept == pytest.approx([0.1, 0.1])
+    clock.now += 1.0
+    limiter.acquire()
+    limiter.acquire()
+    assert len(clock.slept) == 2
+
+
+def test_paginate_follows_tokens(core):
+    ecs = core.client('ecs')
+    with Stubber(ecs) as stub:
+        stub.add_response('list_clusters', {'clusterArns': ['a', 'b'], 'nextToken': 't1'}, {})
+        stub.add_response('list_clusters', {'clusterArns': ['c']}, {'nextToken': 't1'})
+        assert core.paginate('ecs', 'list_clusters', 'clusterArns') == ['a', 'b', 'c']
+        stub.assert_no_pending_responses()
+
+
+def test_paginate_many_raises_the_failing_listing_error(core):
+    ecs, ec2 = core.client('ecs'), core.client('ec2')
+    with Stubber(ecs) as ecs_stub, Stubber(ec2) as ec2_stub:
+        ecs_stub.add_response('list_clusters', {'clusterArns': ['a']}, {})
+        ec2_stub.add_client_error('describe_vpcs', service_error_code='UnauthorizedOperation', http_status_code=403)
+        with pytest.raises(ClientError) as e:
+            core.paginate_many({'clusters': ('ecs', 'list_clusters', 'clusterArns'),
+                                'vpcs': ('ec2', 'describe_vpcs', 'Vpcs', {'Filters': []})})
+        assert e.value.response['Error']['Code'] == 'UnauthorizedOperation'
+
+
+def test_gather_returns_by_name_and_raises_the_first_error_in_order(core):
+    assert core.gather({'a': lambda: 1, 'b': lambda: 2}) == {'a': 1, 'b': 2}
+
+    finished = threading.Event()
+
+    def slow_failure():
+        finished.wait(5)
+        raise ValueError('first')
+
+    def fast_failure():
+        finished.set()
+        raise KeyError('second')
+
+    with pytest.raises(ValueError, match='first'):
+        core.gather({'a': slow_failure, 'b': fast_failure})
+
+
+class FakeEcs:
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def describe_services(self, cluster, services):
+        with self.lock:
+            self.batches.append(list(services))
+        return {'services': [{'serviceArn': s, 'cluster': cluster} for s in services]}
+
+
+def test_batch_call_chunks_and_keeps_input_order(core):
+    ecs = core._clients['ecs'] = FakeEcs()
+    arns = [f"svc-{n}" for n in range(25)]
+    responses = core.batch_call('ecs', 'describe_services', 'services', arns, 10, cluster='main')
+    assert sorted(len(b) for b in ecs.batches) == [5, 10, 10]
+    assert [s['serviceArn'] for r in responses for s in r['services']] == arns
+    assert all(s['cluster'] == 'main' for r in responses for s in r['services'])
+
+
+def test_account_id_is_asked_once(core):
+    sts = core.client('sts')
+    with Stubber(sts) as stub:
+        stub.add_response('get_caller_identity', {'Account': '123456789012', 'Arn': 'arn:aws:iam::123456789012:user/test', 'UserId': 'AIDATEST'}, {})
+        assert core.account_id == '123456789012'
+        assert core.account_id == '123456789012'
+        stub.assert_no_pending_responses()
@@ -0,0 +1,128 @@
+import json
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+
+from call_trace import CallTracer
+from response_cache import ResponseCache
+
+BODY = json.dumps({'clusterArns': ['arn:aws:ecs:us-east-1:123456789012:cluster/main']}).encode()
+
+
+class Raw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+class FakeEndpoint:
+    """before-send handler answering every request: `failures` throttling errors first, then BODY."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.requests = 0
+
+    def __call__(self, request, **kwargs):
+        self.requests += 1
+        if self.requests <= self.failures:
+            body = json.dumps({'__type': 'ThrottlingException', 'message': 'slow down'}).encode()
+            return AWSResponse(request.url, 400, {'content-length': str(len(body))}, Raw(body))
+        return AWSResponse(request.url, 200, {'content-length': str(len(BODY))}, Raw(BODY))
+
+
+def session():
+    return boto3.Session(aws_access_key_id='testing', aws_secret_access_key='testing', region_name='us-east-1')
+
+
+def ecs_client(sess, endpoint):
+    client = sess.client('ecs', config=Config(retries={'mode': 'standard', 'max_attempts': 3}))
+    client.meta.events.register('before-send', endpoint)
+    return client
+
+
+def list_clusters(client):
+    return client.list_clusters()
+
+
+def test_records_operation_retries_size_and_caller():
+    sess = session()
+    tracer = CallTracer()
+    tracer.install(sess)
+    endpoint = FakeEndpoint(failures=1)
+    list_clusters(ecs_client(sess, endpoint))
+
+    assert endpoint.requests == 2
+    [call] = tracer.calls
+    assert (call['service'], call['operation'], call['status']) == ('ecs', 'ListClusters', 200)
+    assert call['retries'] == 1
+    assert call['size'] == len(BODY)
+    assert call['cached'] is False
+    assert call['stack'].endswith('test_call_trace.list_clusters')
+
+
+def test_chrome_trace_and_folded_stacks(tmp_path):
+    sess = session()
+    tracer = CallTracer()
+    tracer.install(sess)
+    client = ecs_client(sess, FakeEndpoint())
+    list_clusters(client)
+    list_clusters(client)
+
+    trace = tracer.chrome_trace()
+    spans = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+    assert [e['name'] for e in spans] == ['ecs.ListClusters', 'ecs.ListClusters']
+    assert spans[0]['args']['size'] == len(BODY) and spans[0]['args']['retries'] == 0
+    assert spans[1]['ts'] >= spans[0]['ts']
+    assert any(e['ph'] == 'M' and e['name'] == 'thread_name' for e in trace['traceEvents'])
+
+    [line] = tracer.folded_stacks()
+    stack, micros = line.rsplit(' ', 1)
+    assert stack.endswith('test_call_trace.list_clusters;ecs.ListClusters')
+    assert int(micros) >= 0
+
+    folded = tracer.write(str(tmp_path / 'trace.json'))
+    with open(tmp_path / 'trace.json') as f:
+        assert json.load(f)['traceEvents']
+    with open(folded) as f:
+        assert f.read() == line + '\n'
+    assert tracer.summary()[0].startswith('2 AWS calls')
+
+
+def test_cached_hits_are_recorded_as_cached(tmp_path):
+    sess = session()
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    cache.install(sess)
+    tracer = CallTracer()
+    tracer.install(sess)
+    endpoint = FakeEndpoint()
+    client = ecs_client(sess, endpoint)
+    first = list_clusters(client)
+    second = list_clusters(client)
+
+    assert endpoint.requests == 1
+    assert second['clusterArns'] == first['clusterArns']
+    live, hit = tracer.calls
+    assert (live['cached'], hit['cached']) == (False, True)
+    # The stand-in response has no body or content-length
+    assert (hit['status'], hit['size'], hit['retries']) == (200, 0, 0)
+    assert tracer.summary()[2].split()[-1] == '1'
+
+
+def test_calls_that_never_get_a_response_are_recorded_as_errors():
+    sess = session()
+    tracer = CallTracer()
+    tracer.install(sess)
+    client = sess.client('ecs', config=Config(retries={'mode': 'standard', 'max_attempts': 1}))
+
+    def refuse(request, **kwargs):
+        raise ConnectionResetError('reset')
+
+    client.meta.events.register('before-send', refuse)
+    with pytest.raises(Exception):
+        client.list_clusters()
+    [call] = tracer.calls
+    assert (call['status'], call['size'], call['error']) == (0, 0, 'ConnectionResetError')
@@ -0,0 +1,80 @@
+import pytest
+
+from cost_model import CostModel, rank_by_savings, total_savings
+
+PRICING = {
+    'hours_per_month': 730,
+    'region_multipliers': {'us-east-1': 1.0, 'sa-east-1': 1.5},
+    'types': {
+        'AWS::EC2::NatGateway': {'reader_type': 'ec2:natgateway', 'hourly': 0.045, 'per_gb_processed': 0.045},
+        'AWS::EC2::Instance': {'reader_type': 'ec2:instance', 'classes': {'t3.micro': 0.0104, 't3.large': 0.0832},
+                               'default_class': 't3.micro'},
+        'AWS::RDS::DBInstance': {'reader_type': 'rds:db-instance', 'classes': {'db.t3.micro': 0.017},
+                                 'default_class': 'db.t3.micro', 'multi_az_factor': 2.0,
+                                 'per_gb_month': 0.115, 'default_storage_gb': 20},
+        'AWS::CodePipeline::Pipeline': {'reader_type': 'codepipeline:pipeline', 'monthly': 1.0},
+        'AWS::EC2::VPC': {'reader_type': 'ec2:vpc'},
+    },
+}
+
+
+def cents(value):
+    # monthly_cost rounds to the cent
+    return pytest.approx(value, abs=0.005)
+
+
+def model(region='us-east-1'):
+    return CostModel(PRICING, region)
+
+
+def test_hourly_and_processed_costs_for_both_type_spellings():
+    assert model().monthly_cost('AWS::EC2::NatGateway') == cents(0.045 * 730)
+    assert model().monthly_cost('ec2:natgateway', {'processed_gb': 100}) == cents(0.045 * 730 + 4.5)
+    assert model().monthly_cost('EC2:NatGateway') == model().monthly_cost('ec2:natgateway')
+
+
+def test_known_class_default_class_and_free_types():
+    assert model().monthly_cost('ec2:instance', {'class': 't3.large'}) == cents(0.0832 * 730)
+    assert model().monthly_cost('ec2:instance') == cents(0.0104 * 730)
+    assert model().monthly_cost('codepipeline:pipeline') == 1.0
+    assert model().monthly_cost('ec2:vpc') == 0.0
+
+
+def test_unknown_sizes_scale_from_a_known_class_of_the_family():
+    # 2xlarge is 16 units, large is 4
+    assert model().monthly_cost('ec2:instance', {'class': 't3.2xlarge'}) == cents(0.0832 * 4 * 730)
+    assert model().monthly_cost('ec2:instance', {'class': 't3.nano'}) == cents(0.0832 / 16 * 730)
+    # Another family falls back to the default class
+    assert model().monthly_cost('ec2:instance', {'class': 'x9.large'}) == cents(0.0104 * 730)
+
+
+def test_multi_az_doubles_compute_but_not_storage():
+    single = model().monthly_cost('rds:db-instance')
+    multi = model().monthly_cost('rds:db-instance', {'multi_az': True})
+    storage = 20 * 0.115
+    assert single == cents(0.017 * 730 + storage)
+    assert multi == cents(0.017 * 2 * 730 + storage)
+
+
+def test_region_multiplier_applies_to_the_total():
+    assert model('sa-east-1').monthly_cost('codepipeline:pipeline') == 1.5
+    # Regions missing from the snapshot are priced like us-east-1
+    assert model('mars-north-1').monthly_cost('codepipeline:pipeline') == 1.0
+
+
+def test_unknown_types_have_no_estimate():
+    assert model().monthly_cost('AWS::Made::Up') is None
+    assert model().monthly_cost('madeup:thing') is None
+    assert model().monthly_cost('') is None
+
+
+def test_rank_and_total_savings_skip_resources_without_an_estimate():
+    resources = [{'Arn': 'a', 'MonthlyCost': None}, {'Arn': 'b', 'MonthlyCost': 32.85}, {'Arn': 'c', 'MonthlyCost': 1.0}]
+    assert [r['Arn'] for r in rank_by_savings(resources)] == ['b', 'c', 'a']
+    assert total_savings(resources) == cents(33.85)
+
+
+def test_bundled_snapshot_loads():
+    bundled = CostModel.load(region='eu-west-1')
+    assert bundled.monthly_cost('ec2:natgateway') > 0
+    assert bundled.multiplier > 1.0
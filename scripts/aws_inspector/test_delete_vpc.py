@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import WaiterError
+
+import delete_vpc
+
+
+class FakeWaiter:
+    def __init__(self, ec2):
+        self.ec2 = ec2
+
+    def wait(self, NatGatewayIds, WaiterConfig):
+        self.ec2.waited.append(sorted(NatGatewayIds))
+        if self.ec2.nat_timeout:
+            raise WaiterError('NatGatewayDeleted', 'Max attempts exceeded', {})
+
+
+class FakeEc2:
+    def __init__(self, nat_timeout=False, endpoint_errors=()):
+        self.nat_timeout = nat_timeout
+        self.endpoint_errors = endpoint_errors
+        self.calls = []
+        self.waited = []
+
+    def get_waiter(self, name):
+        return FakeWaiter(self)
+
+    def delete_vpc_endpoints(self, VpcEndpointIds):
+        self.calls.append(('delete_vpc_endpoints', tuple(VpcEndpointIds)))
+        return {'Unsuccessful': [{'ResourceId': i, 'Error': {'Code': 'InvalidState', 'Message': 'busy'}}
+                                 for i in self.endpoint_errors]}
+
+    def __getattr__(self, name):
+        if not name.startswith(('delete_', 'detach_', 'revoke_')):
+            raise AttributeError(name)
+        return lambda **kwargs: self.calls.append((name, tuple(kwargs.values())))
+
+
+class FakeCore:
+    def __init__(self, ec2):
+        self.ec2 = ec2
+        self.pool = ThreadPoolExecutor(4)
+
+    def client(self, service):
+        return self.ec2
+
+
+def vpc(**resources):
+    r = {'enis': [], 'peerings': set(), 'nats': [], 'nats_deleting': [], 'igws': [], 'endpoints': [],
+         'subnets': [], 'route_tables': [], 'acls': [], 'security_groups': []}
+    r.update(resources)
+    return r
+
+
+def called(ec2, name):
+    return [args for n, args in ec2.calls if n == name]
+
+
+def test_active_enis_abort_the_vpc():
+    ec2 = FakeEc2()
+    vpcs = {'vpc-1': vpc(enis=[{'NetworkInterfaceId': 'eni-1'}], subnets=['subnet-1'])}
+    delete_vpc._delete_collected(FakeCore(ec2), vpcs, ['vpc-1'], 'us-east-1', dry_run=False)
+    assert ec2.calls == []
+
+
+def test_nats_already_deleting_are_waited_on_not_deleted():
+    ec2 = FakeEc2()
+    vpcs = {'vpc-1': vpc(nats=['nat-new'], nats_deleting=['nat-old'], subnets=['subnet-1'])}
+    delete_vpc._delete_collected(FakeCore(ec2), vpcs, ['vpc-1'], 'us-east-1', dry_run=False)
+    assert called(ec2, 'delete_nat_gateway') == [('nat-new',)]
+    assert ec2.waited == [['nat-new', 'nat-old']]
+    assert called(ec2, 'delete_vpc') == [('vpc-1',)]
+
+
+def test_nat_waiter_timeout_stops_the_teardown_of_that_vpc():
+    ec2 = FakeEc2(nat_timeout=True)
+    vpcs = {'vpc-1': vpc(nats_deleting=['nat-old'], subnets=['subnet-1']), 'vpc-2': vpc(subnets=['subnet-2'])}
+    delete_vpc._delete_collected(FakeCore(ec2), vpcs, ['vpc-1', 'vpc-2'], 'us-east-1', dry_run=False)
+    assert called(ec2, 'delete_subnet') == [('subnet-2',)]
+    assert called(ec2, 'delete_vpc') == [('vpc-2',)]
+
+
+def test_unsuccessful_endpoint_deletions_fail_the_call():
+    ec2 = FakeEc2(endpoint_errors=['vpce-2'])
+    assert not delete_vpc.call_with_retry(ec2.delete_vpc_endpoints, 'endpoints', VpcEndpointIds=['vpce-1', 'vpce-2'])
+    assert delete_vpc.call_with_retry(FakeEc2().delete_vpc_endpoints, 'endpoints', VpcEndpointIds=['vpce-1'])
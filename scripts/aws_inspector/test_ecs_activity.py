@@ -0,0 +1,145 @@
+import json
+import time
+
+import delete_task_definitions
+from ecs_activity import DEPLOYMENT, RUNNING_TASK, SERVICE, EcsActivityIndex
+
+ARN = 'arn:aws:ecs:us-east-1:{}:task-definition/{}:{}'
+ACCOUNT = '123456789012'
+OTHER_ACCOUNT = '210987654321'
+
+
+class FakeEvents:
+    class Paginator:
+        def paginate(self, **kwargs):
+            return [{'Rules': [], 'Targets': []}]
+
+    def get_paginator(self, name):
+        return self.Paginator()
+
+
+class FakeCore:
+    """Serves one cluster running web:3 as a service (deploying web:4) and a web:2 task."""
+
+    def __init__(self, account=ACCOUNT, region='us-east-1'):
+        self.account_id = account
+        self.region = region
+        self.crawls = 0
+
+    def paginate(self, service, operation, key, **kwargs):
+        if operation == 'list_clusters':
+            self.crawls += 1
+            return ['arn:aws:ecs:us-east-1:123456789012:cluster/main']
+        if operation == 'list_services':
+            return ['svc-web']
+        if operation == 'list_tasks':
+            return ['task-1'] if kwargs['desiredStatus'] == 'RUNNING' else []
+        raise AssertionError(operation)
+
+    def call(self, service, operation, **kwargs):
+        if operation == 'describe_services':
+            return {'services': [{'serviceName': 'web', 'taskDefinition': ARN.format(self.account_id, 'web', 3),
+                                  'deployments': [{'taskDefinition': ARN.format(self.account_id, 'web', 4)}]}]}
+        if operation == 'describe_tasks':
+            return {'tasks': [{'taskDefinitionArn': ARN.format(self.account_id, 'web', 2), 'group': 'batch'}]}
+        raise AssertionError(operation)
+
+    def gather(self, calls):
+        return {name: fn() for name, fn in calls.items()}
+
+    def client(self, service):
+        return FakeEvents()
+
+
+def test_build_records_every_kind_of_use():
+    index = EcsActivityIndex.build(FakeCore())
+    assert index.account == ACCOUNT
+    assert index.active_arns == {ARN.format(ACCOUNT, 'web', n) for n in (2, 3, 4)}
+    assert index.reasons(ARN.format(ACCOUNT, 'web', 3)) == [f"{SERVICE}:main/web"]
+    assert index.reasons(ARN.format(ACCOUNT, 'web', 4)) == [f"{DEPLOYMENT}:main/web"]
+    assert index.reasons(ARN.format(ACCOUNT, 'web', 2)) == [f"{RUNNING_TASK}:main/batch"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / 'activity.json')
+    built = EcsActivityIndex.build(FakeCore())
+    built.save(path)
+    loaded = EcsActivityIndex.load('us-east-1', ACCOUNT, path)
+    assert loaded.uses == built.uses
+    assert loaded.built_at == built.built_at
+    assert (loaded.account, loaded.region) == (ACCOUNT, 'us-east-1')
+    assert EcsActivityIndex.load('eu-west-1', ACCOUNT, path) is None
+
+
+def test_load_or_build_reuses_within_ttl_and_rebuilds_after(tmp_path):
+    path = str(tmp_path / 'activity.json')
+    core = FakeCore()
+    EcsActivityIndex.load_or_build(core, ttl=900, path=path)
+    EcsActivityIndex.load_or_build(core, ttl=900, path=path)
+    assert core.crawls == 1
+
+    with open(path) as f:
+        data = json.load(f)
+    data[EcsActivityIndex.key(ACCOUNT, 'us-east-1')]['built_at'] = time.time() - 1000
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    EcsActivityIndex.load_or_build(core, ttl=900, path=path)
+    assert core.crawls == 2
+
+
+def test_load_or_build_refresh_always_crawls(tmp_path):
+    path = str(tmp_path / 'activity.json')
+    core = FakeCore()
+    EcsActivityIndex.load_or_build(core, path=path)
+    EcsActivityIndex.load_or_build(core, refresh=True, path=path)
+    assert core.crawls == 2
+
+
+def test_index_is_never_shared_across_accounts(tmp_path):
+    path = str(tmp_path / 'activity.json')
+    EcsActivityIndex.load_or_build(FakeCore(), path=path)
+    other = FakeCore(account=OTHER_ACCOUNT)
+    index = EcsActivityIndex.load_or_build(other, path=path)
+    assert other.crawls == 1
+    assert index.active_arns == {ARN.format(OTHER_ACCOUNT, 'web', n) for n in (2, 3, 4)}
+    # Both accounts are kept side by side in the one file
+    with open(path) as f:
+        assert set(json.load(f)) == {f"{ACCOUNT}/us-east-1", f"{OTHER_ACCOUNT}/us-east-1"}
+
+
+class ExecutorStub(FakeCore):
+    created = []
+
+    def __init__(self, region, refresh_cache=False):
+        super().__init__(region=region)
+        self.refresh_cache = refresh_cache
+        ExecutorStub.created.append(self)
+
+    def close(self):
+        pass
+
+
+class NothingStale:
+    def __init__(self, core, **kwargs):
+        pass
+
+    def evaluate(self, statuses):
+        return {}
+
+
+def test_forced_deletion_rebuilds_the_activity_index(monkeypatch):
+    refreshes = []
+
+    def load_or_build(core, ttl, refresh):
+        refreshes.append(refresh)
+        return EcsActivityIndex(core.region, core.account_id)
+
+    monkeypatch.setattr(delete_task_definitions, 'AwsExecutor', ExecutorStub)
+    monkeypatch.setattr(delete_task_definitions.EcsActivityIndex, 'load_or_build', staticmethod(load_or_build))
+    monkeypatch.setattr(delete_task_definitions, 'RetentionEngine', NothingStale)
+
+    delete_task_definitions.delete_task_definitions(dry_run=True)
+    delete_task_definitions.delete_task_definitions(dry_run=False)
+    # A dry run may reuse the saved index; --force always reads live
+    assert refreshes == [False, True]
+    assert [c.refresh_cache for c in ExecutorStub.created[-2:]] == [False, True]
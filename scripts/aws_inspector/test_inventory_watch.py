@@ -0,0 +1,179 @@
+import gzip
+import json
+import os
+
+import pytest
+from botocore.exceptions import ClientError
+
+from inventory_watch import (TRAIL_LOOKBACK_SECONDS, LocalFileSource, LocalQueueSource, SqsEventSource,
+                             resource_changes)
+
+ACCOUNT = '123456789012'
+
+
+def event(source, name, request=None, response=None, region='us-east-1', **extra):
+    return dict({'eventSource': f"{source}.amazonaws.com", 'eventName': name, 'awsRegion': region,
+                 'recipientAccountId': ACCOUNT, 'eventTime': '2024-05-01T10:00:00Z',
+                 'requestParameters': request, 'responseElements': response}, **extra)
+
+
+def test_run_instances_adds_named_instances():
+    record = event('ec2', 'RunInstances', response={'instancesSet': {'items': [
+        {'instanceId': 'i-1', 'tagSet': {'items': [{'key': 'Name', 'value': 'web'}]},
+         'groupSet': {'items': [{'groupId': 'sg-1'}]}}]}})
+    [change] = resource_changes(record, 'us-east-1')
+    assert (change['Action'], change['Type'], change['Identifier']) == ('add', 'instance', 'web')
+    assert change['ARN'] == 'arn:aws:ec2:us-east-1::instance/i-1'
+    assert change['Payload']['SecurityGroups'] == [{'GroupId': 'sg-1'}]
+
+
+def test_create_subnet_and_delete_vpc():
+    created = event('ec2', 'CreateSubnet', response={'subnet': {
+        'subnetId': 'subnet-1', 'vpcId': 'vpc-1', 'subnetArn': f"arn:aws:ec2:us-east-1:{ACCOUNT}:subnet/subnet-1"}})
+    [change] = resource_changes(created, 'us-east-1')
+    assert (change['Action'], change['Identifier'], change['Payload']['VpcId']) == ('add', 'subnet-1', 'vpc-1')
+    [change] = resource_changes(event('ec2', 'DeleteVpc', request={'vpcId': 'vpc-1'}), 'us-east-1')
+    assert (change['Action'], change['ARN']) == ('remove', f"arn:aws:ec2:us-east-1:{ACCOUNT}:vpc/vpc-1")
+
+
+def test_versioned_lambda_and_log_group_arns():
+    [fn] = resource_changes(event('lambda', 'CreateFunction20150331', request={'functionName': 'f'},
+                                  response={'functionArn': f"arn:aws:lambda:us-east-1:{ACCOUNT}:function:f"}), 'us-east-1')
+    assert (fn['Action'], fn['Type'], fn['Identifier']) == ('add', 'function', fn['ARN'])
+    [lg] = resource_changes(event('logs', 'DeleteLogGroup', request={'logGroupName': '/aws/ecs/app'}), 'us-east-1')
+    assert lg['ARN'] == f"arn:aws:logs:us-east-1:{ACCOUNT}:log-group:/aws/ecs/app:*"
+
+
+def test_failed_read_only_and_other_region_events_are_ignored():
+    delete = event('ec2', 'DeleteVpc', request={'vpcId': 'vpc-1'})
+    assert resource_changes(dict(delete, errorCode='DependencyViolation'), 'us-east-1') == []
+    assert resource_changes(dict(delete, readOnly=True), 'us-east-1') == []
+    assert resource_changes(delete, 'eu-west-1') == []
+    # Buckets are listed from every region
+    [bucket] = resource_changes(event('s3', 'DeleteBucket', request={'bucketName': 'b'}), 'eu-west-1')
+    assert bucket['ARN'] == 'arn:aws:s3:::b'
+
+
+class FakeSqs:
+    def __init__(self, messages):
+        self.messages = messages
+
+    def receive_message(self, **kwargs):
+        return {'Messages': self.messages}
+
+
+class FakeS3:
+    """get_object fails with `code` for every key."""
+
+    def __init__(self, code='NoSuchKey'):
+        self.code = code
+
+    def get_object(self, Bucket, Key):
+        raise ClientError({'Error': {'Code': self.code, 'Message': self.code}}, 'GetObject')
+
+
+class FakeSession:
+    def __init__(self, messages, code='NoSuchKey'):
+        self.clients = {'sqs': FakeSqs(messages), 's3': FakeS3(code)}
+
+    def client(self, service):
+        return self.clients[service]
+
+
+DETAIL = event('ec2', 'DeleteVpc', request={'vpcId': 'vpc-1'})
+MESSAGES = [
+    {'MessageId': '1', 'ReceiptHandle': 'r1', 'Body': json.dumps({'detail-type': 'AWS API Call via CloudTrail',
+                                                                 'detail': DETAIL})},
+    {'MessageId': '2', 'ReceiptHandle': 'r2', 'Body': json.dumps({'s3Bucket': 'trail', 's3ObjectKey': ['a.json.gz']})},
+    {'MessageId': '3', 'ReceiptHandle': 'r3', 'Body': 'not json'},
+]
+
+
+def test_sqs_poll_keeps_messages_whose_trail_file_is_missing():
+    source = SqsEventSource(FakeSession(MESSAGES), 'https://sqs/queue')
+    assert source.poll(0) == [DETAIL]
+    # The message whose file could not be read stays queued for a retry
+    assert source._receipts == ['r1', 'r3']
+
+
+@pytest.mark.parametrize('code', ['ExpiredToken', 'AccessDenied'])
+def test_sqs_poll_raises_credential_and_access_errors(code):
+    source = SqsEventSource(FakeSession(MESSAGES, code), 'https://sqs/queue')
+    with pytest.raises(ClientError):
+        source.poll(0)
+    # Nothing from the failed batch is acknowledged, not even the message read before the error
+    assert source._receipts == []
+
+
+def test_local_queue_keeps_messages_whose_trail_file_is_missing(tmp_path):
+    queue = str(tmp_path / 'queue')
+    kept = LocalQueueSource.send(queue, {'s3Bucket': 'trail', 's3ObjectKey': ['a.json.gz']})
+    source = LocalQueueSource(queue, FakeS3())
+    assert source.poll(0) == []
+    source.commit()
+    assert os.path.exists(kept)
+
+
+def test_local_queue_raises_on_expired_credentials(tmp_path):
+    queue = str(tmp_path / 'queue')
+    LocalQueueSource.send(queue, {'detail-type': 'AWS API Call via CloudTrail', 'detail': DETAIL})
+    LocalQueueSource.send(queue, {'s3Bucket': 'trail', 's3ObjectKey': ['a.json.gz']})
+    source = LocalQueueSource(queue, FakeS3('ExpiredToken'))
+    with pytest.raises(ClientError):
+        source.poll(0)
+    source.commit()
+    assert len(os.listdir(queue)) == 2
+
+
+def write_trail(directory, name, vpc_id):
+    path = directory / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(gzip.compress(json.dumps({'Records': [
+        event('ec2', 'DeleteVpc', request={'vpcId': vpc_id})]}).encode()))
+
+
+def polled_vpcs(source):
+    records = source.poll(0)
+    source.commit()
+    return [r['requestParameters']['vpcId'] for r in records]
+
+
+def test_trail_files_delivered_late_are_still_read(tmp_path):
+    write_trail(tmp_path, '2024/05/01/trail_20240501T1010Z_b.json.gz', 'vpc-b')
+    source = LocalFileSource(str(tmp_path))
+    assert polled_vpcs(source) == ['vpc-b']
+
+    # Delivered after vpc-b's file, but named before it
+    write_trail(tmp_path, '2024/05/01/trail_20240501T1005Z_a.json.gz', 'vpc-a')
+    assert polled_vpcs(source) == ['vpc-a']
+    assert polled_vpcs(source) == []
+
+
+def test_trail_files_read_longer_ago_than_the_lookback_are_not_listed_again(tmp_path):
+    write_trail(tmp_path, 'trail_1000_a.json.gz', 'vpc-a')
+    write_trail(tmp_path, 'trail_1010_b.json.gz', 'vpc-b')
+    source = LocalFileSource(str(tmp_path))
+    assert polled_vpcs(source) == ['vpc-a', 'vpc-b']
+
+    source.seen['trail_1000_a.json.gz'] -= TRAIL_LOOKBACK_SECONDS + 1
+    write_trail(tmp_path, 'trail_1020_c.json.gz', 'vpc-c')
+    assert polled_vpcs(source) == ['vpc-c']
+    assert source.after == 'trail_1000_a.json.gz'
+    assert set(source.seen) == {'trail_1010_b.json.gz', 'trail_1020_c.json.gz'}
+
+
+def test_trail_position_round_trips_and_accepts_a_saved_file_name(tmp_path):
+    write_trail(tmp_path, 'trail_1000_a.json.gz', 'vpc-a')
+    write_trail(tmp_path, 'trail_1010_b.json.gz', 'vpc-b')
+    source = LocalFileSource(str(tmp_path))
+    source.poll(0)
+    # Saved before the poll is committed, as InventoryWatcher.save does
+    position = json.loads(json.dumps(source.position()))
+
+    resumed = LocalFileSource(str(tmp_path))
+    resumed.cursor = position
+    assert polled_vpcs(resumed) == []
+
+    legacy = LocalFileSource(str(tmp_path))
+    legacy.cursor = 'trail_1000_a.json.gz'
+    assert polled_vpcs(legacy) == ['vpc-b']
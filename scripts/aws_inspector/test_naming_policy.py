@@ -0,0 +1,89 @@
+import pytest
+
+import naming_policy
+from naming_policy import _resolve, load_naming_policy, parse_tf
+
+NAMING_TF = '''
+# Naming convention
+locals {
+  project_name  = "shop"
+  environment   = "dev" // inline comment
+  naming_prefix = "${local.project_name}-${local.environment}"
+  owner         = local.project_name
+
+  common_tags = {
+    Project   = local.project_name
+    Url       = "https://example.com/#anchor"
+  }
+
+  naming = {
+    vpc           = "${local.naming_prefix}-vpc"
+    public_subnet = "${local.naming_prefix}-vpc-subnet-pub"
+  }
+}
+'''
+
+PROVIDER_TF = '''
+provider "aws" {
+  region = "us-east-1"
+  default_tags {
+    tags = {
+      Environment = local.environment
+      Project     = "overridden-by-common-tags"
+      ManagedBy   = "Terraform"
+    }
+  }
+}
+'''
+
+
+def test_parse_tf_reads_blocks_strings_and_references():
+    parsed = parse_tf(NAMING_TF)
+    local_values = parsed['locals']
+    assert local_values['environment'] == 'dev'
+    assert local_values['owner'] == ('local', 'project_name')
+    assert local_values['common_tags']['Url'] == 'https://example.com/#anchor'
+    assert local_values['naming']['vpc'] == '${local.naming_prefix}-vpc'
+
+
+def test_parse_tf_nests_labelled_blocks():
+    parsed = parse_tf(PROVIDER_TF)
+    assert parsed['provider']['region'] == 'us-east-1'
+    assert parsed['provider']['default_tags']['tags']['Environment'] == ('local', 'environment')
+
+
+def test_resolve_follows_references_and_interpolation():
+    local_values = parse_tf(NAMING_TF)['locals']
+    assert _resolve(('local', 'owner'), local_values) == 'shop'
+    assert _resolve(local_values['naming'], local_values) == {
+        'vpc': 'shop-dev-vpc', 'public_subnet': 'shop-dev-vpc-subnet-pub'}
+
+
+def test_resolve_rejects_circular_locals():
+    local_values = {'a': '${local.b}', 'b': '${local.a}'}
+    with pytest.raises(ValueError):
+        _resolve('${local.a}', local_values)
+
+
+def test_load_naming_policy_merges_default_and_common_tags(tmp_path):
+    (tmp_path / 'naming.tf').write_text(NAMING_TF)
+    (tmp_path / 'provider.tf').write_text(PROVIDER_TF)
+    policy = load_naming_policy(str(tmp_path))
+    assert policy['prefix'] == 'shop-dev'
+    assert policy['naming']['vpc'] == 'shop-dev-vpc'
+    # default_tags first, locals.common_tags win on conflicts
+    assert policy['tags'] == {'Environment': 'dev', 'Project': 'shop', 'ManagedBy': 'Terraform',
+                              'Url': 'https://example.com/#anchor'}
+
+
+def test_load_naming_policy_without_provider_file(tmp_path):
+    (tmp_path / 'naming.tf').write_text(NAMING_TF)
+    policy = load_naming_policy(str(tmp_path))
+    assert policy['tags'] == {'Project': 'shop', 'Url': 'https://example.com/#anchor'}
+
+
+def test_load_naming_policy_reads_the_dev_environment():
+    policy = load_naming_policy(naming_policy.DEFAULT_ENV_DIR)
+    assert policy['prefix']
+    assert policy['naming']['vpc'] == f"{policy['prefix']}-vpc"
+    assert '${' not in ''.join(policy['naming'].values())
@@ -0,0 +1,40 @@
+import csv
+import io
+import json
+
+from report_writer import StreamingReport
+
+
+def resource(n, action):
+    return {'Type': 'AWS::S3::Bucket', 'Arn': f"arn:aws:s3:::bucket-{n}", 'Tags': {'Name': f"b{n}"},
+            'Relevance': action, 'Justification': 'test'}
+
+
+def run_report(summary_only):
+    report = StreamingReport(summary_only=summary_only)
+    sinks = {fmt: io.StringIO() for fmt in ('csv', 'jsonl', 'github')}
+    for fmt, stream in sinks.items():
+        report.add_sink(stream, fmt)
+    report.begin()
+    for n, action in enumerate(['KEEP', 'DELETE', 'DELETE']):
+        report.write(resource(n, action))
+    report.end()
+    return {fmt: s.getvalue() for fmt, s in sinks.items()}
+
+
+def test_summary_only_csv_is_valid_csv():
+    rows = list(csv.reader(io.StringIO(run_report(summary_only=True)['csv'])))
+    assert rows == [['Action', 'Count'], ['DELETE', '2'], ['KEEP', '1'], ['Total', '3']]
+
+
+def test_summary_only_jsonl():
+    assert json.loads(run_report(summary_only=True)['jsonl']) == {'Total': 3, 'ByAction': {'KEEP': 1, 'DELETE': 2}}
+
+
+def test_full_report_rows():
+    out = run_report(summary_only=False)
+    rows = list(csv.reader(io.StringIO(out['csv'])))
+    assert rows[0] == ['Type', 'Resource ID', 'Tags', 'Action', 'Justification']
+    assert [r[3] for r in rows[1:]] == ['KEEP', 'DELETE', 'DELETE']
+    assert len(out['jsonl'].splitlines()) == 3
+    assert '**Resources marked for deletion**: 2' in out['github']
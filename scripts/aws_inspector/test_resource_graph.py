@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_library_modules_leave_logging_to_the_cli():
+    # A handler installed at import would win over the importing script's own basicConfig
+    code = ("import logging, resource_graph, cost_model, tf_state, inspector.core; "
+            "assert not logging.getLogger().handlers, logging.getLogger().handlers")
+    subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True)
+
+
+def chain():
+    from resource_graph import IN, USES, ResourceGraph
+
+    graph = ResourceGraph()
+    for key, rtype in [('vpc-1', 'ec2:vpc'), ('subnet-1', 'ec2:subnet'), ('i-1', 'ec2:instance')]:
+        graph.add_node(key, rtype)
+    graph.link('subnet-1', 'vpc-1', IN)
+    graph.link('i-1', 'subnet-1', USES)
+    return graph
+
+
+def test_edges_added_after_a_query_are_merged():
+    from resource_graph import USES
+
+    graph = chain()
+    assert graph.dependents('vpc-1') == {'subnet-1': 1, 'i-1': 2}
+    graph.add_node('sg-1', 'ec2:security-group')
+    graph.link('i-1', 'sg-1', USES)
+    graph.link('i-1', 'sg-1', USES)
+    assert graph.dependents('sg-1') == {'i-1': 1}
+    assert graph.edge_count == 3
+    assert graph.blast_radius('vpc-1') == {'ec2:subnet': ['subnet-1'], 'ec2:instance': ['i-1']}
+
+
+def test_detach_drops_edges_of_deleted_resources():
+    graph = chain()
+    graph.detach(['arn:aws:ec2:us-east-1:123456789012:subnet/subnet-1'])
+    assert graph.dependents('vpc-1') == {}
+    assert graph.dependencies('i-1') == {}
+    assert len(graph) == 3
+
+
+def test_aliases_survive_save_and_load(tmp_path):
+    from resource_graph import USES, ResourceGraph, link_payload
+
+    lb = 'arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/web/abc'
+    graph = ResourceGraph()
+    link_payload(graph, 'elasticloadbalancing:loadbalancer', {'LoadBalancerArn': lb, 'VpcId': 'vpc-1'})
+    path = str(tmp_path / 'graph.json')
+    graph.save(path)
+
+    loaded = ResourceGraph.load(path)
+    # e.g. an ENI described as "ELB app/web/abc", linked by inventory_watch.py after the load
+    loaded.link('eni-1', 'app/web/abc', USES)
+    assert loaded.dependents(lb) == {'eni-1': 1}
+    assert loaded.dependencies(lb) == {'vpc-1': 1}
@@ -0,0 +1,41 @@
+from resource_records import EMPTY_TAGS, ReaderRecord, RecordList, retain_tag_sets, shared_tags, tag_set_count
+
+
+def records():
+    return RecordList(ReaderRecord, key='ARN', items=[
+        {'Identifier': name, 'ARN': f"arn:aws:s3:::{name}", 'Service': 's3', 'Type': 'bucket', 'Tags': {}}
+        for name in ('a', 'b', 'c')])
+
+
+def test_discard_removes_records_and_their_keys():
+    resources = records()
+    assert resources.discard(['arn:aws:s3:::b', 'arn:aws:s3:::missing']) == 1
+    assert [r['Identifier'] for r in resources] == ['a', 'c']
+    assert not resources.has('arn:aws:s3:::b') and resources.has('arn:aws:s3:::c')
+    assert all(type(r) is ReaderRecord for r in resources)
+
+
+def test_discard_nothing_known_leaves_the_list_alone():
+    resources = records()
+    assert resources.discard(['arn:aws:s3:::missing']) == 0
+    assert len(resources) == 3
+    resources.append({'Identifier': 'b', 'ARN': 'arn:aws:s3:::b', 'Service': 's3', 'Type': 'bucket', 'Tags': {}})
+    assert resources.discard(['arn:aws:s3:::b']) == 2
+
+
+
+def test_retain_tag_sets_forgets_sets_no_record_uses():
+    resources = records()
+    resources.append({'Identifier': 'd', 'ARN': 'arn:aws:s3:::d', 'Service': 's3', 'Type': 'bucket',
+                      'Tags': {'Project': 'retain-test', 'Env': 'dev'}})
+    shared_tags({'Project': 'retain-test', 'Env': 'old'})
+    retain_tag_sets(resources)
+    count = tag_set_count()
+    kept = shared_tags({'Env': 'dev', 'Project': 'retain-test'})
+    assert kept is resources[3]['Tags']
+
+    # A retag replaces the record's tags; the old set is dropped on the next pass
+    resources[3]['Tags'] = {'Project': 'retain-test', 'Env': 'prod'}
+    assert retain_tag_sets(resources) == 1
+    assert tag_set_count() == count
+    assert shared_tags({}) is EMPTY_TAGS
@@ -0,0 +1,56 @@
+import os
+from datetime import datetime, timezone
+
+import boto3
+
+from response_cache import ResponseCache
+
+
+class Network:
+    """Answers describe_vpcs in place of AWS, after the cache hooks have run."""
+
+    status_code = 200
+
+    def __init__(self):
+        self.calls = 0
+
+    def install(self, session):
+        session.events.register_last('before-call', self.handle, unique_id='test-network')
+
+    def handle(self, model, **kwargs):
+        self.calls += 1
+        return self, {'Vpcs': [{'VpcId': 'vpc-1', 'CreatedAt': datetime(2024, 1, 1, tzinfo=timezone.utc)}]}
+
+
+def session(cache, network, access_key, read=True):
+    s = boto3.Session(aws_access_key_id=access_key, aws_secret_access_key='secret', region_name='us-east-1')
+    cache.install(s, read)
+    network.install(s)
+    return s.client('ec2')
+
+
+def test_entries_are_scoped_to_the_credentials(tmp_path):
+    cache, network = ResponseCache(str(tmp_path / 'cache.sqlite')), Network()
+    first = session(cache, network, 'AKIAFIRST').describe_vpcs()
+    assert session(cache, network, 'AKIAFIRST').describe_vpcs() == first
+    assert network.calls == 1
+    session(cache, network, 'AKIASECOND').describe_vpcs()
+    assert network.calls == 2
+    # Timestamps survive the JSON round trip
+    assert first['Vpcs'][0]['CreatedAt'] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_refresh_reads_live_and_file_is_private(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache, network = ResponseCache(path), Network()
+    session(cache, network, 'AKIAFIRST').describe_vpcs()
+    session(cache, network, 'AKIAFIRST', read=False).describe_vpcs()
+    assert network.calls == 2
+    assert os.stat(path).st_mode & 0o077 == 0
+
+
+def test_unreadable_bodies_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.sqlite'))
+    cache._db.execute('INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                      ('k', 's', 'ec2', 'DescribeVpcs', 1e12, 1e12, 3, b'\x80\x04N.'))
+    assert cache.get('k', 'ec2') is None
@@ -0,0 +1,129 @@
+import json
+
+from resource_graph import IN, ResourceGraph
+from scan_checkpoint import ScanCheckpoint, list_pages
+
+
+def journal(tmp_path, resources=None, graph=None, **kwargs):
+    return ScanCheckpoint('reader-123456789012-us-east-1', [] if resources is None else resources, graph,
+                          path=str(tmp_path / 'scan.jsonl'), **kwargs)
+
+
+class Listing:
+    """A paginated call over `pages`; raises after `fail_after` calls, like an expired token mid-scan."""
+
+    def __init__(self, pages, fail_after=None):
+        self.pages = pages
+        self.fail_after = fail_after
+        self.tokens = []
+
+    def __call__(self, Token=None):
+        if self.fail_after is not None and len(self.tokens) == self.fail_after:
+            raise RuntimeError('interrupted')
+        self.tokens.append(Token)
+        index = int(Token or 0)
+        page = {'Items': self.pages[index]}
+        if index + 1 < len(self.pages):
+            page['Next'] = str(index + 1)
+        return page
+
+
+def test_resume_replays_resources_steps_and_tokens(tmp_path):
+    resources = []
+    checkpoint = journal(tmp_path, resources)
+    checkpoint.open()
+    resources.append({'ARN': 'a'})
+    checkpoint.step_done('scan_s3')
+    resources.append({'ARN': 'b'})
+    checkpoint.page_done('scan_ecs', 'token-2')
+
+    resumed_resources = []
+    resumed = journal(tmp_path, resumed_resources)
+    assert resumed.open(resume=True)
+    assert resumed_resources == [{'ARN': 'a'}, {'ARN': 'b'}]
+    assert resumed.is_done('scan_s3')
+    assert resumed.token('scan_ecs') == 'token-2'
+
+
+def test_resume_ignores_a_torn_last_line_and_appends_after_the_intact_ones(tmp_path):
+    checkpoint = journal(tmp_path)
+    checkpoint.open()
+    checkpoint.page_done('scan_ecs', 'token-1')
+    with open(checkpoint.path, 'a') as f:
+        f.write('{"step":"scan_ecs","token":"tok')
+
+    resumed = journal(tmp_path)
+    assert resumed.open(resume=True)
+    assert resumed.token('scan_ecs') == 'token-1'
+    resumed.step_done('scan_ecs')
+    with open(checkpoint.path) as f:
+        entries = [json.loads(line) for line in f]
+    assert entries[-1] == {'step': 'scan_ecs', 'done': True, 'resources': []}
+
+
+def test_resume_of_another_scan_starts_over(tmp_path):
+    other = ScanCheckpoint('reader-210987654321-us-east-1', [], path=str(tmp_path / 'scan.jsonl'))
+    other.open()
+    other.step_done('scan_s3')
+    checkpoint = journal(tmp_path)
+    assert not checkpoint.open(resume=True)
+    assert not checkpoint.is_done('scan_s3')
+
+
+def test_graph_snapshot_is_restored_into_the_callers_graph(tmp_path):
+    graph = ResourceGraph()
+    graph.add_node('arn:aws:ec2:us-east-1:1:vpc/vpc-1', 'ec2:vpc')
+    graph.link('arn:aws:ec2:us-east-1:1:subnet/subnet-1', 'arn:aws:ec2:us-east-1:1:vpc/vpc-1', IN)
+    checkpoint = journal(tmp_path, graph=graph)
+    checkpoint.open()
+    checkpoint.step_done('scan_ec2')
+
+    restored = ResourceGraph()
+    resumed = journal(tmp_path, graph=restored)
+    assert resumed.open(resume=True)
+    assert len(restored) == len(graph)
+    assert restored.depends_on('arn:aws:ec2:us-east-1:1:subnet/subnet-1', 'arn:aws:ec2:us-east-1:1:vpc/vpc-1')
+
+
+def test_graph_pages_are_snapshotted_every_n_pages_only(tmp_path):
+    class CountingGraph(ResourceGraph):
+        saves = 0
+
+        def save(self, path):
+            CountingGraph.saves += 1
+            super().save(path)
+
+    checkpoint = journal(tmp_path, graph=CountingGraph(), snapshot_pages=3, snapshot_seconds=3600)
+    checkpoint.open()
+    listing = Listing([[n] for n in range(10)])
+    for _ in list_pages(listing, 'Token', 'Next', checkpoint, 'scan_ec2', snapshot_graph=True):
+        pass
+    # 9 page tokens, snapshotted with every third
+    assert CountingGraph.saves == 3
+    with open(checkpoint.path) as f:
+        tokens = [json.loads(line).get('token') for line in f][1:]
+    assert tokens == ['3', '6', '9']
+
+
+def test_resume_never_starts_past_the_graph_snapshot(tmp_path):
+    resources = []
+    checkpoint = journal(tmp_path, resources, graph=ResourceGraph(), snapshot_pages=2, snapshot_seconds=3600)
+    checkpoint.open()
+    listing = Listing([['a'], ['b'], ['c'], ['d']], fail_after=3)
+    try:
+        for page in list_pages(listing, 'Token', 'Next', checkpoint, 'scan_ec2', snapshot_graph=True):
+            resources.extend({'ARN': arn} for arn in page['Items'])
+    except RuntimeError:
+        pass
+
+    resumed_resources = []
+    resumed = journal(tmp_path, resumed_resources, graph=ResourceGraph())
+    assert resumed.open(resume=True)
+    # Page 'c' was listed after the last snapshot, so it is listed again rather than half-restored
+    assert resumed.token('scan_ec2') == '2'
+    assert resumed_resources == [{'ARN': 'a'}, {'ARN': 'b'}]
+    rest = Listing([['a'], ['b'], ['c'], ['d']])
+    for page in list_pages(rest, 'Token', 'Next', resumed, 'scan_ec2', snapshot_graph=True):
+        resumed_resources.extend({'ARN': arn} for arn in page['Items'])
+    assert [r['ARN'] for r in resumed_resources] == ['a', 'b', 'c', 'd']
+    assert rest.tokens == ['2', '3']
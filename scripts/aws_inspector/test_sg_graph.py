@@ -0,0 +1,81 @@
+from sg_graph import SecurityGroupGraph
+
+
+def group(gid, ingress=(), egress=()):
+    def perms(targets):
+        return [{'IpProtocol': 'tcp', 'FromPort': 443, 'ToPort': 443,
+                 'UserIdGroupPairs': [{'GroupId': t} for t in targets]}] if targets else []
+    return {'GroupId': gid, 'GroupName': gid, 'IpPermissions': perms(ingress), 'IpPermissionsEgress': perms(egress)}
+
+
+def graph():
+    # app -> db -> cache -> app is a cycle; default and lb reference into it; db also names itself
+    return SecurityGroupGraph([
+        group('sg-default', ingress=['sg-app']),
+        group('sg-lb', egress=['sg-app']),
+        group('sg-app', ingress=['sg-lb'], egress=['sg-db']),
+        group('sg-db', ingress=['sg-db'], egress=['sg-cache']),
+        group('sg-cache', egress=['sg-app']),
+    ], enis=[{'NetworkInterfaceId': 'eni-1', 'Groups': [{'GroupId': 'sg-default'}]}])
+
+
+def test_cycles_finds_multi_group_components_only():
+    g = graph()
+    # sg-app <-> sg-lb joins the app/db/cache loop into one component; sg-db's self-reference is not a cycle
+    assert g.cycles() == [['sg-app', 'sg-cache', 'sg-db', 'sg-lb']]
+
+
+def test_cycles_ignore_references_to_groups_outside_the_listing():
+    g = SecurityGroupGraph([group('sg-a', ingress=['sg-other-vpc'])])
+    assert g.cycles() == []
+
+
+def test_blocking_revocations_cover_cycles_and_kept_groups():
+    g = graph()
+    deletable = {'sg-app', 'sg-db', 'sg-cache', 'sg-lb'}
+    revocations = {(r['GroupId'], r['Direction']): r['IpPermissions'] for r in g.blocking_revocations(deletable)}
+
+    # The kept default group must drop its reference to sg-app
+    assert revocations[('sg-default', 'ingress')][0]['UserIdGroupPairs'] == [{'GroupId': 'sg-app'}]
+    # Every edge inside a deletable cycle is revoked; self-references are not
+    assert ('sg-app', 'egress') in revocations
+    assert ('sg-cache', 'egress') in revocations
+    assert [p['GroupId'] for p in revocations[('sg-db', 'egress')][0]['UserIdGroupPairs']] == ['sg-cache']
+    assert ('sg-db', 'ingress') not in revocations
+    assert revocations[('sg-app', 'egress')][0] == {
+        'IpProtocol': 'tcp', 'FromPort': 443, 'ToPort': 443, 'UserIdGroupPairs': [{'GroupId': 'sg-db'}]}
+
+
+def test_blocking_revocations_leave_acyclic_references_to_wave_ordering():
+    g = SecurityGroupGraph([group('sg-a', ingress=['sg-b']), group('sg-b')])
+    assert g.blocking_revocations({'sg-a', 'sg-b'}) == []
+
+
+def test_deletion_waves_delete_referencing_groups_first():
+    g = SecurityGroupGraph([
+        group('sg-web', ingress=['sg-api']),
+        group('sg-api', ingress=['sg-db']),
+        group('sg-db'),
+    ])
+    assert g.deletion_waves({'sg-web', 'sg-api', 'sg-db'}) == [['sg-web'], ['sg-api'], ['sg-db']]
+
+
+def test_deletion_waves_treat_cycles_as_broken():
+    g = graph()
+    waves = g.deletion_waves({'sg-app', 'sg-db', 'sg-cache', 'sg-lb'})
+    assert sorted(gid for wave in waves for gid in wave) == ['sg-app', 'sg-cache', 'sg-db', 'sg-lb']
+    assert waves == [['sg-app', 'sg-cache', 'sg-db', 'sg-lb']]
+
+
+def test_deletion_waves_skip_groups_that_are_kept():
+    g = SecurityGroupGraph([group('sg-keep', ingress=['sg-a']), group('sg-a', ingress=['sg-b']), group('sg-b')])
+    assert g.deletion_waves({'sg-a', 'sg-b'}) == [['sg-a'], ['sg-b']]
+
+
+def test_to_dict_reports_unused_groups():
+    g = SecurityGroupGraph([group('sg-used'), group('sg-referenced'), group('sg-self', ingress=['sg-self']),
+                            group('sg-caller', ingress=['sg-referenced'])],
+                           enis=[{'NetworkInterfaceId': 'eni-1', 'Groups': [{'GroupId': 'sg-used'}]}])
+    audit = g.to_dict()
+    assert audit['groups']['sg-used']['enis'] == ['eni-1']
+    assert audit['unused'] == ['sg-caller', 'sg-self']
@@ -0,0 +1,87 @@
+import argparse
+
+import pytest
+
+import apply_naming_tags
+from apply_naming_tags import tag_override
+from tagging_engine import resource_name, vpc_changes
+
+POLICY = {'naming': {'vpc': 'app-vpc', 'public_subnet': 'app-vpc-subnet-pub', 'private_subnet': 'app-vpc-subnet-priv',
+                     'igw': 'app-vpc-igw', 'nat_gateway': 'app-vpc-nat', 'route_table': 'app-vpc-rtb'},
+          'tags': {'Project': 'app'}, 'prefix': 'app'}
+
+
+class FakeCore:
+    def __init__(self, data):
+        self.data = data
+
+    def paginate_many(self, calls):
+        return {name: self.data.get(name, []) for name in calls}
+
+
+def name_tag(name):
+    return [{'Key': 'Name', 'Value': name}] if name else []
+
+
+def test_vpc_changes_qualify_per_az_names_and_keep_the_main_route_table_name():
+    data = {
+        'vpcs': [{'VpcId': 'vpc-1'}],
+        'subnets': [{'SubnetId': 'subnet-a', 'AvailabilityZone': 'us-east-1a', 'Tags': name_tag('app-vpc-subnet-pub-a')},
+                    {'SubnetId': 'subnet-b', 'AvailabilityZone': 'us-east-1b'},
+                    {'SubnetId': 'subnet-c', 'AvailabilityZone': 'us-east-1c', 'Tags': name_tag('legacy')}],
+        'route_tables': [
+            {'RouteTableId': 'rtb-main', 'Tags': name_tag('main'), 'Associations': [{'Main': True}], 'Routes': []},
+            {'RouteTableId': 'rtb-pub', 'Associations': [{'SubnetId': 'subnet-a'}, {'SubnetId': 'subnet-b'}],
+             'Routes': [{'DestinationCidrBlock': '0.0.0.0/0', 'GatewayId': 'igw-1'}]},
+            {'RouteTableId': 'rtb-c', 'Associations': [{'SubnetId': 'subnet-c'}], 'Routes': []},
+        ],
+        'igws': [{'InternetGatewayId': 'igw-1'}],
+        'nats': [{'NatGatewayId': 'nat-1', 'SubnetId': 'subnet-a', 'State': 'available'}],
+    }
+    names = {c['id']: c['set'].get('Name') for c in vpc_changes(FakeCore(data), 'vpc-1', POLICY)}
+    assert names == {
+        'vpc-1': 'app-vpc',
+        'rtb-main': None,
+        'rtb-pub': 'app-vpc-rtb',
+        'rtb-c': 'app-vpc-rtb-us-east-1c',
+        'subnet-a': None,                          # already qualified
+        'subnet-b': 'app-vpc-subnet-pub-us-east-1b',
+        'subnet-c': 'app-vpc-subnet-priv-us-east-1c',
+        'igw-1': 'app-vpc-igw',
+        'nat-1': 'app-vpc-nat-us-east-1a',
+    }
+
+
+def test_resource_name_strips_log_group_wildcard():
+    assert resource_name('arn:aws:logs:us-east-1:123456789012:log-group:/aws/ecs/app:*') == 'app'
+    assert resource_name('arn:aws:s3:::app-artifacts') == 'app-artifacts'
+
+
+def test_tag_override_requires_key_and_value_separator():
+    assert tag_override('Project=A=B') == ('Project', 'A=B')
+    with pytest.raises(argparse.ArgumentTypeError):
+        tag_override('Project')
+
+
+def test_forced_tagging_reads_current_tags_live(monkeypatch):
+    created = []
+
+    class Executor:
+        def __init__(self, region, refresh_cache=False):
+            created.append(refresh_cache)
+
+        def close(self):
+            pass
+
+    class NoChanges:
+        def __init__(self, core):
+            pass
+
+        def apply(self, changes, dry_run):
+            return {'changed': 0, 'calls': 0, 'failed': 0}
+
+    monkeypatch.setattr(apply_naming_tags, 'AwsExecutor', Executor)
+    monkeypatch.setattr(apply_naming_tags, 'BulkTagger', NoChanges)
+    apply_naming_tags.apply_naming_tags(None, dry_run=True)
+    apply_naming_tags.apply_naming_tags(None, dry_run=False)
+    assert created == [False, True]
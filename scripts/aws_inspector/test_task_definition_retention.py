@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from task_definition_retention import ACTIVE, KEEP, STALE, RetentionEngine, plan_candidates, stale_revisions
+
+ARN = 'arn:aws:ecs:us-east-1:123456789012:task-definition/{}:{}'
+
+
+class FakeCore:
+    region = 'us-east-1'
+
+    def __init__(self, listings):
+        self.listings = listings
+
+    def paginate_many(self, calls):
+        return {status: self.listings.get(status, []) for status in calls}
+
+    def map(self, fn, items):
+        return [fn(i) for i in items]
+
+
+def decisions_by_arn(decisions):
+    return {r['arn']: r['decision'] for revisions in decisions.values() for r in revisions}
+
+
+def test_stale_revisions_keep_active_referenced_and_newest():
+    listings = {'ACTIVE': [ARN.format('web', n) for n in range(1, 6)] + [ARN.format('web-worker', 1)],
+                'INACTIVE': [ARN.format('web', 0)]}
+    engine = RetentionEngine(FakeCore(listings), keep_last=2, active_arns=[ARN.format('web', 2)],
+                             family_refs=['web-worker'])
+    decisions = engine.evaluate(('ACTIVE', 'INACTIVE'))
+    assert decisions_by_arn(decisions) == {
+        ARN.format('web', 5): KEEP, ARN.format('web', 4): KEEP, ARN.format('web', 3): STALE,
+        ARN.format('web', 2): ACTIVE, ARN.format('web', 1): STALE, ARN.format('web', 0): STALE,
+        ARN.format('web-worker', 1): ACTIVE,
+    }
+    # 'web' is not a prefix match for 'web-worker'
+    assert [r['arn'] for r in stale_revisions(decisions)] == [ARN.format('web', n) for n in (3, 1, 0)]
+
+
+def plan(age=0.0, region='us-east-1', account='123456789012'):
+    return {'account': account, 'region': region, 'created_at': time.time() - age, 'policy': {},
+            'stale': [{'arn': ARN.format('web', n), 'status': 'ACTIVE'} for n in (1, 2, 3)]}
+
+
+def test_plan_candidates_drop_revisions_active_since_the_plan():
+    stale = plan_candidates(plan(), '123456789012', 'us-east-1', active_arns={ARN.format('web', 2)}, max_age=900)
+    assert [r['arn'] for r in stale] == [ARN.format('web', 1), ARN.format('web', 3)]
+
+
+def test_plan_candidates_refuse_old_or_foreign_plans():
+    with pytest.raises(ValueError, match='old'):
+        plan_candidates(plan(age=1000), '123456789012', 'us-east-1', active_arns=(), max_age=900)
+    with pytest.raises(ValueError, match='eu-west-1'):
+        plan_candidates(plan(region='eu-west-1'), '123456789012', 'us-east-1', active_arns=(), max_age=900)
+
+
+def test_plan_candidates_refuse_plans_from_another_account():
+    with pytest.raises(ValueError, match='210987654321'):
+        plan_candidates(plan(account='210987654321'), '123456789012', 'us-east-1', active_arns=(), max_age=900)
+    unscoped = plan()
+    del unscoped['account']
+    with pytest.raises(ValueError, match='unknown'):
+        plan_candidates(unscoped, '123456789012', 'us-east-1', active_arns=(), max_age=900)
@@ -0,0 +1,90 @@
+import json
+
+import analytics
+from tf_state import load_inventory
+
+READER_REPORT = """# AWS Resources
+
+| Identifier | Service | Type | Region | Tags |
+| :--- | :--- | :--- | :--- | :--- |
+| `arn:aws:s3:::app-bucket` | s3 | bucket | us-east-1 | `Name: app` |
+| `vpc-0abc` | ec2 | vpc | eu-west-1 | |
+"""
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_load_inventory_reader_report(tmp_path):
+    records = load_inventory(write(tmp_path, 'report.md', READER_REPORT))
+    assert records == [
+        {'Identifier': 'arn:aws:s3:::app-bucket', 'Arn': 'arn:aws:s3:::app-bucket', 'Service': 's3',
+         'Type': 's3:bucket', 'Region': 'us-east-1', 'Tags': {'Name': 'app'}},
+        {'Identifier': 'vpc-0abc', 'Arn': None, 'Service': 'ec2', 'Type': 'ec2:vpc', 'Region': 'eu-west-1', 'Tags': {}},
+    ]
+
+
+def test_load_inventory_jsonl_report_skips_summary_rows(tmp_path):
+    lines = [{'Type': 'AWS::S3::Bucket', 'Resource ID': 'arn:aws:s3:::old', 'Tags': {'Project': 'x'},
+              'Action': 'DELETE', 'Justification': 'Empty bucket'},
+             {'Action': 'DELETE', 'Count': 1}]
+    path = write(tmp_path, 'report.jsonl', '\n'.join(json.dumps(l) for l in lines) + '\n')
+    assert load_inventory(path) == [{'Arn': 'arn:aws:s3:::old', 'Type': 'AWS::S3::Bucket', 'Tags': {'Project': 'x'},
+                                     'Relevance': 'DELETE', 'Justification': 'Empty bucket'}]
+
+
+def test_analytics_load_report_uses_the_same_records(tmp_path):
+    df = analytics.load_report(write(tmp_path, 'report.md', READER_REPORT))
+    assert df['Arn'].astype(object).where(df['Arn'].notna(), None).tolist() == ['arn:aws:s3:::app-bucket', None]
+    assert df['tag:Name'].astype(object).where(df['tag:Name'].notna(), None).tolist() == ['app', None]
+
+
+STATE = {
+    'version': 4,
+    'resources': [
+        {'mode': 'managed', 'type': 'aws_ecs_service', 'name': 'web', 'instances': [
+            {'attributes': {'id': 'arn:aws:ecs:us-east-1:123456789012:service/main/web', 'name': 'web'}}]},
+        {'mode': 'managed', 'type': 'aws_cloudwatch_log_group', 'name': 'ecs', 'instances': [
+            {'attributes': {'id': '/aws/ecs/app', 'name': '/aws/ecs/app',
+                            'arn': 'arn:aws:logs:us-east-1:123456789012:log-group:/aws/ecs/app'}}]},
+        {'mode': 'data', 'type': 'aws_caller_identity', 'name': 'me', 'instances': [{'attributes': {'id': '1'}}]},
+        {'module': 'module.vpc', 'mode': 'managed', 'type': 'aws_subnet', 'name': 'private', 'instances': [
+            {'index_key': n, 'attributes': {'id': f"subnet-{n}",
+                                            'arn': f"arn:aws:ec2:us-east-1:123456789012:subnet/subnet-{n}"}}
+            for n in range(3)]},
+    ],
+}
+
+
+def test_iter_resources_streams_across_chunk_boundaries():
+    import io
+    from tf_state import iter_resources
+
+    text = json.dumps(STATE, indent=2)
+    for chunk_size in (1, 7, 64, len(text)):
+        assert list(iter_resources(io.StringIO(text), chunk_size=chunk_size)) == STATE['resources']
+
+
+def test_lookup_matches_names_only_within_the_same_kind(tmp_path):
+    from tf_state import TerraformStateIndex
+
+    index = TerraformStateIndex()
+    index.add_state(write(tmp_path, 'terraform.tfstate', json.dumps(STATE)), env='dev')
+    log_group = {'Arn': 'arn:aws:logs:us-east-1:123456789012:log-group:/aws/ecs/web:*', 'Type': 'AWS::Logs::LogGroup'}
+    service = {'Arn': 'arn:aws:ecs:us-east-1:123456789012:service/main/web', 'Type': 'AWS::ECS::Service'}
+    reader_subnet = {'Identifier': 'subnet-2', 'Arn': None, 'Type': 'ec2:subnet'}
+    reader_log_group = {'Identifier': '/aws/ecs/app', 'Arn': None, 'Type': 'logs:log-group'}
+    reader_vpc = {'Identifier': 'subnet-1', 'Arn': None, 'Type': 'ec2:vpc'}
+
+    assert index.lookup(log_group) is None
+    assert index.lookup(service)['address'] == 'aws_ecs_service.web'
+    assert index.lookup(reader_subnet)['address'] == 'module.vpc.aws_subnet.private[2]'
+    assert index.lookup(reader_log_group)['address'] == 'aws_cloudwatch_log_group.ecs'
+    assert index.lookup(reader_vpc) is None
+    result = index.classify([log_group, service, reader_subnet])
+    assert len(result['managed']) == 2 and len(result['orphans']) == 1
+    assert sorted(e['address'] for e in result['missing']) == [
+        'aws_cloudwatch_log_group.ecs', 'module.vpc.aws_subnet.private[0]', 'module.vpc.aws_subnet.private[1]']
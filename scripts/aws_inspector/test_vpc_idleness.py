@@ -0,0 +1,44 @@
+from vpc_idleness import FlowLogAggregator, iter_lines
+
+HEADER = b'version account-id interface-id srcaddr dstaddr srcport dstport protocol packets bytes start end action log-status vpc-id'
+
+
+def record(eni, nbytes, start, action='ACCEPT', vpc='vpc-1'):
+    return f"2 123456789012 {eni} 10.0.0.1 10.0.0.2 443 5000 6 3 {nbytes} {start} {start + 60} {action} OK {vpc}".encode()
+
+
+def test_reject_records_are_not_traffic():
+    agg = FlowLogAggregator(window_start=1000)
+    agg.consume([HEADER, record('eni-a', 500, 1000), record('eni-a', 9000, 1100, 'REJECT'),
+                 record('eni-b', 700, 1200, 'REJECT', vpc='vpc-2')])
+    assert agg.by_eni == {'eni-a': [500, 3, 1000]}
+    assert agg.rejected == {'eni-a': 9000, 'eni-b': 700}
+    # An ENI that only saw rejected traffic is still mapped to its VPC
+    assert agg.eni_vpc == {'eni-a': 'vpc-1', 'eni-b': 'vpc-2'}
+    assert agg.records == 1
+
+
+def test_window_nodata_and_split_chunks():
+    class Stream:
+        def __init__(self, data):
+            self.data = data
+
+        def read(self, n):
+            chunk, self.data = self.data[:n], self.data[n:]
+            return chunk
+
+    lines = [HEADER, record('eni-a', 100, 500), record('eni-a', 200, 2000),
+             b'2 123456789012 eni-a - - - - - - - 2000 2060 - NODATA vpc-1']
+    agg = FlowLogAggregator(window_start=1000)
+    agg.consume(iter_lines(Stream(b'\n'.join(lines)), chunk_size=7))
+    assert agg.by_eni == {'eni-a': [200, 3, 2000]}
+    assert agg.skipped == 1
+
+
+def test_malformed_numbers_are_skipped_not_fatal():
+    garbled = record('eni-a', 100, 1500).replace(b' 1500 ', b' 15x0 ')
+    truncated_bytes = record('eni-a', 100, 1500).replace(b' 100 ', b' 1e2 ')
+    agg = FlowLogAggregator(window_start=1000)
+    agg.consume([HEADER, garbled, truncated_bytes, record('eni-a', 300, 1600)])
+    assert agg.by_eni == {'eni-a': [300, 3, 1600]}
+    assert agg.skipped == 2
@@ -0,0 +1,286 @@
+import argparse
+import json
+import logging
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'environments')
+
+# Local backend: each environment keeps its state next to its .tf files
+DEFAULT_ENVIRONMENTS = ['dev', 'prod']
+
+CHUNK_SIZE = 1024 * 1024
+
+MANAGED = 'MANAGED'
+ORPHAN = 'ORPHAN'
+
+# `"resources": [` opens a resource list in both terraform.tfstate (v4) and `terraform show -json`
+# (root_module and every child_module)
+_RESOURCES_KEY = re.compile(r'"resources"\s*:\s*\[')
+_DECODER = json.JSONDecoder()
+
+# Attributes that hold an identifier AWS also reports (ids, names, ARNs)
+ID_ATTRIBUTES = ['id', 'arn', 'name', 'bucket', 'arn_without_revision']
+
+# Names and IDs only match within one kind ("<service>:<resource type>", as in reader Types), so a log group
+# /aws/ecs/web never matches the ECS service web. ARNs without a resource type, and kinds named differently
+# by the reader, are mapped here; Terraform types without an ARN attribute get their kind from TF_KINDS.
+UNTYPED_ARN_KINDS = {'s3': 's3:bucket', 'codepipeline': 'codepipeline:pipeline'}
+KIND_ALIASES = {'rds:db': 'rds:db-instance'}
+TF_KINDS = {'aws_nat_gateway': 'ec2:natgateway', 'aws_eip': 'ec2:elastic-ip'}
+
+_ARN_RESOURCE = re.compile(r'^(?P<type>[A-Za-z0-9-]+)[/:](?P<id>.+)$')
+
+
+def iter_resources(stream, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Yields each element of every "resources" array in a state or plan JSON document (text stream),
+    decoding one resource at a time so memory stays bounded by the largest resource.
+    """
+    buffer, pos, eof = '', 0, False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        # Outside a resource list: look for the next one
+        m = _RESOURCES_KEY.search(buffer, pos)
+        if not m:
+            # Keep a tail in case the key straddles two chunks
+            pos = max(pos, len(buffer) - 64)
+            if not fill():
+                return
+            continue
+        pos = m.end()
+
+        # Inside the list: decode elements until the closing bracket
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buffer):
+                if not fill():
+                    return
+                continue
+            if buffer[pos] == ']':
+                pos += 1
+                break
+            try:
+                element, end = _DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # The element continues in the next chunk
+                if not fill():
+                    raise
+                continue
+            yield element
+            pos = end
+
+
+def normalize_key(value: str) -> str:
+    # Log group ARNs are reported with and without the trailing ":*"
+    return value[:-2] if value.endswith(':*') else value
+
+
+def arn_kind(arn: str) -> Optional[str]:
+    """'<service>:<resource type>' of an ARN, e.g. logs:log-group, ecs:service, s3:bucket."""
+    parts = arn.split(':', 5)
+    if len(parts) < 6:
+        return None
+    m = _ARN_RESOURCE.match(parts[5])
+    kind = f"{parts[2]}:{m.group('type')}" if m else UNTYPED_ARN_KINDS.get(parts[2])
+    return KIND_ALIASES.get(kind, kind)
+
+
+def arn_resource_ids(arn: str) -> List[str]:
+    """The ARN's resource ID and its last path segment (log-group:/aws/ecs/web -> /aws/ecs/web, web)."""
+    resource = normalize_key(arn.split(':', 5)[-1])
+    m = _ARN_RESOURCE.match(resource)
+    resource_id = m.group('id') if m else resource
+    return list(dict.fromkeys([resource_id, resource_id.split('/')[-1]]))
+
+
+def inventory_kind(resource: Dict) -> Optional[str]:
+    arn = resource.get('Arn') or resource.get('ARN')
+    if arn:
+        return arn_kind(arn)
+    rtype = resource.get('Type') or ''
+    # Reader types are "<service>:<type>"; CloudFormation ones (AWS::S3::Bucket) always come with an ARN
+    return rtype if ':' in rtype and '::' not in rtype else None
+
+
+def resource_instances(resource: Dict) -> Iterator[Dict]:
+    """
+    Managed resource instances as {'address', 'type', 'kind', 'keys'}, from either a
+    terraform.tfstate resource (instances[].attributes) or a show -json one (values).
+    """
+    if resource.get('mode', 'managed') != 'managed' or 'type' not in resource:
+        return
+    if 'values' in resource:
+        yield _instance(resource.get('address', f"{resource['type']}.{resource.get('name')}"),
+                        resource['type'], resource['values'])
+        return
+    base = f"{resource['module'] + '.' if resource.get('module') else ''}{resource['type']}.{resource['name']}"
+    for instance in resource.get('instances', []):
+        index = instance.get('index_key')
+        suffix = '' if index is None else f'[{json.dumps(index)}]'
+        yield _instance(base + suffix, resource['type'], instance.get('attributes') or {})
+
+
+def _instance(address: str, tf_type: str, attributes: Dict) -> Dict:
+    keys = _keys(attributes)
+    arn = next((k for k in keys if k.startswith('arn:')), None)
+    return {'address': address, 'type': tf_type, 'kind': arn_kind(arn) if arn else TF_KINDS.get(tf_type), 'keys': keys}
+
+
+def _keys(attributes: Dict) -> List[str]:
+    keys = []
+    for attr in ID_ATTRIBUTES:
+        value = attributes.get(attr)
+        if isinstance(value, str) and value:
+            keys.append(normalize_key(value))
+    return keys
+
+
+class TerraformStateIndex:
+    """
+    ARN or (kind, ID/name) -> Terraform address for every managed resource in one or more state files,
+    so an inventory can be split into managed and orphaned resources in one hash-join pass.
+    """
+
+    def __init__(self):
+        self.by_arn: Dict[str, Dict] = {}                  # ARN -> {'address', 'type', 'env'}
+        self.by_key: Dict[Tuple[str, str], Dict] = {}      # (kind, id or name) -> same entry
+        self.resources: List[Dict] = []
+
+    def add_state(self, path: str, env: str = None):
+        env = env or os.path.basename(os.path.dirname(os.path.abspath(path)))
+        count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for resource in iter_resources(f):
+                for instance in resource_instances(resource):
+                    entry = {'address': instance['address'], 'type': instance['type'], 'env': env,
+                             'keys': instance['keys']}
+                    self.resources.append(entry)
+                    for key in instance['keys']:
+                        if key.startswith('arn:'):
+                            self.by_arn.setdefault(key, entry)
+                        elif instance['kind']:
+                            self.by_key.setdefault((instance['kind'], key), entry)
+                    count += 1
+        logger.info(f"Indexed {count} managed resources from {path} ({env})")
+
+    def lookup(self, resource: Dict) -> Optional[Dict]:
+        """
+        State entry for a reader ('ARN') or inspector ('Arn') record, matched on ARN, else on its
+        identifier or ARN resource ID among state resources of the same kind.
+        """
+        arn = resource.get('Arn') or resource.get('ARN') or ''
+        entry = self.by_arn.get(normalize_key(arn)) if arn else None
+        if entry:
+            return entry
+        kind = inventory_kind(resource)
+        if not kind:
+            return None
+        for key in [resource.get('Identifier')] + (arn_resource_ids(arn) if arn else []):
+            if key:
+                entry = self.by_key.get((kind, normalize_key(key)))
+                if entry:
+                    return entry
+        return None
+
+    def classify(self, inventory: Iterable[Dict]) -> Dict[str, List[Dict]]:
+        """
+        {'managed': [...], 'orphans': [...], 'missing': [...]}: inventory records annotated with their
+        Terraform address (or ORPHAN), plus state entries nothing in the inventory matched.
+        """
+        managed, orphans, seen = [], [], set()
+        for resource in inventory:
+            entry = self.lookup(resource)
+            if entry:
+                seen.add(id(entry))
+                managed.append(dict(resource, Terraform=MANAGED, Address=entry['address'], Env=entry['env']))
+            else:
+                orphans.append(dict(resource, Terraform=ORPHAN))
+        missing = [e for e in self.resources if id(e) not in seen]
+        return {'managed': managed, 'orphans': orphans, 'missing': missing}
+
+
+def default_state_files(environments: List[str] = DEFAULT_ENVIRONMENTS) -> List[str]:
+    paths = [os.path.join(ENVIRONMENTS_DIR, env, 'terraform.tfstate') for env in environments]
+    return [p for p in paths if os.path.exists(p)]
+
+
+def load_inventory(path: str) -> List[Dict]:
+    """
+    Reads a main.py --output-file *.jsonl report, or the reader's markdown report
+    (only the Name tag is recorded there; Type is "<service>:<type>").
+    The one parser for both outputs: analytics, cost_model and naming_conformance use it too.
+    """
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                row = json.loads(line)
+                if 'Resource ID' in row:
+                    records.append({'Arn': row['Resource ID'], 'Type': row['Type'], 'Tags': row.get('Tags') or {},
+                                    'Relevance': row.get('Action'), 'Justification': row.get('Justification')})
+            return records
+        for line in f:
+            parts = [p.strip() for p in line.strip().split('|')]
+            if len(parts) < 6 or parts[1] in ('Identifier', ':---'):
+                continue
+            ident = parts[1].strip('`')
+            tags = {'Name': parts[5][len('`Name: '):].rstrip('`')} if parts[5].startswith('`Name: ') else {}
+            records.append({'Identifier': ident, 'Arn': ident if ident.startswith('arn:') else None,
+                            'Service': parts[2], 'Type': f"{parts[2]}:{parts[3]}", 'Region': parts[4], 'Tags': tags})
+    return records
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description='Split an inventory into Terraform-managed and orphaned resources.')
+    parser.add_argument('--state', nargs='+', help='terraform.tfstate or `terraform show -json` files '
+                                                   '(default: environments/dev and environments/prod state)')
+    parser.add_argument('--inventory', nargs='+', required=True,
+                        help='main.py --output-file .jsonl reports or aws-services-reader.md reports')
+    parser.add_argument('--json', dest='json_file', help='Write the classification to this JSON file')
+    args = parser.parse_args()
+
+    states = args.state or default_state_files()
+    if not states:
+        logger.error("No state files found; pass --state (e.g. `terraform show -json > dev.json`).")
+        return
+
+    index = TerraformStateIndex()
+    for path in states:
+        index.add_state(path)
+    inventory = [r for path in args.inventory for r in load_inventory(path)]
+    result = index.classify(inventory)
+
+    logger.info(f"{len(result['managed'])} managed, {len(result['orphans'])} orphaned, "
+                f"{len(result['missing'])} in state but not in the inventory")
+    logger.info("-" * 100)
+    for r in result['orphans']:
+        claimed = " (tagged ManagedBy=Terraform)" if (r.get('Tags') or {}).get('ManagedBy') == 'Terraform' else ''
+        logger.info(f"ORPHAN  {r.get('Type', ''):<40} {r.get('Arn') or r.get('Identifier')}{claimed}")
+    for e in result['missing']:
+        logger.info(f"MISSING {e['type']:<40} {e['address']} ({e['env']})")
+
+    if args.json_file:
+        with open(args.json_file, 'w') as f:
+            json.dump(result, f, indent=2, default=str)
+        logger.info(f"Classification written to {args.json_file}")
+
+if __name__ == "__main__":
+    main()
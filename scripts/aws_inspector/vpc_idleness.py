@@ -0,0 +1,253 @@
+import argparse
+import gzip
+import logging
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from botocore.exceptions import ClientError
+from aws_core import AwsExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+logger = logging.getLogger(__name__)
+
+# Default (version 2) flow log record format, used when a file has no header line
+DEFAULT_FIELDS = [
+    'version', 'account-id', 'interface-id', 'srcaddr', 'dstaddr', 'srcport', 'dstport',
+    'protocol', 'packets', 'bytes', 'start', 'end', 'action', 'log-status',
+]
+
+# Bytes per day below which a VPC is reported as LOW usage rather than ACTIVE
+LOW_USAGE_BYTES_PER_DAY = 1024 * 1024
+
+# Read size for streaming; lines are split out of these chunks so memory stays flat for multi-GB files
+CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class FlowLogAggregator:
+    """
+    Aggregates bytes/packets per ENI (and per VPC, when the record carries vpc-id)
+    from flow log lines, keeping only records that started inside the window.
+    REJECT records are not traffic the VPC served; their bytes are kept apart in rejected.
+    """
+
+    def __init__(self, window_start: int):
+        self.window_start = window_start
+        self.by_eni: Dict[str, List[int]] = {}   # eni -> [bytes, packets, last_seen]
+        self.eni_vpc: Dict[str, str] = {}
+        self.rejected: Dict[str, int] = {}       # eni -> rejected bytes
+        self.records = 0
+        self.skipped = 0
+
+    def consume(self, lines: Iterable[bytes]):
+        fields = DEFAULT_FIELDS
+        idx = self._indexes(fields)
+        for line in lines:
+            parts = line.split()
+            if not parts:
+                continue
+            # S3 exports start with a header naming the fields; CloudWatch exports prefix a timestamp
+            if parts[0] == b'version':
+                fields = [p.decode() for p in parts]
+                idx = self._indexes(fields)
+                continue
+            if len(parts) == len(fields) + 1:
+                parts = parts[1:]
+            if len(parts) != len(fields):
+                self.skipped += 1
+                continue
+
+            start = parts[idx['start']]
+            nbytes = parts[idx['bytes']]
+            if nbytes == b'-' or start == b'-':
+                # NODATA / SKIPDATA records
+                self.skipped += 1
+                continue
+            try:
+                start, nbytes, packets = int(start), int(nbytes), int(parts[idx['packets']])
+            except ValueError:
+                # Corrupt or truncated line
+                self.skipped += 1
+                continue
+            if start < self.window_start:
+                continue
+
+            eni = parts[idx['interface-id']].decode()
+            if idx['vpc-id'] is not None and eni not in self.eni_vpc:
+                self.eni_vpc[eni] = parts[idx['vpc-id']].decode()
+            if idx['action'] is not None and parts[idx['action']] == b'REJECT':
+                self.rejected[eni] = self.rejected.get(eni, 0) + nbytes
+                continue
+            agg = self.by_eni.get(eni)
+            if agg is None:
+                agg = self.by_eni[eni] = [0, 0, 0]
+            agg[0] += nbytes
+            agg[1] += packets
+            if start > agg[2]:
+                agg[2] = start
+            self.records += 1
+
+    @staticmethod
+    def _indexes(fields: List[str]) -> Dict[str, Optional[int]]:
+        names = ['interface-id', 'packets', 'bytes', 'start', 'vpc-id', 'action']
+        return {n: (fields.index(n) if n in fields else None) for n in names}
+
+
+def iter_lines(stream, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yields lines from a binary stream in fixed-size chunks (works for gzip and S3 bodies)."""
+    tail = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def open_local(path: str):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def iter_s3_objects(s3, uri: str) -> Iterator[Tuple[str, str]]:
+    bucket, _, prefix = uri[len('s3://'):].partition('/')
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get('Contents', []):
+            yield bucket, obj['Key']
+
+
+def read_flow_logs(aggregator: FlowLogAggregator, sources: List[str], s3=None):
+    for source in sources:
+        if source.startswith('s3://'):
+            for bucket, key in iter_s3_objects(s3, source):
+                body = s3.get_object(Bucket=bucket, Key=key)['Body']
+                stream = gzip.GzipFile(fileobj=body) if key.endswith('.gz') else body
+                logger.info(f"Reading s3://{bucket}/{key}")
+                aggregator.consume(iter_lines(stream))
+        else:
+            logger.info(f"Reading {source}")
+            with open_local(source) as stream:
+                aggregator.consume(iter_lines(stream))
+
+
+def metric_sum(cw, namespace, metric_name, dimensions, start_time, end_time) -> float:
+    try:
+        response = cw.get_metric_statistics(
+            Namespace=namespace,
+            MetricName=metric_name,
+            Dimensions=dimensions,
+            StartTime=start_time,
+            EndTime=end_time,
+            Period=int((end_time - start_time).total_seconds()) // 60 * 60,
+            Statistics=['Sum']
+        )
+        return sum(dp['Sum'] for dp in response.get('Datapoints', []))
+    except ClientError as e:
+        logger.warning(f"Failed to get metric {metric_name}: {e}")
+        return 0.0
+
+
+def score_vpcs(core: AwsExecutor, aggregator: FlowLogAggregator, days: int) -> List[Dict]:
+    """
+    Combines flow-log traffic with NAT Gateway and ALB byte metrics per VPC.
+    Returns VPCs sorted from least to most used.
+    """
+    cw = core.client('cloudwatch')
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(days=days)
+    data = core.paginate_many({
+        'vpcs': ('ec2', 'describe_vpcs', 'Vpcs'),
+        'enis': ('ec2', 'describe_network_interfaces', 'NetworkInterfaces'),
+        'nats': ('ec2', 'describe_nat_gateways', 'NatGateways'),
+        'lbs': ('elbv2', 'describe_load_balancers', 'LoadBalancers'),
+    })
+
+    scores = {}
+    for vpc in data['vpcs']:
+        name = next((t['Value'] for t in vpc.get('Tags', []) if t['Key'] == 'Name'), "N/A")
+        scores[vpc['VpcId']] = {'id': vpc['VpcId'], 'name': name, 'flow_bytes': 0, 'flow_packets': 0,
+                                'enis_seen': 0, 'rejected_bytes': 0, 'nat_bytes': 0.0, 'alb_bytes': 0.0}
+
+    # ENIs that carried traffic may be gone by now; prefer the vpc-id from the record itself
+    eni_vpc = {eni['NetworkInterfaceId']: eni['VpcId'] for eni in data['enis']}
+    eni_vpc.update(aggregator.eni_vpc)
+    for eni, (nbytes, packets, _) in aggregator.by_eni.items():
+        s = scores.get(eni_vpc.get(eni))
+        if s:
+            s['flow_bytes'] += nbytes
+            s['flow_packets'] += packets
+            s['enis_seen'] += 1
+    for eni, nbytes in aggregator.rejected.items():
+        s = scores.get(eni_vpc.get(eni))
+        if s:
+            s['rejected_bytes'] += nbytes
+
+    # (score, field, namespace, metric, dimensions), fetched concurrently
+    metrics = []
+    for nat in data['nats']:
+        s = scores.get(nat.get('VpcId'))
+        if s and nat['State'] == 'available':
+            dims = [{'Name': 'NatGatewayId', 'Value': nat['NatGatewayId']}]
+            metrics.append((s, 'nat_bytes', 'AWS/NATGateway', 'BytesOutToDestination', dims))
+            metrics.append((s, 'nat_bytes', 'AWS/NATGateway', 'BytesOutToSource', dims))
+
+    for lb in data['lbs']:
+        s = scores.get(lb.get('VpcId'))
+        if s and lb['Type'] == 'application':
+            dim_value = lb['LoadBalancerArn'].split(':loadbalancer/')[-1]
+            dims = [{'Name': 'LoadBalancer', 'Value': dim_value}]
+            metrics.append((s, 'alb_bytes', 'AWS/ApplicationELB', 'ProcessedBytes', dims))
+
+    sums = core.map(lambda m: metric_sum(cw, m[2], m[3], m[4], start_time, end_time), metrics)
+    for (s, field, *_), value in zip(metrics, sums):
+        s[field] += value
+
+    for s in scores.values():
+        total = s['flow_bytes'] + s['nat_bytes'] + s['alb_bytes']
+        s['bytes_per_day'] = total / days
+        if total == 0:
+            s['status'] = "IDLE"
+        elif s['bytes_per_day'] < LOW_USAGE_BYTES_PER_DAY:
+            s['status'] = "LOW"
+        else:
+            s['status'] = "ACTIVE"
+
+    return sorted(scores.values(), key=lambda s: s['bytes_per_day'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank VPCs by real traffic using VPC Flow Logs plus NAT/ALB metrics.')
+    parser.add_argument('--flow-logs', nargs='+', required=True,
+                        help='Flow log files (.log/.gz) or s3://bucket/prefix exports')
+    parser.add_argument('--days', type=int, default=30, help='Window size in days')
+    parser.add_argument('--region', default='us-east-1', help='AWS Region')
+    args = parser.parse_args()
+
+    core = AwsExecutor(args.region)
+    window_start = int((datetime.now(timezone.utc) - timedelta(days=args.days)).timestamp())
+    aggregator = FlowLogAggregator(window_start)
+
+    try:
+        started = time.monotonic()
+        read_flow_logs(aggregator, args.flow_logs, s3=core.client('s3'))
+        logger.info(f"Parsed {aggregator.records} accepted records for {len(aggregator.by_eni)} ENIs "
+                    f"({aggregator.skipped} skipped, {sum(aggregator.rejected.values()):,} rejected bytes) in {time.monotonic() - started:.1f}s")
+
+        ranked = score_vpcs(core, aggregator, args.days)
+    except ClientError as e:
+        logger.error(f"AWS Error: {e}")
+        return
+    finally:
+        core.close()
+
+    logger.info("-" * 100)
+    logger.info(f"{'VPC ID':<22} | {'Name':<25} | {'Status':<7} | {'Bytes/day':>14} | {'Flow':>14} | {'NAT':>14} | {'ALB':>14} | {'Rejected':>14}")
+    logger.info("-" * 100)
+    for s in ranked:
+        logger.info(f"{s['id']:<22} | {s['name']:<25} | {s['status']:<7} | {s['bytes_per_day']:>14,.0f} | "
+                    f"{s['flow_bytes']:>14,} | {s['nat_bytes']:>14,.0f} | {s['alb_bytes']:>14,.0f} | {s['rejected_bytes']:>14,}")
+
+if __name__ == "__main__":
+    main()
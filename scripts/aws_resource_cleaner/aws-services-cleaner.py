@@ -1,9 +1,19 @@
+import argparse
+import logging
 import os
+import sys
 import boto3
 import time
 from botocore.exceptions import ClientError
 import config
 
+# Shared modules (resource_graph, aws_core, ...) live next to the inspector
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'aws_inspector'))
+from resource_graph import ResourceGraph, node_key
+from cost_model import CostModel, total_savings
+from response_cache import install_default
+import call_trace
+
 # Absolute path to the report file
 REPORT_FILE = config.REPORT_FILE_PATH
 REGION = config.AWS_REGION
@@ -79,8 +89,32 @@ def clean_resource_id(service, rtype, raw_id):
              
     return raw_id
 
+# family -> ACTIVE revision ARNs, listed once per run (see get_task_definition_index)
+_task_definition_index = None
+
+def get_task_definition_index(session):
+    """
+    Groups every ACTIVE task-definition ARN by its exact family with one paginated listing.
+    familyPrefix is a prefix match, so per-family calls also returned revisions of longer family names.
+    """
+    global _task_definition_index
+    if _task_definition_index is None:
+        index = {}
+        paginator = session.client('ecs').get_paginator('list_task_definitions')
+        for page in paginator.paginate(status='ACTIVE'):
+            for arn in page['taskDefinitionArns']:
+                family = arn.split('/')[-1].rsplit(':', 1)[0]
+                index.setdefault(family, []).append(arn)
+        _task_definition_index = index
+    return _task_definition_index
+
 def get_boto_session(region):
-    return boto3.Session(region_name=region)
+    # Reads are live (what gets deleted is never decided from the shared cache); deletions through
+    # this session still invalidate the cache for their service
+    session = boto3.Session(region_name=region)
+    install_default(session, read=False)
+    call_trace.install_active(session)
+    return session
 
 def delete_resource(session, service, rtype, resource_id):
     """
@@ -96,7 +130,7 @@ def delete_resource(session, service, rtype, resource_id):
                 ec2.release_address(AllocationId=resource_id)
             elif rtype == 'internet-gateway':
                 # Detach first (try to find VPCs) then delete
-                igw = boto3.resource('ec2', region_name=REGION).InternetGateway(resource_id)
+                igw = session.resource('ec2').InternetGateway(resource_id)
                 try:
                     for vpc in igw.attachments:
                         igw.detach_from_vpc(VpcId=vpc['VpcId'])
@@ -143,7 +177,7 @@ def delete_resource(session, service, rtype, resource_id):
                     return False
         
         elif service == 's3':
-            s3 = boto3.resource('s3')
+            s3 = session.resource('s3')
             bucket = s3.Bucket(resource_id)
             # Delete all objects first
             try:
@@ -222,8 +256,11 @@ def delete_resource(session, service, rtype, resource_id):
                  # Report string: task-definition/aws-service-liblib-app-dev
                  # This might just be family. We need to deregister revisions.
                  family = resource_id.split('/')[-1]
-                 # list tasks
-                 arns = ecs.list_task_definitions(familyPrefix=family, status='ACTIVE')['taskDefinitionArns']
+                 if ':' in family:
+                     # Already a single revision (family:rev or full ARN)
+                     arns = [resource_id]
+                 else:
+                     arns = get_task_definition_index(session).get(family, [])
                  for arn in arns:
                      ecs.deregister_task_definition(taskDefinition=arn)
 
@@ -391,7 +428,43 @@ def resolve_identifier(res_dict, tag_str):
     
     return rid
 
+def savings_order(resources, graph):
+    """
+    Resources with a monthly cost first, highest first, each preceded by the report resources that
+    depend on it and come earlier in DELETION_ORDER (and, recursively, by their own such dependents);
+    free resources follow in DELETION_ORDER.
+    """
+    by_key = {node_key(res['clean_id']): res for res in resources}
+    ordered, placed = [], set()
+
+    def place(res):
+        if id(res) in placed:
+            return
+        placed.add(id(res))
+        dependents = graph.dependents(res['clean_id'], max_depth=1) if graph is not None else {}
+        blockers = [by_key[d] for d in dependents if d in by_key and by_key[d]['priority'] < res['priority']]
+        for blocker in sorted(blockers, key=lambda r: r['priority']):
+            place(blocker)
+        ordered.append(res)
+
+    for res in sorted((r for r in resources if r['monthly_cost']), key=lambda r: r['monthly_cost'], reverse=True):
+        place(res)
+    for res in resources:
+        place(res)
+    return ordered
+
 def main():
+    # print() carries the deletion log; this shows the graph and cost model messages
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Delete the resources listed in the reader report.")
+    parser.add_argument("--time-budget", type=float,
+                        help="Seconds to spend deleting: the highest monthly savings go first, the rest is left for the next run")
+    parser.add_argument("--profile", nargs="?", const=call_trace.TRACE_FILE, metavar="TRACE_FILE",
+                        help="Trace every AWS call: Chrome trace JSON, flame graph stacks and a summary at exit")
+    args = parser.parse_args()
+    if args.profile:
+        call_trace.enable(args.profile)
+
     if not os.path.exists(REPORT_FILE):
         print(f"Error: File {REPORT_FILE} not found.")
         return
@@ -444,8 +517,31 @@ def main():
     print(f"Found {len(resources)} active resources. Starting deletion...")
 
     for res in resources:
-        clean_id = resolve_identifier(res, res['tags'])
-        clean_id = clean_resource_id(res['service'], res['type'], clean_id)
+        res['clean_id'] = clean_resource_id(res['service'], res['type'], resolve_identifier(res, res['tags']))
+
+    # Warn before deleting something that resources outside this report still depend on
+    graph = ResourceGraph.load()
+    scope = {res['clean_id'] for res in resources}
+
+    # Estimated monthly cost per resource (offline pricing snapshot, default sizes)
+    cost_model = CostModel.load(region=REGION)
+    for res in resources:
+        res['monthly_cost'] = cost_model.monthly_cost(f"{res['service']}:{res['type']}") or 0.0
+    print(f"Estimated monthly savings if everything goes: ${total_savings(resources, 'monthly_cost'):,.2f}")
+
+    if args.time_budget:
+        resources = savings_order(resources, graph)
+    deadline = time.monotonic() + args.time_budget if args.time_budget else None
+    deleted = []
+
+    for n, res in enumerate(resources):
+        clean_id = res['clean_id']
+
+        if deadline and time.monotonic() > deadline:
+            left = resources[n:]
+            print(f"Time budget used up: {len(left)} resources left for the next run "
+                  f"(${total_savings(left, 'monthly_cost'):,.2f}/month)")
+            break
         
         # Safety check: Don't delete payments or critical things blindly if not targeted
         if res['service'] == 'payments':
@@ -453,6 +549,10 @@ def main():
             continue
 
         print(f"[{res['priority']}] Deleting {res['service']} {res['type']} - {clean_id}")
+        if graph:
+            outside = graph.external_dependents(clean_id, scope)
+            if outside:
+                print(f"  Warning: {len(outside)} resources not in this report depend on it: {', '.join(outside[:5])}")
         
         # Retry logic for dependencies
         max_retries = 3
@@ -466,6 +566,7 @@ def main():
                 time.sleep(5)
         
         if success:
+            deleted.append(res)
             # Mark as deleted in memory
             cols = res['parts']
             cols[1] = mark_as_deleted(cols[1])
@@ -480,7 +581,7 @@ def main():
             # Rate limit slightly
             time.sleep(1)
 
-    print("Deletion process complete.")
+    print(f"Deletion process complete. Estimated monthly savings: ${total_savings(deleted, 'monthly_cost'):,.2f}")
 
 if __name__ == "__main__":
     main()
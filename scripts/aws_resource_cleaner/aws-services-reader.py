@@ -1,17 +1,32 @@
+import argparse
 import boto3
 import logging
 from typing import List, Dict, Any, Optional
 import os
+import sys
 import config
 
+# Shared modules (resource_graph, aws_core, ...) live next to the inspector
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'aws_inspector'))
+from resource_graph import ResourceGraph, link_payload
+from response_cache import install_default
+from scan_checkpoint import ScanCheckpoint, list_pages, raise_if_interrupted
+from resource_records import ReaderRecord, RecordList
+from inventory_watch import DEFAULT_POLL_SECONDS, DEFAULT_RECONCILE_HOURS, InventoryWatcher, event_source
+import call_trace
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class AWSServiceReader:
-    def __init__(self, region: str = config.AWS_REGION):
+    def __init__(self, region: str = config.AWS_REGION, cache_reads: bool = True):
         self.region = region
         self.session = boto3.Session(region_name=region)
+        # Responses are shared with the cleaner and the inspector scripts for a few minutes
+        # (watch mode reconciles against live listings, cache_reads=False)
+        install_default(self.session, read=cache_reads)
+        call_trace.install_active(self.session)
         
         # Clients
         self.tagging_client = self.session.client('resourcegroupstaggingapi')
@@ -30,8 +45,13 @@ class AWSServiceReader:
         self.codebuild = self.session.client('codebuild')
         self.codepipeline = self.session.client('codepipeline')
         
-        self.discovered_resources = []
+        # Slotted records with interned strings and shared tag sets, indexed by ARN
+        self.discovered_resources = RecordList(ReaderRecord, key='ARN')
         self.report_file = config.REPORT_FILE_PATH
+        # Relationships found in the same describe payloads (VpcId, TargetGroup -> LB, Service -> Cluster, ...)
+        self.graph = ResourceGraph()
+        # Set by scan_all_resources; paginated listings record their progress in it
+        self.checkpoint = None
 
     def add_resource(self, identifier, arn, service, rtype, tags=None):
         if tags is None: tags = {}
@@ -39,7 +59,7 @@ class AWSServiceReader:
         if service == 'payments': return
         
         # Deduplication check
-        if any(r['ARN'] == arn for r in self.discovered_resources):
+        if self.discovered_resources.has(arn):
             return
             
         self.discovered_resources.append({
@@ -51,33 +71,33 @@ class AWSServiceReader:
             'Tags': tags
         })
 
-    def scan_all_resources(self):
+    def scan_all_resources(self, checkpoint: Optional[ScanCheckpoint] = None):
         """
         Scans all resources using specific API calls for 100% coverage.
+        With a checkpoint, finished services and listing pages are journaled, and services
+        finished before a resume are skipped.
         """
         logger.info("Starting Deep Scan for all resources...")
-        
-        # 1. Compute
-        self.scan_ec2()
-        self.scan_ecs()
-        self.scan_lambda()
-        self.scan_apprunner()
-        
-        # 2. Storage & DB
-        self.scan_s3()
-        self.scan_rds()
-        self.scan_dynamodb()
-        self.scan_ecr()
-        
-        # 3. Load Balancing
-        self.scan_elbv2()
-        
-        # 4. DevOps & Management
-        self.scan_codestar()
-        self.scan_codebuild()
-        self.scan_codepipeline()
-        self.scan_resource_groups()
-        self.scan_cloudwatch_logs()
+        self.checkpoint = checkpoint
+
+        steps = [
+            # 1. Compute
+            self.scan_ec2, self.scan_ecs, self.scan_lambda, self.scan_apprunner,
+            # 2. Storage & DB
+            self.scan_s3, self.scan_rds, self.scan_dynamodb, self.scan_ecr,
+            # 3. Load Balancing
+            self.scan_elbv2,
+            # 4. DevOps & Management
+            self.scan_codestar, self.scan_codebuild, self.scan_codepipeline, self.scan_resource_groups,
+            self.scan_cloudwatch_logs,
+        ]
+        for step in steps:
+            if checkpoint and checkpoint.is_done(step.__name__):
+                logger.info(f"Skipping {step.__name__} (finished before the interruption)")
+                continue
+            step()
+            if checkpoint:
+                checkpoint.step_done(step.__name__)
 
         # 5. Broad Scan (Tagging API) - Final catch-all
         # Disabled to prevent duplicates and "unknown" resources that were explicitly skipped (e.g. deleting)
@@ -98,6 +118,7 @@ class AWSServiceReader:
                         tags=tags
                     )
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning tagging API: {e}")
 
     def scan_ec2(self):
@@ -107,30 +128,35 @@ class AWSServiceReader:
             for res in self.ec2.describe_instances()['Reservations']:
                 for inst in res['Instances']:
                     if inst['State']['Name'] in ['terminated', 'shutting-down']: continue
+                    link_payload(self.graph, 'ec2:instance', inst)
                     name = next((t['Value'] for t in inst.get('Tags', []) if t['Key']=='Name'), inst['InstanceId'])
                     tags = {t['Key']: t['Value'] for t in inst.get('Tags', [])}
                     self.add_resource(name, f"arn:aws:ec2:{self.region}:{inst.get('OwnerId', '')}:instance/{inst['InstanceId']}", 'ec2', 'instance', tags)
             
             # Security Groups
             for sg in self.ec2.describe_security_groups()['SecurityGroups']:
+                link_payload(self.graph, 'ec2:security-group', sg)
                 if sg['GroupName'] == 'default': continue
                 tags = {t['Key']: t['Value'] for t in sg.get('Tags', [])}
                 self.add_resource(sg['GroupName'], f"arn:aws:ec2:{self.region}:{sg['OwnerId']}:security-group/{sg['GroupId']}", 'ec2', 'security-group', tags)
                 
             # VPCs
             for vpc in self.ec2.describe_vpcs()['Vpcs']:
+                link_payload(self.graph, 'ec2:vpc', vpc)
                 if vpc.get('IsDefault', False): continue
                 tags = {t['Key']: t['Value'] for t in vpc.get('Tags', [])}
                 self.add_resource(vpc['VpcId'], f"arn:aws:ec2:{self.region}:{vpc['OwnerId']}:vpc/{vpc['VpcId']}", 'ec2', 'vpc', tags)
 
             # Subnets
             for sub in self.ec2.describe_subnets()['Subnets']:
+                link_payload(self.graph, 'ec2:subnet', sub)
                 if sub.get('DefaultForAz', False): continue
                 tags = {t['Key']: t['Value'] for t in sub.get('Tags', [])}
                 self.add_resource(sub['SubnetId'], sub['SubnetArn'], 'ec2', 'subnet', tags)
 
             # Internet Gateways
             for igw in self.ec2.describe_internet_gateways()['InternetGateways']:
+                link_payload(self.graph, 'ec2:internet-gateway', igw)
                 # Hard to strict check default, but usually attached to non-default VPC
                 # We can check attachments. If all attachments are to default VPCs, skip?
                 # For now, let's leave it unless we want to do heavy lookups.
@@ -143,6 +169,7 @@ class AWSServiceReader:
             # NAT Gateways
             for nat in self.ec2.describe_nat_gateways()['NatGateways']:
                 if nat['State'] in ['deleted', 'deleting', 'failed']: continue
+                link_payload(self.graph, 'ec2:natgateway', nat)
                 tags = {t['Key']: t['Value'] for t in nat.get('Tags', [])}
                 self.add_resource(nat['NatGatewayId'], f"arn:aws:ec2:{self.region}:{nat.get('OwnerId','')}:natgateway/{nat['NatGatewayId']}", 'ec2', 'natgateway', tags)
 
@@ -154,6 +181,7 @@ class AWSServiceReader:
 
             # Route Tables
             for rtb in self.ec2.describe_route_tables()['RouteTables']:
+                link_payload(self.graph, 'ec2:route-table', rtb)
                 # Main route tables for default VPCs?
                 # Check associations.
                 is_default_main = False
@@ -167,11 +195,19 @@ class AWSServiceReader:
 
             # Network ACLs
             for acl in self.ec2.describe_network_acls()['NetworkAcls']:
+                link_payload(self.graph, 'ec2:network-acl', acl)
                 if acl.get('IsDefault', False): continue
                 tags = {t['Key']: t['Value'] for t in acl.get('Tags', [])}
                 self.add_resource(acl['NetworkAclId'], f"arn:aws:ec2:{self.region}:{acl['OwnerId']}:network-acl/{acl['NetworkAclId']}", 'ec2', 'network-acl', tags)
 
+            # Network Interfaces (not reported; they link owners to subnets and security groups in the graph)
+            for page in list_pages(self.ec2.describe_network_interfaces, 'NextToken', 'NextToken',
+                                   self.checkpoint, 'scan_ec2', snapshot_graph=True):
+                for eni in page['NetworkInterfaces']:
+                    link_payload(self.graph, 'ec2:network-interface', eni)
+
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning EC2: {e}")
 
     def scan_ecs(self):
@@ -185,6 +221,7 @@ class AWSServiceReader:
                 for c in clusters:
                      if c['status'] in ['INACTIVE', 'DEPROVISIONING', 'FAILED']: continue
                      self.add_resource(c['clusterArn'], c['clusterArn'], 'ecs', 'cluster')
+                     link_payload(self.graph, 'ecs:cluster', c)
                      
                      # Services (only if cluster active)
                      svcs = self.ecs.list_services(cluster=c['clusterArn'])['serviceArns']
@@ -192,16 +229,18 @@ class AWSServiceReader:
                          desc_svcs = self.ecs.describe_services(cluster=c['clusterArn'], services=svcs)['services']
                          for s in desc_svcs:
                              if s['status'] in ['DRAINING', 'INACTIVE']: continue
+                             link_payload(self.graph, 'ecs:service', s)
                              self.add_resource(s['serviceArn'], s['serviceArn'], 'ecs', 'service')
             
             # Task Definitions (always active? Deregistered are INACTIVE)
-            families = self.ecs.list_task_definition_families()['families']
-            for fam in families:
-                arns = self.ecs.list_task_definitions(familyPrefix=fam, status='ACTIVE')['taskDefinitionArns']
-                for t_arn in arns:
+            # One listing covers every family; familyPrefix would also match longer family names
+            for page in list_pages(self.ecs.list_task_definitions, 'nextToken', 'nextToken',
+                                   self.checkpoint, 'scan_ecs', status='ACTIVE'):
+                for t_arn in page['taskDefinitionArns']:
                     self.add_resource(t_arn, t_arn, 'ecs', 'task-definition')
                 
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning ECS: {e}")
 
     def scan_s3(self):
@@ -211,6 +250,7 @@ class AWSServiceReader:
                 name = b['Name']
                 self.add_resource(name, f"arn:aws:s3:::{name}", 's3', 'bucket')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning S3: {e}")
 
     def scan_ecr(self):
@@ -219,6 +259,7 @@ class AWSServiceReader:
             for r in self.ecr.describe_repositories()['repositories']:
                 self.add_resource(r['repositoryName'], r['repositoryArn'], 'ecr', 'repository')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning ECR: {e}")
             
     def scan_lambda(self):
@@ -227,8 +268,10 @@ class AWSServiceReader:
             paginator = self.lambda_client.get_paginator('list_functions')
             for page in paginator.paginate():
                 for f in page['Functions']:
+                    link_payload(self.graph, 'lambda:function', f)
                     self.add_resource(f['FunctionArn'], f['FunctionArn'], 'lambda', 'function')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning Lambda: {e}")
 
     def scan_rds(self):
@@ -236,8 +279,10 @@ class AWSServiceReader:
         try:
             for db in self.rds.describe_db_instances()['DBInstances']:
                 if db['DBInstanceStatus'] in ['deleting', 'deleted', 'failed']: continue
+                link_payload(self.graph, 'rds:db-instance', db)
                 self.add_resource(db['DBInstanceIdentifier'], db['DBInstanceArn'], 'rds', 'db-instance')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning RDS: {e}")
 
     def scan_dynamodb(self):
@@ -248,6 +293,7 @@ class AWSServiceReader:
                 if desc.get('TableStatus') in ['DELETING']: continue
                 self.add_resource(t, desc['TableArn'], 'dynamodb', 'table')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning DynamoDB: {e}")
 
     def scan_elbv2(self):
@@ -257,13 +303,16 @@ class AWSServiceReader:
             lbs = self.elbv2.describe_load_balancers()['LoadBalancers']
             for lb in lbs:
                 if lb['State']['Code'] in ['failed', 'deleting']: continue
+                link_payload(self.graph, 'elasticloadbalancing:loadbalancer', lb)
                 self.add_resource(lb['LoadBalancerArn'], lb['LoadBalancerArn'], 'elasticloadbalancing', 'loadbalancer')
             
             # Target Groups
             tgs = self.elbv2.describe_target_groups()['TargetGroups']
             for tg in tgs:
+                link_payload(self.graph, 'elasticloadbalancing:targetgroup', tg)
                 self.add_resource(tg['TargetGroupArn'], tg['TargetGroupArn'], 'elasticloadbalancing', 'targetgroup')
         except Exception as e:
+             raise_if_interrupted(e)
              logger.error(f"Error scanning ELBv2: {e}")
 
     def scan_codestar(self):
@@ -280,6 +329,7 @@ class AWSServiceReader:
                 # delete takes ARN
                 self.add_resource(c['ConnectionArn'], c['ConnectionArn'], 'codestar-connections', 'connection', tags)
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning CodeStar: {e}")
 
     def scan_codebuild(self):
@@ -292,6 +342,7 @@ class AWSServiceReader:
                     # delete takes Name
                     self.add_resource(p['name'], p['arn'], 'codebuild', 'project')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning CodeBuild: {e}")
 
     def scan_codepipeline(self):
@@ -301,6 +352,7 @@ class AWSServiceReader:
                 # delete takes Name
                 self.add_resource(p['name'], f"arn:aws:codepipeline:{self.region}:unknown:pipeline/{p['name']}", 'codepipeline', 'pipeline')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning CodePipeline: {e}")
 
     def scan_apprunner(self):
@@ -310,6 +362,7 @@ class AWSServiceReader:
                 # delete takes ARN
                 self.add_resource(s['ServiceArn'], s['ServiceArn'], 'apprunner', 'service')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning AppRunner: {e}")
 
     def scan_resource_groups(self):
@@ -320,16 +373,18 @@ class AWSServiceReader:
                 for g in page['Groups']:
                      self.add_resource(g['Name'], g['GroupArn'], 'resource-groups', 'group')
         except Exception as e:
+            raise_if_interrupted(e)
             logger.error(f"Error scanning Resource Groups: {e}")
 
     def scan_cloudwatch_logs(self):
         logger.info("Scanning CloudWatch Logs...")
         try:
-            paginator = self.cloudwatch_logs.get_paginator('describe_log_groups')
-            for page in paginator.paginate():
+            for page in list_pages(self.cloudwatch_logs.describe_log_groups, 'nextToken', 'nextToken',
+                                   self.checkpoint, 'scan_cloudwatch_logs'):
                 for lg in page['logGroups']:
                     self.add_resource(lg['logGroupName'], lg['arn'], 'logs', 'log-group')
         except Exception as e:
+             raise_if_interrupted(e)
              logger.error(f"Error scanning Logs: {e}")
 
 
@@ -369,6 +424,48 @@ class AWSServiceReader:
         logger.info(f"Report saved to {filename}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List every resource in the region into the reader report.")
+    parser.add_argument("--profile", nargs="?", const=call_trace.TRACE_FILE, metavar="TRACE_FILE",
+                        help="Trace every AWS call: Chrome trace JSON, flame graph stacks and a summary at exit")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted scan from its checkpoint instead of starting over")
+    parser.add_argument("--watch", metavar="SOURCE",
+                        help="Keep the report current from CloudTrail events: an SQS queue URL, s3://bucket/prefix "
+                             "of CloudTrail logs, a directory of exported log files, or queue:DIR (local queue)")
+    parser.add_argument("--reconcile-hours", type=float, default=DEFAULT_RECONCILE_HOURS,
+                        help="With --watch, hours between full reconciliation scans")
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS,
+                        help="With --watch, how long each poll waits for events")
+    parser.add_argument("--once", action="store_true", help="With --watch, apply the pending events and exit")
+    args = parser.parse_args()
+    if args.profile:
+        call_trace.enable(args.profile)
+
+    if args.watch:
+        reader = AWSServiceReader(cache_reads=False)
+        watcher = InventoryWatcher(reader, event_source(args.watch, reader.session), args.reconcile_hours * 3600)
+        try:
+            watcher.run(args.poll_seconds, once=args.once)
+        except Exception as e:
+            logger.error(f"Watch stopped: {e}")
+            sys.exit(1)
+        sys.exit(0)
+
     reader = AWSServiceReader()
-    reader.scan_all_resources()
+    try:
+        # One checkpoint per account: resuming under other credentials must not merge their partial scan
+        account = reader.session.client('sts').get_caller_identity()['Account']
+    except Exception as e:
+        logger.error(f"Could not identify the AWS account: {e}")
+        sys.exit(1)
+    checkpoint = ScanCheckpoint(f"reader-{account}-{reader.region}", reader.discovered_resources, reader.graph)
+    checkpoint.open(resume=args.resume)
+    try:
+        reader.scan_all_resources(checkpoint)
+    except Exception as e:
+        logger.error(f"Scan interrupted: {e}")
+        logger.error(f"Progress is saved in {checkpoint.path}; rerun with --resume to continue")
+        sys.exit(1)
     reader.generate_report()
+    reader.graph.save()
+    checkpoint.clear()
@@ -0,0 +1,53 @@
+import importlib.util
+import os
+
+# The script's file name is not importable as a module name; loading it also puts aws_inspector on sys.path
+_spec = importlib.util.spec_from_file_location(
+    'aws_services_cleaner', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'aws-services-cleaner.py'))
+cleaner = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(cleaner)
+
+from resource_graph import IN, USES, ResourceGraph  # noqa: E402
+
+
+def resource(clean_id, priority, monthly_cost=0.0):
+    return {'clean_id': clean_id, 'priority': priority, 'monthly_cost': monthly_cost}
+
+
+def ids(resources):
+    return [r['clean_id'] for r in resources]
+
+
+def chain_graph():
+    # svc -> tg -> lb: the service uses the target group, which is attached to the load balancer
+    graph = ResourceGraph()
+    graph.link('svc', 'tg', USES)
+    graph.link('tg', 'lb', IN)
+    return graph
+
+
+def test_savings_order_puts_costly_resources_first_and_free_ones_in_deletion_order():
+    resources = [resource('bucket', 5), resource('eip', 75, 3.65), resource('nat', 40, 32.85)]
+    assert ids(cleaner.savings_order(resources, None)) == ['nat', 'eip', 'bucket']
+
+
+def test_savings_order_places_blockers_recursively():
+    resources = [resource('bucket', 5), resource('svc', 10), resource('tg', 30), resource('lb', 50, 16.43),
+                 resource('eip', 75, 3.65)]
+    # The target group blocks the load balancer, and the service blocks the target group
+    assert ids(cleaner.savings_order(resources, chain_graph())) == ['svc', 'tg', 'lb', 'eip', 'bucket']
+
+
+def test_savings_order_leaves_later_dependents_in_place():
+    # A dependent that DELETION_ORDER puts after the costly resource is not pulled ahead of it
+    resources = [resource('tg', 30), resource('lb', 50, 16.43), resource('svc', 60)]
+    assert ids(cleaner.savings_order(resources, chain_graph())) == ['tg', 'lb', 'svc']
+
+
+def test_savings_order_places_shared_blockers_once():
+    graph = chain_graph()
+    graph.link('svc', 'nat', USES)
+    resources = [resource('svc', 10), resource('tg', 30), resource('nat', 40, 32.85), resource('lb', 50, 16.43)]
+    ordered = cleaner.savings_order(resources, graph)
+    assert ids(ordered) == ['svc', 'nat', 'tg', 'lb']
+    assert len(ordered) == len(resources)
@@ -0,0 +1,66 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Startup budget for `python main.py --help` (median wall time, seconds)
+DEFAULT_BUDGET = 0.2
+
+# Modules that must not be imported just to start the CLI
+HEAVY_MODULES = ['boto3', 'botocore', 'pandas', 'tabulate']
+
+INSPECTOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'aws_inspector')
+
+
+def time_cli(runs: int):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'main.py', '--help'], cwd=INSPECTOR_DIR,
+                       stdout=subprocess.DEVNULL, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def heavy_imports():
+    probe = (
+        "import sys; import main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, '-c', probe], cwd=INSPECTOR_DIR,
+                         capture_output=True, text=True, check=True).stdout.strip()
+    return [m for m in out.split(',') if m]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark aws_inspector CLI startup against a time budget.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of timed runs')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='Max median startup time in seconds')
+    args = parser.parse_args()
+
+    # Warm the bytecode cache so the first run doesn't skew the median
+    time_cli(1)
+    samples = time_cli(args.runs)
+    median = statistics.median(samples)
+    loaded = heavy_imports()
+
+    print(f"main.py --help: median {median * 1000:.0f} ms, min {min(samples) * 1000:.0f} ms, "
+          f"max {max(samples) * 1000:.0f} ms over {args.runs} runs (budget {args.budget * 1000:.0f} ms)")
+    print(f"Heavy modules imported at startup: {', '.join(loaded) or 'none'}")
+
+    failed = False
+    if median > args.budget:
+        print("FAIL: startup time over budget")
+        failed = True
+    if loaded:
+        print("FAIL: heavy modules must be imported lazily")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import contextlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+from synthetic_account import SyntheticAccount
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INSPECTOR_DIR = os.path.join(SCRIPTS_DIR, 'aws_inspector')
+CLEANER_DIR = os.path.join(SCRIPTS_DIR, 'aws_resource_cleaner')
+
+REGION = 'us-east-1'
+
+# Regression thresholds at --scale 1 (10k log groups, 5k task definitions, 500 SGs, 50 VPCs)
+THRESHOLDS = {
+    'reader.scan_all_resources': {'api_calls': 340, 'wall_s': 20.0, 'peak_mb': 80},
+    'inspector.assess_relevance': {'api_calls': 140, 'wall_s': 6.0, 'peak_mb': 45},
+    'cleaner.main': {'api_calls': 2500, 'wall_s': 60.0, 'peak_mb': 75},
+    'find_unused_vpcs': {'api_calls': 10, 'wall_s': 3.0, 'peak_mb': 45},
+}
+
+# The cleaner rewrites the whole report after every deletion, so it runs on a sample of the scan
+CLEANER_RESOURCES = 2000
+
+
+def load_script(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_reader():
+    if CLEANER_DIR not in sys.path:
+        sys.path.insert(0, CLEANER_DIR)
+    return load_script('aws_services_reader', os.path.join(CLEANER_DIR, 'aws-services-reader.py'))
+
+
+class SleeplessTime:
+    """Stands in for the time module: sleeps return at once but are added up."""
+
+    def __init__(self):
+        self.slept = 0.0
+
+    def sleep(self, seconds):
+        self.slept += seconds
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+# --- Scenarios: setup(account, workdir) runs untimed and returns the timed callable ---
+
+def setup_reader(account, workdir):
+    reader_module = load_reader()
+
+    def run():
+        reader = reader_module.AWSServiceReader(region=REGION)
+        reader.scan_all_resources()
+        return {'resources': len(reader.discovered_resources)}
+    return run
+
+
+def setup_inspector(account, workdir):
+    from inspector import AWSResourceInspector
+
+    inspector = AWSResourceInspector(region=REGION)
+    with mock.patch('inspector.tag_index.TagIndex.save'):
+        inspector.scan_resource_group('benchmark-group')
+        inspector.enrich_resource_data()
+
+    def run():
+        try:
+            results = inspector.assess_relevance()
+        finally:
+            inspector.core.close()
+        return {'resources': len(results), 'delete': sum(1 for r in results if r.get('Relevance') == 'DELETE')}
+    return run
+
+
+def setup_cleaner(account, workdir):
+    reader = load_reader().AWSServiceReader(region=REGION)
+    reader.scan_all_resources()
+    step = max(1, len(reader.discovered_resources) // CLEANER_RESOURCES)
+    reader.discovered_resources = sorted(reader.discovered_resources, key=lambda r: (r['Type'], r['ARN']))[::step]
+    report = os.path.join(workdir, 'aws-services-reader.md')
+    graph_file = os.path.join(workdir, 'resource_graph.json')
+    reader.generate_report(report)
+    reader.graph.save(graph_file)
+
+    cleaner = load_script('aws_services_cleaner', os.path.join(CLEANER_DIR, 'aws-services-cleaner.py'))
+    cleaner.REPORT_FILE = report
+    cleaner.REGION = REGION
+    clock = cleaner.time = SleeplessTime()
+    load_graph = cleaner.ResourceGraph.load.__func__
+
+    def run():
+        with mock.patch.object(sys, 'argv', ['aws-services-cleaner.py']), \
+                mock.patch.object(cleaner.ResourceGraph, 'load', classmethod(lambda cls: load_graph(cls, graph_file))), \
+                open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            cleaner.main()
+        return {'resources': len(reader.discovered_resources), 'skipped_sleep_s': clock.slept}
+    return run
+
+
+def setup_vpcs(account, workdir):
+    import find_unused_vpcs
+
+    def run():
+        find_unused_vpcs.get_vpc_details(REGION)
+        return {'vpcs': len(account.items('vpcs'))}
+    return run
+
+
+SCENARIOS = {
+    'reader.scan_all_resources': setup_reader,
+    'inspector.assess_relevance': setup_inspector,
+    'cleaner.main': setup_cleaner,
+    'find_unused_vpcs': setup_vpcs,
+}
+
+
+def measure(name: str, scale: float, memory: bool) -> dict:
+    """Times one scenario on a fresh account; peak memory comes from a second, traced run."""
+    result = {}
+    for traced in ([False, True] if memory else [False]):
+        account = SyntheticAccount(region=REGION, scale=scale)
+        with account.patch_sessions(), tempfile.TemporaryDirectory() as workdir:
+            run = SCENARIOS[name](account, workdir)
+            account.reset_counts()
+            if traced:
+                tracemalloc.start()
+                run()
+                result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+                tracemalloc.stop()
+                continue
+            start = time.perf_counter()
+            result.update(run())
+            result['wall_s'] = round(time.perf_counter() - start, 2)
+            result['api_calls'] = sum(account.calls.values())
+            result['calls'] = dict(account.calls.most_common())
+            result['unstubbed'] = dict(account.unstubbed)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scans, assessment and cleanup against a synthetic large account.')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiplier on the account size (thresholds are only enforced at 1)')
+    parser.add_argument('--only', nargs='+', choices=list(SCENARIOS), help='Run just these scenarios')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced run for peak memory')
+    parser.add_argument('--json', help='Also write the results to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show the scripts\' own logging')
+    args = parser.parse_args()
+
+    sys.path.insert(0, INSPECTOR_DIR)
+    # No real credentials, endpoint or shared response cache are involved
+    os.environ.update({'AWS_ACCESS_KEY_ID': 'benchmark', 'AWS_SECRET_ACCESS_KEY': 'benchmark',
+                       'AWS_DEFAULT_REGION': REGION, 'AWS_INSPECTOR_CACHE': 'off'})
+    os.environ.pop('AWS_INSPECTOR_ENDPOINT_URL', None)
+    os.environ.pop('AWS_PROFILE', None)
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    results, failed = {}, False
+    for name in args.only or SCENARIOS:
+        r = results[name] = measure(name, args.scale, not args.no_memory)
+        peak = f"{r['peak_mb']:.1f} MB peak" if 'peak_mb' in r else 'peak n/a'
+        print(f"{name}: {r['wall_s']:.2f} s, {r['api_calls']} API calls, {peak}, "
+              f"{', '.join(f'{k}={v}' for k, v in r.items() if k in ('resources', 'delete', 'vpcs', 'skipped_sleep_s'))}")
+        top = ', '.join(f"{op}={n}" for op, n in list(r['calls'].items())[:5])
+        print(f"  top calls: {top}")
+        if r['unstubbed']:
+            print(f"  not stubbed (answered with empty responses): {', '.join(r['unstubbed'])}")
+
+        if args.scale != 1.0:
+            continue
+        for metric, limit in THRESHOLDS[name].items():
+            if metric in r and r[metric] > limit:
+                print(f"FAIL: {name} {metric} {r[metric]} over threshold {limit}")
+                failed = True
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'scale': args.scale, 'results': results}, f, indent=2)
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
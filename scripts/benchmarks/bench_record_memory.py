@@ -0,0 +1,102 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+INSPECTOR_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'aws_inspector')
+sys.path.insert(0, INSPECTOR_DIR)
+
+from resource_records import InspectorRecord, ReaderRecord, RecordList, tag_set_count  # noqa: E402
+
+# Compact records must stay under this share of the memory plain dicts take
+DEFAULT_MAX_RATIO = 0.6
+DEFAULT_COUNT = 200000
+PAGE_SIZE = 1000
+
+TYPES = [('ec2', 'security-group'), ('ecs', 'task-definition'), ('logs', 'log-group'), ('s3', 'bucket'),
+         ('lambda', 'function'), ('ec2', 'subnet'), ('elasticloadbalancing', 'targetgroup'), ('ecr', 'repository')]
+CFN_TYPES = ['AWS::EC2::SecurityGroup', 'AWS::ECS::TaskDefinition', 'AWS::Logs::LogGroup', 'AWS::S3::Bucket',
+             'AWS::Lambda::Function', 'AWS::EC2::Subnet', 'AWS::ElasticLoadBalancingV2::TargetGroup', 'AWS::ECR::Repository']
+
+
+def item(shape: str, i: int) -> dict:
+    service, rtype = TYPES[i % len(TYPES)]
+    arn = f"arn:aws:{service}:us-east-1:123456789012:{rtype}/resource-{i:08d}"
+    # Most resources carry one of a few hundred tag sets; a third carry none
+    tags = {} if i % 3 == 0 else {'Project': f"project-{i % 7}", 'Environment': ('prod', 'dev', 'staging')[i % 3],
+                                  'Name': f"app-{i % 400}"}
+    if shape == 'reader':
+        return {'Identifier': arn.split('/')[-1], 'ARN': arn, 'Service': service, 'Type': rtype,
+                'Region': 'us-east-1', 'Tags': tags}
+    return {'Arn': arn, 'Type': CFN_TYPES[i % len(CFN_TYPES)], 'Status': 'ACTIVE', 'Tags': tags}
+
+
+def pages(shape: str, count: int):
+    """Parsed from JSON like API responses, so every page brings fresh strings and dicts."""
+    for start in range(0, count, PAGE_SIZE):
+        text = json.dumps([item(shape, i) for i in range(start, min(count, start + PAGE_SIZE))])
+        yield json.loads(text)
+
+
+def assess(resources):
+    for n, r in enumerate(resources):
+        delete = n % 4 == 0
+        r['Relevance'] = 'DELETE' if delete else 'KEEP'
+        r['Justification'] = "Old Task Definition revision (kept last 2)" if delete else "Core Infrastructure / Active"
+        r['MonthlyCost'] = 0.0 if n % 2 else None
+
+
+def build(shape: str, count: int, compact: bool):
+    if compact:
+        resources = RecordList(ReaderRecord, key='ARN') if shape == 'reader' else RecordList(InspectorRecord)
+    else:
+        resources = []
+    for page in pages(shape, count):
+        resources.extend(page)
+    if shape == 'inspector':
+        assess(resources)
+    return resources
+
+
+def measure(shape: str, count: int, compact: bool):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    resources = build(shape, count, compact)
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resources
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory of plain-dict vs compact resource records (reader and inspector shapes).')
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT, help='Resources per shape')
+    parser.add_argument('--max-ratio', type=float, default=DEFAULT_MAX_RATIO,
+                        help='Fail if compact records take more than this share of the dict memory')
+    args = parser.parse_args()
+
+    failed = False
+    for shape in ('reader', 'inspector'):
+        dict_bytes, dict_s = measure(shape, args.count, compact=False)
+        compact_bytes, compact_s = measure(shape, args.count, compact=True)
+        ratio = compact_bytes / dict_bytes
+        print(f"{shape}: {args.count} resources, dicts {dict_bytes / 2**20:.1f} MB ({dict_bytes / args.count:.0f} B each, "
+              f"{dict_s:.2f} s), compact {compact_bytes / 2**20:.1f} MB ({compact_bytes / args.count:.0f} B each, "
+              f"{compact_s:.2f} s), ratio {ratio:.2f} (max {args.max_ratio})")
+        if ratio > args.max_ratio:
+            print(f"FAIL: {shape} compact records use {ratio:.0%} of the dict memory")
+            failed = True
+    print(f"Shared tag sets: {tag_set_count()}")
+
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,440 @@
+import contextlib
+import hashlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import boto3
+
+# Default size of the synthetic account (a large account, per inspection_report.txt proportions)
+DEFAULT_SIZES = {
+    'vpcs': 50,
+    'subnets_per_vpc': 4,
+    'security_groups': 500,
+    'instances': 200,
+    'nat_gateways': 25,
+    'elastic_ips': 50,
+    'load_balancers': 30,
+    'clusters': 5,
+    'services_per_cluster': 8,
+    'task_definitions': 5000,
+    'task_definition_families': 100,
+    'log_groups': 10000,
+    'buckets': 200,
+    'repositories': 50,
+    'functions': 100,
+    'db_instances': 10,
+    'tables': 20,
+    'projects': 10,
+    'pipelines': 10,
+}
+
+
+class _HTTPResponse:
+    """What botocore expects back from a before-call handler."""
+    headers: Dict = {}
+    raw = None
+    content = b''
+
+    def __init__(self, status_code: int = 200):
+        self.status_code = status_code
+
+
+def _error(code: str, message: str = '') -> tuple:
+    return _HTTPResponse(400), {'Error': {'Code': code, 'Message': message}, 'ResponseMetadata': {'HTTPStatusCode': 400}}
+
+
+def _tags(name: str, i: int) -> List[Dict]:
+    return [{'Key': 'Name', 'Value': name},
+            {'Key': 'Project', 'Value': 'DigitalHall' if i % 3 else 'Legacy'},
+            {'Key': 'Environment', 'Value': 'prod' if i % 2 else 'dev'}]
+
+
+class SyntheticAccount:
+    """
+    An in-memory AWS account behind real boto3 clients: a before-call hook answers every request
+    from generated collections (with pagination, id filters and deletions), so botocore's
+    parameter validation, paginators and waiters all run as usual without network access.
+    Every call is counted per "service.Operation".
+    """
+
+    def __init__(self, region: str = 'us-east-1', account_id: str = '123456789012', scale: float = 1.0, **sizes):
+        self.region = region
+        self.account_id = account_id
+        self.sizes = {k: max(1, int(v * scale)) if k.endswith('s') and not k.endswith('_per_vpc') else v
+                      for k, v in dict(DEFAULT_SIZES, **sizes).items()}
+        self.calls: Counter = Counter()
+        self.unstubbed: Counter = Counter()
+        self.collections: Dict[str, Dict[str, Dict]] = {}
+        self._lists: Dict[str, List[Dict]] = {}
+        self._generate()
+        self._handlers = self._routes()
+
+    # --- Data ---
+
+    def arn(self, service: str, resource: str) -> str:
+        return f"arn:aws:{service}:{self.region}:{self.account_id}:{resource}"
+
+    def _add(self, collection: str, key: str, item: Dict):
+        self.collections.setdefault(collection, {})[key] = item
+
+    def items(self, collection: str) -> List[Dict]:
+        if collection not in self._lists:
+            self._lists[collection] = list(self.collections.get(collection, {}).values())
+        return self._lists[collection]
+
+    def _remove(self, collection: str, key: str) -> bool:
+        self._lists.pop(collection, None)
+        self._lists.pop('_tags', None)
+        return self.collections.get(collection, {}).pop(key, None) is not None
+
+    def _generate(self):
+        s = self.sizes
+        hexid = lambda prefix, i: f"{prefix}-{i:017x}"
+
+        subnets = []
+        for v in range(s['vpcs']):
+            vpc_id = hexid('vpc', v)
+            self._add('vpcs', vpc_id, {'VpcId': vpc_id, 'OwnerId': self.account_id, 'CidrBlock': f"10.{v % 256}.0.0/16",
+                                       'IsDefault': False, 'State': 'available', 'Tags': _tags(f"vpc-{v}", v)})
+            igw = hexid('igw', v)
+            self._add('igws', igw, {'InternetGatewayId': igw, 'OwnerId': self.account_id,
+                                    'Attachments': [{'VpcId': vpc_id, 'State': 'available'}], 'Tags': _tags(f"igw-{v}", v)})
+            acl = hexid('acl', v)
+            self._add('acls', acl, {'NetworkAclId': acl, 'VpcId': vpc_id, 'OwnerId': self.account_id, 'IsDefault': v % 2 == 0,
+                                    'Associations': [], 'Tags': _tags(f"acl-{v}", v)})
+            for n in range(s['subnets_per_vpc']):
+                sid = hexid('subnet', v * 16 + n)
+                subnets.append((vpc_id, sid))
+                self._add('subnets', sid, {'SubnetId': sid, 'VpcId': vpc_id, 'OwnerId': self.account_id,
+                                           'SubnetArn': self.arn('ec2', f"subnet/{sid}"), 'DefaultForAz': False,
+                                           'CidrBlock': f"10.{v % 256}.{n}.0/24", 'Tags': _tags(f"subnet-{v}-{n}", n)})
+            for n in range(2):
+                rtb = hexid('rtb', v * 2 + n)
+                self._add('route_tables', rtb, {
+                    'RouteTableId': rtb, 'VpcId': vpc_id, 'OwnerId': self.account_id,
+                    'Associations': [{'Main': n == 0, 'SubnetId': subnets[-1 - n][1]}],
+                    'Routes': [{'GatewayId': igw if n == 0 else 'local'}], 'Tags': _tags(f"rtb-{v}-{n}", n)})
+
+        sgs = []
+        for g in range(s['security_groups']):
+            vpc_id, _ = subnets[g % len(subnets)]
+            gid = hexid('sg', g)
+            refs = [{'IpProtocol': 'tcp', 'FromPort': 443, 'ToPort': 443, 'UserIdGroupPairs': [{'GroupId': sgs[-1][1]}]}] \
+                if sgs and g % 4 else []
+            self._add('security_groups', gid, {'GroupId': gid, 'GroupName': 'default' if g < s['vpcs'] else f"sg-{g}",
+                                               'VpcId': vpc_id, 'OwnerId': self.account_id, 'IpPermissions': refs,
+                                               'IpPermissionsEgress': [], 'Tags': _tags(f"sg-{g}", g)})
+            sgs.append((vpc_id, gid))
+
+        for i in range(s['instances']):
+            vpc_id, sid = subnets[i % len(subnets)]
+            iid = hexid('i', i)
+            eni = hexid('eni', i)
+            self._add('instances', iid, {'InstanceId': iid, 'InstanceType': 't3.micro', 'State': {'Name': 'running'},
+                                         'VpcId': vpc_id, 'SubnetId': sid, 'OwnerId': self.account_id,
+                                         'SecurityGroups': [{'GroupId': sgs[i % len(sgs)][1]}], 'Tags': _tags(f"app-{i}", i)})
+            self._add('enis', eni, {'NetworkInterfaceId': eni, 'VpcId': vpc_id, 'SubnetId': sid, 'InterfaceType': 'interface',
+                                    'Attachment': {'InstanceId': iid}, 'Groups': [{'GroupId': sgs[i % len(sgs)][1]}],
+                                    'Description': 'Primary network interface'})
+
+        for i in range(s['nat_gateways']):
+            vpc_id, sid = subnets[(i * 2 * s['subnets_per_vpc']) % len(subnets)]
+            nat = hexid('nat', i)
+            eni = hexid('eni', 100000 + i)
+            self._add('nat_gateways', nat, {'NatGatewayId': nat, 'VpcId': vpc_id, 'SubnetId': sid, 'State': 'available',
+                                            'NatGatewayAddresses': [{'NetworkInterfaceId': eni}], 'Tags': _tags(f"nat-{i}", i)})
+            self._add('enis', eni, {'NetworkInterfaceId': eni, 'VpcId': vpc_id, 'SubnetId': sid, 'InterfaceType': 'nat_gateway',
+                                    'Groups': [], 'Description': f"Interface for NAT Gateway {nat}"})
+
+        for i in range(s['elastic_ips']):
+            alloc = hexid('eipalloc', i)
+            address = {'AllocationId': alloc, 'PublicIp': f"198.51.{i // 256}.{i % 256}", 'Tags': _tags(f"eip-{i}", i)}
+            if i % 2:
+                address['AssociationId'] = hexid('eipassoc', i)
+            self._add('addresses', alloc, address)
+
+        for i in range(s['load_balancers']):
+            vpc_id, sid = subnets[i % len(subnets)]
+            lb_arn = self.arn('elasticloadbalancing', f"loadbalancer/app/alb-{i}/{i:016x}")
+            tg_arn = self.arn('elasticloadbalancing', f"targetgroup/tg-{i}/{i:016x}")
+            self._add('load_balancers', lb_arn, {'LoadBalancerArn': lb_arn, 'LoadBalancerName': f"alb-{i}", 'Type': 'application',
+                                                 'VpcId': vpc_id, 'State': {'Code': 'active'},
+                                                 'AvailabilityZones': [{'SubnetId': sid}], 'SecurityGroups': [sgs[i][1]]})
+            self._add('target_groups', tg_arn, {'TargetGroupArn': tg_arn, 'TargetGroupName': f"tg-{i}", 'VpcId': vpc_id,
+                                                'LoadBalancerArns': [lb_arn]})
+
+        families = s['task_definition_families']
+        revisions = max(1, s['task_definitions'] // families)
+        for f in range(families):
+            for r in range(1, revisions + 1):
+                arn = self.arn('ecs', f"task-definition/app-{f}:{r}")
+                self._add('task_definitions', arn, {'taskDefinitionArn': arn, 'family': f"app-{f}", 'revision': r,
+                                                    'status': 'ACTIVE'})
+        for c in range(s['clusters']):
+            cluster = self.arn('ecs', f"cluster/cluster-{c}")
+            self._add('clusters', cluster, {'clusterArn': cluster, 'clusterName': f"cluster-{c}", 'status': 'ACTIVE'})
+            for n in range(s['services_per_cluster']):
+                f = (c * s['services_per_cluster'] + n) % families
+                svc = self.arn('ecs', f"service/cluster-{c}/svc-{n}")
+                self._add('services', svc, {'serviceArn': svc, 'serviceName': f"svc-{n}", 'clusterArn': cluster,
+                                            'status': 'ACTIVE', 'taskDefinition': self.arn('ecs', f"task-definition/app-{f}:{revisions}"),
+                                            'loadBalancers': [], 'deployments': []})
+
+        for i in range(s['log_groups']):
+            name = f"/ecs/app-{i % 100}/stream-{i}"
+            self._add('log_groups', name, {'logGroupName': name, 'arn': self.arn('logs', f"log-group:{name}:*"),
+                                           'storedBytes': (i % 50) * 1024 * 1024})
+        for i in range(s['buckets']):
+            self._add('buckets', f"bench-bucket-{i}", {'Name': f"bench-bucket-{i}"})
+        for i in range(s['repositories']):
+            self._add('repositories', f"repo-{i}", {'repositoryName': f"repo-{i}", 'repositoryArn': self.arn('ecr', f"repository/repo-{i}")})
+        for i in range(s['functions']):
+            arn = self.arn('lambda', f"function:fn-{i}")
+            self._add('functions', arn, {'FunctionName': f"fn-{i}", 'FunctionArn': arn, 'VpcConfig': {}})
+        for i in range(s['db_instances']):
+            vpc_id, sid = subnets[i % len(subnets)]
+            self._add('db_instances', f"db-{i}", {
+                'DBInstanceIdentifier': f"db-{i}", 'DBInstanceArn': self.arn('rds', f"db:db-{i}"), 'DBInstanceStatus': 'available',
+                'DBInstanceClass': 'db.t3.medium', 'AllocatedStorage': 100, 'MultiAZ': i % 2 == 0,
+                'DBSubnetGroup': {'VpcId': vpc_id, 'Subnets': [{'SubnetIdentifier': sid}]}, 'VpcSecurityGroups': []})
+        for i in range(s['tables']):
+            self._add('tables', f"table-{i}", {'TableName': f"table-{i}", 'TableArn': self.arn('dynamodb', f"table/table-{i}"),
+                                               'TableStatus': 'ACTIVE'})
+        for i in range(s['projects']):
+            self._add('projects', f"build-{i}", {'name': f"build-{i}", 'arn': self.arn('codebuild', f"project/build-{i}")})
+        for i in range(s['pipelines']):
+            self._add('pipelines', f"pipeline-{i}", {'name': f"pipeline-{i}"})
+        group = 'benchmark-group'
+        self._add('groups', group, {'Name': group, 'GroupArn': self.arn('resource-groups', f"group/{group}")})
+
+    def group_members(self) -> List[Dict]:
+        """Resource-group members (ARN + CloudFormation type) for the inspector."""
+        members = []
+        for collection, rtype, key in [
+            ('nat_gateways', 'AWS::EC2::NatGateway', lambda x: self.arn('ec2', f"natgateway/{x['NatGatewayId']}")),
+            ('addresses', 'AWS::EC2::EIP', lambda x: self.arn('ec2', f"elastic-ip/{x['AllocationId']}")),
+            ('load_balancers', 'AWS::ElasticLoadBalancingV2::LoadBalancer', lambda x: x['LoadBalancerArn']),
+            ('target_groups', 'AWS::ElasticLoadBalancingV2::TargetGroup', lambda x: x['TargetGroupArn']),
+            ('task_definitions', 'AWS::ECS::TaskDefinition', lambda x: x['taskDefinitionArn']),
+            ('clusters', 'AWS::ECS::Cluster', lambda x: x['clusterArn']),
+            ('db_instances', 'AWS::RDS::DBInstance', lambda x: x['DBInstanceArn']),
+            ('buckets', 'AWS::S3::Bucket', lambda x: f"arn:aws:s3:::{x['Name']}"),
+            ('log_groups', 'AWS::Logs::LogGroup', lambda x: x['arn']),
+        ]:
+            members.extend({'ResourceArn': key(x), 'ResourceType': rtype} for x in self.items(collection))
+        return members
+
+    # --- Request handling ---
+
+    def install(self, session):
+        """Answers every call of clients created from this boto3 session."""
+        session.events.register_first('before-parameter-build', self._capture_params, unique_id='synthetic-params')
+        # Last, like the network: the response cache and call tracing hooks still run first
+        session.events.register_last('before-call', self._handle, unique_id='synthetic-call')
+
+    @contextlib.contextmanager
+    def patch_sessions(self):
+        """Every boto3.Session created inside the block talks to this account."""
+        original = boto3.session.Session.__init__
+        account = self
+
+        def init(session, *args, **kwargs):
+            original(session, *args, **kwargs)
+            account.install(session)
+
+        boto3.session.Session.__init__ = init
+        try:
+            yield self
+        finally:
+            boto3.session.Session.__init__ = original
+
+    @staticmethod
+    def _capture_params(params, context, **kwargs):
+        context['synthetic_params'] = dict(params)
+
+    def _handle(self, model, context, **kwargs):
+        service = model.service_model.service_name
+        self.calls[f"{service}.{model.name}"] += 1
+        handler = self._handlers.get((service, model.name))
+        params = context.get('synthetic_params', {})
+        if handler is None:
+            self.unstubbed[f"{service}.{model.name}"] += 1
+            return _HTTPResponse(), {}
+        result = handler(params)
+        if isinstance(result, tuple):
+            return result
+        return _HTTPResponse(), result
+
+    def reset_counts(self):
+        self.calls.clear()
+        self.unstubbed.clear()
+
+    @staticmethod
+    def _page(items: List[Dict], key: str, params: Dict, token_in: str = 'NextToken', token_out: str = 'NextToken',
+              limit: Optional[str] = 'MaxResults', default: int = 1000) -> Dict:
+        start = int(params.get(token_in) or 0)
+        size = params.get(limit) or default if limit else default
+        response = {key: items[start:start + size]}
+        if start + size < len(items):
+            response[token_out] = str(start + size)
+        return response
+
+    @staticmethod
+    def _filter(items: List[Dict], params: Dict, ids_param: str, id_key: str) -> List[Dict]:
+        ids = params.get(ids_param)
+        if ids:
+            wanted = set(ids)
+            items = [x for x in items if x.get(id_key) in wanted]
+        for f in params.get('Filters', []):
+            values = set(f['Values'])
+            if f['Name'] == 'vpc-id':
+                items = [x for x in items if x.get('VpcId') in values]
+            elif f['Name'] == 'attachment.vpc-id':
+                items = [x for x in items if any(a.get('VpcId') in values for a in x.get('Attachments', []))]
+        return items
+
+    def _describe(self, collection: str, key: str, ids_param: str = None, id_key: str = None) -> Callable:
+        return lambda p: self._page(self._filter(self.items(collection), p, ids_param, id_key) if ids_param else self.items(collection),
+                                    key, p)
+
+    def _delete(self, collection: str, param: str, not_found: str = None, transform: Callable = None) -> Callable:
+        def handler(p):
+            key = transform(p[param]) if transform else p[param]
+            if not self._remove(collection, key) and not_found:
+                return _error(not_found, f"{key} not found")
+            return {}
+        return handler
+
+    def _delete_nat(self, p):
+        nat = self.collections['nat_gateways'].get(p['NatGatewayId'])
+        if nat is None:
+            return _error('NatGatewayNotFound')
+        nat['State'] = 'deleted'
+        return {'NatGatewayId': p['NatGatewayId']}
+
+    def _describe_load_balancers(self, p):
+        if p.get('LoadBalancerArns'):
+            found = [self.collections['load_balancers'][a] for a in p['LoadBalancerArns'] if a in self.collections['load_balancers']]
+            return {'LoadBalancers': found} if found else _error('LoadBalancerNotFound')
+        return self._page(self.items('load_balancers'), 'LoadBalancers', p, 'Marker', 'NextMarker', 'PageSize', 400)
+
+    def _metric(self, p):
+        # Half of everything is idle, so the assessment has DELETE candidates
+        value = p['Dimensions'][0]['Value']
+        idle = int(hashlib.md5(value.encode()).hexdigest(), 16) % 2 == 0
+        return {'Label': p['MetricName'], 'Datapoints': [] if idle else [{'Sum': 1000.0}]}
+
+    def _tag_map(self) -> Dict[str, List[Dict]]:
+        if '_tags' not in self._lists:
+            tagged = {}
+            for collection, arn_of in [('task_definitions', lambda x: x['taskDefinitionArn']),
+                                       ('log_groups', lambda x: x['arn']),
+                                       ('load_balancers', lambda x: x['LoadBalancerArn']),
+                                       ('db_instances', lambda x: x['DBInstanceArn'])]:
+                for i, x in enumerate(self.items(collection)):
+                    tagged[arn_of(x)] = _tags(arn_of(x).rsplit('/', 1)[-1], i)
+            self._lists['_tags'] = tagged
+        return self._lists['_tags']
+
+    def _get_resources(self, p):
+        tagged = self._tag_map()
+        if p.get('ResourceARNList'):
+            arns = [a for a in p['ResourceARNList'] if a in tagged]
+        else:
+            arns = list(tagged)
+        page = self._page(arns, 'ResourceTagMappingList', p, 'PaginationToken', 'PaginationToken', 'ResourcesPerPage', 100)
+        page['ResourceTagMappingList'] = [{'ResourceARN': a, 'Tags': tagged[a]} for a in page['ResourceTagMappingList']]
+        return page
+
+    def _list_group_resources(self, p):
+        page = self._page(self.group_members(), 'Resources', p, 'NextToken', 'NextToken', 'MaxResults', 50)
+        page['Resources'] = [{'Identifier': r, 'Status': {'Name': 'ACTIVE'}} for r in page['Resources']]
+        return page
+
+    def _routes(self) -> Dict[tuple, Callable]:
+        td_arns = lambda p: [x['taskDefinitionArn'] for x in self.items('task_definitions')
+                             if not p.get('familyPrefix') or x['family'].startswith(p['familyPrefix'])]
+        services_of = lambda p: [x['serviceArn'] for x in self.items('services')
+                                 if x['clusterArn'].endswith('/' + p.get('cluster', 'default').split('/')[-1])]
+        return {
+            # EC2
+            ('ec2', 'DescribeVpcs'): self._describe('vpcs', 'Vpcs', 'VpcIds', 'VpcId'),
+            ('ec2', 'DescribeSubnets'): self._describe('subnets', 'Subnets', 'SubnetIds', 'SubnetId'),
+            ('ec2', 'DescribeSecurityGroups'): self._describe('security_groups', 'SecurityGroups', 'GroupIds', 'GroupId'),
+            ('ec2', 'DescribeInstances'): lambda p: {'Reservations': [{'Instances': [i]} for i in
+                                                                      self._filter(self.items('instances'), p, 'InstanceIds', 'InstanceId')]},
+            ('ec2', 'DescribeInternetGateways'): self._describe('igws', 'InternetGateways', 'InternetGatewayIds', 'InternetGatewayId'),
+            ('ec2', 'DescribeNatGateways'): self._describe('nat_gateways', 'NatGateways', 'NatGatewayIds', 'NatGatewayId'),
+            ('ec2', 'DescribeAddresses'): lambda p: {'Addresses': self._filter(self.items('addresses'), p, 'AllocationIds', 'AllocationId')},
+            ('ec2', 'DescribeRouteTables'): self._describe('route_tables', 'RouteTables', 'RouteTableIds', 'RouteTableId'),
+            ('ec2', 'DescribeNetworkAcls'): self._describe('acls', 'NetworkAcls', 'NetworkAclIds', 'NetworkAclId'),
+            ('ec2', 'DescribeNetworkInterfaces'): self._describe('enis', 'NetworkInterfaces', 'NetworkInterfaceIds', 'NetworkInterfaceId'),
+            ('ec2', 'DescribeVpcEndpoints'): self._describe('endpoints', 'VpcEndpoints'),
+            ('ec2', 'DescribeVpcPeeringConnections'): self._describe('peerings', 'VpcPeeringConnections'),
+            ('ec2', 'DeleteVpc'): self._delete('vpcs', 'VpcId', 'InvalidVpcID.NotFound'),
+            ('ec2', 'DeleteSubnet'): self._delete('subnets', 'SubnetId', 'InvalidSubnetID.NotFound'),
+            ('ec2', 'DeleteSecurityGroup'): self._delete('security_groups', 'GroupId', 'InvalidGroup.NotFound'),
+            ('ec2', 'DeleteRouteTable'): self._delete('route_tables', 'RouteTableId', 'InvalidRouteTableID.NotFound'),
+            ('ec2', 'DeleteNetworkAcl'): self._delete('acls', 'NetworkAclId', 'InvalidNetworkAclID.NotFound'),
+            ('ec2', 'DetachInternetGateway'): lambda p: {},
+            ('ec2', 'DeleteInternetGateway'): self._delete('igws', 'InternetGatewayId', 'InvalidInternetGatewayID.NotFound'),
+            ('ec2', 'DeleteNatGateway'): self._delete_nat,
+            ('ec2', 'ReleaseAddress'): self._delete('addresses', 'AllocationId', 'InvalidAllocationID.NotFound'),
+            ('ec2', 'TerminateInstances'): lambda p: {'TerminatingInstances': [{'InstanceId': i} for i in p['InstanceIds']
+                                                                               if self._remove('instances', i)]},
+            # ECS
+            ('ecs', 'ListClusters'): lambda p: self._page([x['clusterArn'] for x in self.items('clusters')], 'clusterArns', p,
+                                                          'nextToken', 'nextToken', 'maxResults', 100),
+            ('ecs', 'DescribeClusters'): lambda p: {'clusters': [self.collections['clusters'][c] for c in p['clusters']
+                                                                 if c in self.collections['clusters']]},
+            ('ecs', 'ListServices'): lambda p: self._page(services_of(p), 'serviceArns', p, 'nextToken', 'nextToken', 'maxResults', 10),
+            ('ecs', 'DescribeServices'): lambda p: {'services': [self.collections['services'][s] for s in p['services']
+                                                                 if s in self.collections['services']]},
+            ('ecs', 'ListTaskDefinitions'): lambda p: self._page(td_arns(p), 'taskDefinitionArns', p,
+                                                                 'nextToken', 'nextToken', 'maxResults', 100),
+            ('ecs', 'ListTasks'): lambda p: {'taskArns': []},
+            ('ecs', 'DeregisterTaskDefinition'): self._delete('task_definitions', 'taskDefinition', 'ClientException'),
+            ('ecs', 'DeleteCluster'): self._delete('clusters', 'cluster', transform=lambda c: c if c.startswith('arn:')
+                                                   else self.arn('ecs', f"cluster/{c}")),
+            ('ecs', 'DeleteService'): lambda p: {},
+            # Elastic Load Balancing
+            ('elbv2', 'DescribeLoadBalancers'): self._describe_load_balancers,
+            ('elbv2', 'DescribeTargetGroups'): lambda p: self._page(self.items('target_groups'), 'TargetGroups', p,
+                                                                    'Marker', 'NextMarker', 'PageSize', 400),
+            ('elbv2', 'DeleteLoadBalancer'): self._delete('load_balancers', 'LoadBalancerArn'),
+            ('elbv2', 'DeleteTargetGroup'): self._delete('target_groups', 'TargetGroupArn'),
+            ('elbv2', 'ModifyLoadBalancerAttributes'): lambda p: {'Attributes': p['Attributes']},
+            # Everything else the scripts read
+            ('logs', 'DescribeLogGroups'): lambda p: self._page(self.items('log_groups'), 'logGroups', p,
+                                                                'nextToken', 'nextToken', 'limit', 50),
+            ('logs', 'DeleteLogGroup'): self._delete('log_groups', 'logGroupName', 'ResourceNotFoundException'),
+            ('s3', 'ListBuckets'): lambda p: {'Buckets': self.items('buckets')},
+            ('s3', 'ListObjects'): lambda p: {'Name': p['Bucket'], 'IsTruncated': False},
+            ('s3', 'ListObjectVersions'): lambda p: {'Name': p['Bucket'], 'IsTruncated': False},
+            ('s3', 'DeleteBucket'): self._delete('buckets', 'Bucket', 'NoSuchBucket'),
+            ('ecr', 'DescribeRepositories'): lambda p: self._page(self.items('repositories'), 'repositories', p,
+                                                                  'nextToken', 'nextToken', 'maxResults', 100),
+            ('ecr', 'DeleteRepository'): self._delete('repositories', 'repositoryName', 'RepositoryNotFoundException'),
+            ('lambda', 'ListFunctions'): lambda p: self._page(self.items('functions'), 'Functions', p,
+                                                              'Marker', 'NextMarker', 'MaxItems', 50),
+            ('lambda', 'DeleteFunction'): self._delete('functions', 'FunctionName', 'ResourceNotFoundException',
+                                                       transform=lambda n: n if n.startswith('arn:') else self.arn('lambda', f"function:{n}")),
+            ('rds', 'DeleteDBInstance'): self._delete('db_instances', 'DBInstanceIdentifier', 'DBInstanceNotFound'),
+            ('rds', 'DescribeDBInstances'): lambda p: self._page(self.items('db_instances'), 'DBInstances', p,
+                                                                 'Marker', 'Marker', 'MaxRecords', 100),
+            ('dynamodb', 'ListTables'): lambda p: {'TableNames': [t['TableName'] for t in self.items('tables')]},
+            ('dynamodb', 'DeleteTable'): self._delete('tables', 'TableName', 'ResourceNotFoundException'),
+            ('dynamodb', 'DescribeTable'): lambda p: {'Table': self.collections['tables'][p['TableName']]},
+            ('codebuild', 'ListProjects'): lambda p: {'projects': [x['name'] for x in self.items('projects')]},
+            ('codebuild', 'BatchGetProjects'): lambda p: {'projects': [self.collections['projects'][n] for n in p['names']]},
+            ('codebuild', 'DeleteProject'): self._delete('projects', 'name'),
+            ('codepipeline', 'ListPipelines'): lambda p: {'pipelines': self.items('pipelines')},
+            ('codepipeline', 'DeletePipeline'): self._delete('pipelines', 'name'),
+            ('codestar-connections', 'ListConnections'): lambda p: {'Connections': []},
+            ('apprunner', 'ListServices'): lambda p: {'ServiceSummaryList': []},
+            ('resource-groups', 'ListGroups'): lambda p: {'Groups': self.items('groups')},
+            ('resource-groups', 'DeleteGroup'): self._delete('groups', 'Group', 'NotFoundException'),
+            ('resource-groups', 'ListGroupResources'): self._list_group_resources,
+            ('resourcegroupstaggingapi', 'GetResources'): self._get_resources,
+            ('cloudwatch', 'GetMetricStatistics'): self._metric,
+        }